@@ -0,0 +1,68 @@
+"""create_room_night_occupancies_table
+
+Revision ID: ef51344cd904
+Revises: f56b43264e8a
+Create Date: 2025-10-20 09:15:31.204518-03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ef51344cd904'
+down_revision = 'f56b43264e8a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('room_night_occupancies',
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('reservation_id', sa.Integer(), nullable=False),
+    sa.Column('reservation_room_id', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], name=op.f('fk_room_night_occupancies_reservation_id_reservations'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['reservation_room_id'], ['reservation_rooms.id'], name=op.f('fk_room_night_occupancies_reservation_room_id_reservation_rooms'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], name=op.f('fk_room_night_occupancies_room_id_rooms')),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name=op.f('fk_room_night_occupancies_tenant_id_tenants')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_room_night_occupancies')),
+    sa.UniqueConstraint('room_id', 'date', name='unique_room_night_occupancy')
+    )
+    op.create_index(op.f('ix_room_night_occupancies_id'), 'room_night_occupancies', ['id'], unique=False)
+    op.create_index(op.f('ix_room_night_occupancies_room_id'), 'room_night_occupancies', ['room_id'], unique=False)
+    op.create_index(op.f('ix_room_night_occupancies_reservation_id'), 'room_night_occupancies', ['reservation_id'], unique=False)
+    op.create_index(op.f('ix_room_night_occupancies_tenant_id'), 'room_night_occupancies', ['tenant_id'], unique=False)
+    op.create_index('ix_room_night_occupancies_tenant_date', 'room_night_occupancies', ['tenant_id', 'date'], unique=False)
+
+    # Backfill: materializar noites das reservas ativas existentes.
+    # Sobreposições legadas são ignoradas (primeira reserva criada vence).
+    op.execute("""
+        INSERT INTO room_night_occupancies
+            (tenant_id, room_id, date, reservation_id, reservation_room_id, created_at, updated_at, is_active)
+        SELECT r.tenant_id, rr.room_id, gs.night::date, r.id, rr.id, now(), now(), true
+        FROM reservation_rooms rr
+        JOIN reservations r ON r.id = rr.reservation_id
+        CROSS JOIN LATERAL generate_series(
+            rr.check_in_date, rr.check_out_date - 1, interval '1 day'
+        ) AS gs(night)
+        WHERE r.is_active = true
+          AND r.status IN ('pending', 'pending_confirmation', 'confirmed', 'checked_in')
+          AND rr.check_out_date > rr.check_in_date
+        ORDER BY r.created_at, r.id
+        ON CONFLICT (room_id, date) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_room_night_occupancies_tenant_date', table_name='room_night_occupancies')
+    op.drop_index(op.f('ix_room_night_occupancies_tenant_id'), table_name='room_night_occupancies')
+    op.drop_index(op.f('ix_room_night_occupancies_reservation_id'), table_name='room_night_occupancies')
+    op.drop_index(op.f('ix_room_night_occupancies_room_id'), table_name='room_night_occupancies')
+    op.drop_index(op.f('ix_room_night_occupancies_id'), table_name='room_night_occupancies')
+    op.drop_table('room_night_occupancies')
@@ -0,0 +1,28 @@
+"""add_reservations_keyset_index
+
+Revision ID: 5b8e2c7d1a93
+Revises: ef51344cd904
+Create Date: 2025-10-21 09:30:12.418305-03:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c7d1a93'
+down_revision = 'ef51344cd904'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reservations_tenant_created_at_id',
+        'reservations',
+        ['tenant_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_tenant_created_at_id', table_name='reservations')
@@ -0,0 +1,70 @@
+"""add_reservation_search_indexes
+
+Revision ID: 8d41f6a2c7e5
+Revises: 5b8e2c7d1a93
+Create Date: 2025-10-21 10:15:47.902113-03:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f6a2c7e5'
+down_revision = '5b8e2c7d1a93'
+branch_labels = None
+depends_on = None
+
+
+# Devem ser idênticas a RESERVATION_SEARCH_DOCUMENT / GUEST_SEARCH_DOCUMENT
+# (app/services/reservation_search_service.py)
+RESERVATION_SEARCH_DOCUMENT = (
+    "f_unaccent(lower("
+    "coalesce(reservations.reservation_number, '') || ' ' || "
+    "coalesce(reservations.internal_notes, '') || ' ' || "
+    "coalesce(reservations.guest_requests, '')"
+    "))"
+)
+
+GUEST_SEARCH_DOCUMENT = (
+    "f_unaccent(lower("
+    "coalesce(guests.first_name, '') || ' ' || "
+    "coalesce(guests.last_name, '') || ' ' || "
+    "coalesce(guests.email, '') || ' ' || "
+    "coalesce(guests.phone, '')"
+    "))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() é STABLE (depende do dicionário configurado); o wrapper com
+    # dicionário explícito pode ser IMMUTABLE e usado em índices de expressão.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $func$
+            SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+        $func$
+    """)
+
+    # CONCURRENTLY para não bloquear escritas em tabelas grandes
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reservations_search_trgm "
+            f"ON reservations USING gin (({RESERVATION_SEARCH_DOCUMENT}) gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_guests_search_trgm "
+            f"ON guests USING gin (({GUEST_SEARCH_DOCUMENT}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_guests_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reservations_search_trgm")
+
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
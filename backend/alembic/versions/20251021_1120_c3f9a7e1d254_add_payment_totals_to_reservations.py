@@ -0,0 +1,43 @@
+"""add_payment_totals_to_reservations
+
+Revision ID: c3f9a7e1d254
+Revises: 8d41f6a2c7e5
+Create Date: 2025-10-21 11:20:05.337841-03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f9a7e1d254'
+down_revision = '8d41f6a2c7e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('reservations', sa.Column('paid_total', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+    op.add_column('reservations', sa.Column('refunded_total', sa.Numeric(precision=10, scale=2), server_default='0', nullable=False))
+
+    # Backfill: totais dos pagamentos confirmados e ativos
+    op.execute("""
+        UPDATE reservations r
+        SET paid_total = t.paid_total,
+            refunded_total = t.refunded_total
+        FROM (
+            SELECT reservation_id,
+                   COALESCE(SUM(amount) FILTER (WHERE NOT COALESCE(is_refund, false)), 0) AS paid_total,
+                   COALESCE(SUM(amount) FILTER (WHERE COALESCE(is_refund, false)), 0) AS refunded_total
+            FROM payments
+            WHERE status = 'confirmed'
+              AND is_active = true
+            GROUP BY reservation_id
+        ) t
+        WHERE t.reservation_id = r.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('reservations', 'refunded_total')
+    op.drop_column('reservations', 'paid_total')
@@ -0,0 +1,53 @@
+"""create_room_type_daily_facts_table
+
+Revision ID: 7e2b9d4c1f06
+Revises: c3f9a7e1d254
+Create Date: 2025-10-22 08:40:12.518093-03:00
+
+Carga inicial: após o upgrade, executar a task refresh_occupancy_facts
+(ou aguardar a execução noturna) para preencher a janela configurada.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2b9d4c1f06'
+down_revision = 'c3f9a7e1d254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('room_type_daily_facts',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('room_type_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('sold_room_nights', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('available_room_nights', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], name=op.f('fk_room_type_daily_facts_property_id_properties')),
+    sa.ForeignKeyConstraint(['room_type_id'], ['room_types.id'], name=op.f('fk_room_type_daily_facts_room_type_id_room_types')),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name=op.f('fk_room_type_daily_facts_tenant_id_tenants')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_room_type_daily_facts')),
+    sa.UniqueConstraint('property_id', 'room_type_id', 'date', name='unique_room_type_daily_fact')
+    )
+    op.create_index(op.f('ix_room_type_daily_facts_id'), 'room_type_daily_facts', ['id'], unique=False)
+    op.create_index(op.f('ix_room_type_daily_facts_property_id'), 'room_type_daily_facts', ['property_id'], unique=False)
+    op.create_index(op.f('ix_room_type_daily_facts_room_type_id'), 'room_type_daily_facts', ['room_type_id'], unique=False)
+    op.create_index(op.f('ix_room_type_daily_facts_tenant_id'), 'room_type_daily_facts', ['tenant_id'], unique=False)
+    op.create_index('ix_room_type_daily_facts_tenant_date', 'room_type_daily_facts', ['tenant_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_room_type_daily_facts_tenant_date', table_name='room_type_daily_facts')
+    op.drop_index(op.f('ix_room_type_daily_facts_tenant_id'), table_name='room_type_daily_facts')
+    op.drop_index(op.f('ix_room_type_daily_facts_room_type_id'), table_name='room_type_daily_facts')
+    op.drop_index(op.f('ix_room_type_daily_facts_property_id'), table_name='room_type_daily_facts')
+    op.drop_index(op.f('ix_room_type_daily_facts_id'), table_name='room_type_daily_facts')
+    op.drop_table('room_type_daily_facts')
@@ -0,0 +1,35 @@
+"""add_map_delta_indexes
+
+Revision ID: a41c6e8f2b37
+Revises: 7e2b9d4c1f06
+Create Date: 2025-10-22 10:05:47.902114-03:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6e8f2b37'
+down_revision = '7e2b9d4c1f06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_reservations_tenant_updated_at',
+        'reservations',
+        ['tenant_id', 'updated_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_reservation_rooms_updated_at',
+        'reservation_rooms',
+        ['updated_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_rooms_updated_at', table_name='reservation_rooms')
+    op.drop_index('ix_reservations_tenant_updated_at', table_name='reservations')
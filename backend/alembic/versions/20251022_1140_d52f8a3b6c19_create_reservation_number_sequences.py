@@ -0,0 +1,53 @@
+"""create_reservation_number_sequences
+
+Revision ID: d52f8a3b6c19
+Revises: a41c6e8f2b37
+Create Date: 2025-10-22 11:40:26.771350-03:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52f8a3b6c19'
+down_revision = 'a41c6e8f2b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reservation_number_sequences',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name=op.f('fk_reservation_number_sequences_tenant_id_tenants')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_reservation_number_sequences')),
+    sa.UniqueConstraint('tenant_id', 'year', name='unique_reservation_number_sequence')
+    )
+    op.create_index(op.f('ix_reservation_number_sequences_id'), 'reservation_number_sequences', ['id'], unique=False)
+    op.create_index(op.f('ix_reservation_number_sequences_tenant_id'), 'reservation_number_sequences', ['tenant_id'], unique=False)
+
+    # Backfill: continuar da maior sequência já emitida por tenant/ano
+    # (não da contagem, que repetiria números quando há buracos)
+    op.execute("""
+        INSERT INTO reservation_number_sequences
+            (tenant_id, year, last_value, created_at, updated_at, is_active)
+        SELECT tenant_id,
+               CAST(substring(reservation_number from 5 for 4) AS integer),
+               max(CAST(substring(reservation_number from 10) AS integer)),
+               now(), now(), true
+        FROM reservations
+        WHERE reservation_number ~ '^RES-[0-9]{4}-[0-9]{1,9}$'
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reservation_number_sequences_tenant_id'), table_name='reservation_number_sequences')
+    op.drop_index(op.f('ix_reservation_number_sequences_id'), table_name='reservation_number_sequences')
+    op.drop_table('reservation_number_sequences')
@@ -0,0 +1,46 @@
+"""create_wubook_availability_fingerprints
+
+Revision ID: b8e4f1a7c352
+Revises: d52f8a3b6c19
+Create Date: 2025-10-23 09:10:41.206318-03:00
+
+Sem backfill: a primeira sincronização de cada célula envia tudo e grava o
+fingerprint; a partir daí só vão as diferenças.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4f1a7c352'
+down_revision = 'd52f8a3b6c19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('wubook_availability_fingerprints',
+    sa.Column('mapping_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=32), nullable=False),
+    sa.Column('pushed_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['mapping_id'], ['wubook_room_mappings.id'], name=op.f('fk_wubook_availability_fingerprints_mapping_id_wubook_room_mappings'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name=op.f('fk_wubook_availability_fingerprints_tenant_id_tenants')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_wubook_availability_fingerprints')),
+    sa.UniqueConstraint('mapping_id', 'date', name='unique_wubook_availability_fingerprint')
+    )
+    op.create_index(op.f('ix_wubook_availability_fingerprints_id'), 'wubook_availability_fingerprints', ['id'], unique=False)
+    op.create_index(op.f('ix_wubook_availability_fingerprints_mapping_id'), 'wubook_availability_fingerprints', ['mapping_id'], unique=False)
+    op.create_index(op.f('ix_wubook_availability_fingerprints_tenant_id'), 'wubook_availability_fingerprints', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_wubook_availability_fingerprints_tenant_id'), table_name='wubook_availability_fingerprints')
+    op.drop_index(op.f('ix_wubook_availability_fingerprints_mapping_id'), table_name='wubook_availability_fingerprints')
+    op.drop_index(op.f('ix_wubook_availability_fingerprints_id'), table_name='wubook_availability_fingerprints')
+    op.drop_table('wubook_availability_fingerprints')
@@ -0,0 +1,33 @@
+"""scope_reservation_number_unique_to_tenant
+
+Revision ID: e3c7a9d15b42
+Revises: b8e4f1a7c352
+Create Date: 2025-10-24 08:30:12.518903-03:00
+
+Os números vêm de um contador por tenant e ano, então a unicidade passa a ser
+(tenant_id, reservation_number): tenants diferentes podem ter RES-2025-000001.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c7a9d15b42'
+down_revision = 'b8e4f1a7c352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_reservations_reservation_number', table_name='reservations')
+    op.create_index('ix_reservations_reservation_number', 'reservations', ['reservation_number'], unique=False)
+    op.create_unique_constraint(
+        'unique_reservation_number_per_tenant',
+        'reservations',
+        ['tenant_id', 'reservation_number']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('unique_reservation_number_per_tenant', 'reservations', type_='unique')
+    op.drop_index('ix_reservations_reservation_number', table_name='reservations')
+    op.create_index('ix_reservations_reservation_number', 'reservations', ['reservation_number'], unique=True)
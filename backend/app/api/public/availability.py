@@ -10,10 +10,8 @@ import logging
 from app.core.database import get_db
 from app.models.property import Property
 from app.models.room import Room
-from app.models.room_type import RoomType
 from app.models.room_availability import RoomAvailability
-from app.models.wubook_rate_plan import WuBookRatePlan
-from app.services.room_availability_service import RoomAvailabilityService
+from app.services.public_availability_service import PublicAvailabilityService
 from app.api.public.middleware import verify_public_access
 
 router = APIRouter()
@@ -33,7 +31,8 @@ def search_availability(
 ):
     """
     Busca disponibilidade de quartos para datas específicas.
-    Retorna quartos disponíveis com tarifas calculadas.
+    Retorna quartos disponíveis com tarifas calculadas e o agrupamento
+    por tipo de quarto (room_types) com a quantidade de unidades livres.
     
     Endpoint público - não requer autenticação.
     """
@@ -67,29 +66,13 @@ def search_availability(
                 detail="Propriedade não encontrada"
             )
         
-        # Buscar quartos disponíveis
-        availability_service = RoomAvailabilityService(db)
-        
-        # Query base de quartos
-        rooms_query = db.query(Room).join(RoomType).filter(
-            Room.tenant_id == property_obj.tenant_id,
-            Room.is_active == True,
-            Room.is_operational == True,
-            RoomType.is_bookable == True
+        # Quartos livres em consultas agrupadas (tipos, janela, ledger e rate plans)
+        search_result = PublicAvailabilityService(db).search(
+            property_obj, check_in, check_out, total_guests, room_type_id
         )
+        results = search_result['available_rooms']
         
-        # Filtrar por tipo se especificado
-        if room_type_id:
-            rooms_query = rooms_query.filter(Room.room_type_id == room_type_id)
-        
-        # Filtrar por capacidade
-        rooms_query = rooms_query.filter(
-            Room.max_occupancy >= total_guests
-        )
-        
-        available_rooms = rooms_query.all()
-        
-        if not available_rooms:
+        if not results:
             return {
                 "property_name": property_obj.name,
                 "check_in": check_in.isoformat(),
@@ -98,81 +81,10 @@ def search_availability(
                 "adults": adults,
                 "children": children,
                 "available_rooms": [],
+                "room_types": [],
                 "message": "Nenhum quarto disponível para o período e capacidade solicitados"
             }
         
-        # Verificar disponibilidade real de cada quarto
-        results = []
-        
-        for room in available_rooms:
-            # Verificar se está disponível em todas as noites
-            availability_check = availability_service.check_room_availability(
-                room.id,
-                check_in,
-                check_out,
-                property_obj.tenant_id,
-                validate_restrictions=False
-            )
-            
-            if not availability_check['available']:
-                continue
-            
-            # Calcular tarifa total
-            total_rate = availability_check.get('total_rate', 0)
-            
-            # Buscar rate plan padrão para o quarto
-            default_rate_plan = db.query(WuBookRatePlan).filter(
-                WuBookRatePlan.room_type_id == room.room_type_id,
-                WuBookRatePlan.is_active == True,
-                WuBookRatePlan.is_default == True
-            ).first()
-            
-            rate_plan_info = None
-            if default_rate_plan:
-                rate_plan_info = {
-                    "id": default_rate_plan.id,
-                    "name": default_rate_plan.name,
-                    "description": default_rate_plan.description,
-                    "cancellation_policy": default_rate_plan.cancellation_policy
-                }
-            
-            # Montar informações do quarto
-            room_info = {
-                "room_id": room.id,
-                "room_number": room.room_number,
-                "room_name": room.name,
-                "room_type": {
-                    "id": room.room_type.id,
-                    "name": room.room_type.name,
-                    "slug": room.room_type.slug,
-                    "description": room.room_type.description,
-                    "base_capacity": room.room_type.base_capacity,
-                    "max_capacity": room.room_type.max_capacity,
-                    "size_m2": float(room.room_type.size_m2) if room.room_type.size_m2 else None,
-                    "bed_configuration": room.room_type.bed_configuration,
-                    "amenities": room.room_type.amenities or []
-                },
-                "max_occupancy": room.max_occupancy,
-                "additional_amenities": room.additional_amenities or [],
-                "pricing": {
-                    "total_amount": float(total_rate) if total_rate else 0.0,
-                    "nights": nights,
-                    "average_per_night": float(total_rate / nights) if total_rate and nights > 0 else 0.0,
-                    "currency": "BRL"
-                },
-                "rate_plan": rate_plan_info,
-                "availability": {
-                    "is_available": True,
-                    "check_in": check_in.isoformat(),
-                    "check_out": check_out.isoformat()
-                }
-            }
-            
-            results.append(room_info)
-        
-        # Ordenar por preço (menor para maior)
-        results.sort(key=lambda x: x["pricing"]["total_amount"])
-        
         logger.info(f"Busca pública: {slug} | {check_in} a {check_out} | {len(results)} quartos disponíveis")
         
         return {
@@ -184,6 +96,7 @@ def search_availability(
             "children": children,
             "total_guests": total_guests,
             "available_rooms": results,
+            "room_types": search_result['room_types'],
             "total_results": len(results)
         }
         
@@ -1,6 +1,6 @@
 # backend/app/api/public/booking.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -8,9 +8,13 @@ import secrets
 import logging
 
 from app.core.database import get_db
-from app.schemas.public_booking import PublicBookingCreate, PublicBookingResponse
+from app.schemas.public_booking import (
+    PublicBookingCreate, PublicBookingResponse,
+    PublicBookingHoldCreate, PublicBookingHoldResponse
+)
 from app.services.public_booking_service import PublicBookingService
 from app.api.public.middleware import verify_public_access
+from app.api.public.cache import cached_public_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -99,6 +103,52 @@ def create_public_booking(
         )
 
 
+@router.post("/hold", response_model=PublicBookingHoldResponse, status_code=status.HTTP_201_CREATED)
+def create_booking_hold(
+    hold_data: PublicBookingHoldCreate,
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_public_access)
+):
+    """
+    Segura o quarto/período no início do checkout (expira sozinho).
+    
+    Enviar o hold_id retornado em /create converte o hold em reserva;
+    reenviar com outro período/quarto renova o hold.
+    
+    Endpoint público - não requer autenticação.
+    """
+    try:
+        booking_service = PublicBookingService(db)
+        return PublicBookingHoldResponse(**booking_service.create_hold(hold_data))
+        
+    except ValueError as e:
+        logger.warning(f"Erro de validação ao criar hold de reserva: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erro ao criar hold de reserva: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao reservar quarto temporariamente. Tente novamente."
+        )
+
+
+@router.delete("/hold/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_booking_hold(
+    hold_id: str,
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_public_access)
+):
+    """
+    Libera um hold (hóspede desistiu do checkout).
+    
+    Endpoint público - não requer autenticação.
+    """
+    PublicBookingService(db).release_hold(hold_id)
+
+
 @router.get("/track/{token}", response_model=Dict[str, Any])
 def track_booking(
     token: str,
@@ -261,54 +311,19 @@ def calculate_booking_price(
 @router.get("/payment-methods/{slug}")
 def get_available_payment_methods(
     slug: str,
+    request: Request,
     db: Session = Depends(get_db),
     _: bool = Depends(verify_public_access)
 ):
     """
     Retorna métodos de pagamento disponíveis para a propriedade.
     
-    Endpoint público.
+    Endpoint público (resposta em cache com ETag).
     """
     try:
-        from app.models.property import Property
-        from app.models.payment_method import PaymentMethod
-        
-        property_obj = db.query(Property).filter(
-            Property.slug == slug,
-            Property.is_active == True
-        ).first()
-        
-        if not property_obj:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Propriedade não encontrada"
-            )
-        
-        # Buscar métodos de pagamento ativos do tenant, ordenados
-        payment_methods = db.query(PaymentMethod).filter(
-            PaymentMethod.tenant_id == property_obj.tenant_id,
-            PaymentMethod.is_active == True
-        ).order_by(PaymentMethod.display_order, PaymentMethod.name).all()
-        
-        return {
-            "property_name": property_obj.name,
-            "property_slug": slug,
-            "payment_methods": [
-                {
-                    "id": pm.id,
-                    "name": pm.name,
-                    "code": pm.code,  # ✅ CORRIGIDO: usar 'code' ao invés de 'payment_type'
-                    "description": pm.description,
-                    "icon": pm.icon if pm.icon else (pm.settings.get("icon") if pm.settings else None),
-                    "color": pm.color if pm.color else (pm.settings.get("color") if pm.settings else None),
-                    "requires_reference": pm.requires_reference,
-                    "has_fees": pm.has_fees,
-                    "display_order": pm.display_order
-                }
-                for pm in payment_methods
-            ],
-            "total": len(payment_methods)
-        }
+        return cached_public_response(
+            request, "payment-methods", slug, lambda: _build_payment_methods(db, slug)
+        )
         
     except HTTPException:
         raise
@@ -317,4 +332,37 @@ def get_available_payment_methods(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao buscar métodos de pagamento"
-        )
\ No newline at end of file
+        )
+
+
+def _build_payment_methods(db: Session, slug: str):
+    from app.models.payment_method import PaymentMethod
+    from app.api.public.properties import get_public_property
+    
+    property_obj = get_public_property(db, slug)
+    
+    # Buscar métodos de pagamento ativos do tenant, ordenados
+    payment_methods = db.query(PaymentMethod).filter(
+        PaymentMethod.tenant_id == property_obj.tenant_id,
+        PaymentMethod.is_active == True
+    ).order_by(PaymentMethod.display_order, PaymentMethod.name).all()
+    
+    return property_obj.tenant_id, {
+        "property_name": property_obj.name,
+        "property_slug": slug,
+        "payment_methods": [
+            {
+                "id": pm.id,
+                "name": pm.name,
+                "code": pm.code,  # ✅ CORRIGIDO: usar 'code' ao invés de 'payment_type'
+                "description": pm.description,
+                "icon": pm.icon if pm.icon else (pm.settings.get("icon") if pm.settings else None),
+                "color": pm.color if pm.color else (pm.settings.get("color") if pm.settings else None),
+                "requires_reference": pm.requires_reference,
+                "has_fees": pm.has_fees,
+                "display_order": pm.display_order
+            }
+            for pm in payment_methods
+        ],
+        "total": len(payment_methods)
+    }
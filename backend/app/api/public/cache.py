@@ -0,0 +1,64 @@
+# backend/app/api/public/cache.py
+
+from fastapi import Request, Response, status
+from typing import Callable, Dict, Any, Optional, Tuple
+from urllib.parse import urlencode
+import hashlib
+import json
+import logging
+
+from app.core.redis import redis_cache
+
+logger = logging.getLogger(__name__)
+
+# O cliente sempre revalida; o ETag transforma a revalidação em um 304 servido do Redis
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação de If-None-Match (aceita lista e '*')"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip() for tag in if_none_match.split(",")}
+
+
+def _cache_params(request: Request) -> str:
+    """Query string normalizada (ordem dos parâmetros não muda a chave)"""
+    return urlencode(sorted(request.query_params.multi_items())) or "-"
+
+
+def cached_public_response(
+    request: Request,
+    endpoint: str,
+    slug: str,
+    build: Callable[[], Tuple[int, Dict[str, Any]]]
+) -> Response:
+    """
+    Resposta JSON de um endpoint público com cache compartilhado no Redis.
+
+    A chave é (slug, endpoint, query string); build() só é chamado em cache
+    miss e retorna (tenant_id, payload) - o tenant indexa a chave para o purge
+    feito pelos modelos (Property, BookingEngineConfig, RoomType,
+    PaymentMethod). HTTPException levantada por build() não é cacheada.
+    Sem Redis a resposta é montada a cada requisição, mantendo ETag e 304.
+    """
+    params = _cache_params(request)
+    cached = redis_cache.get_public_response(slug, endpoint, params)
+
+    if cached is None:
+        tenant_id, payload = build()
+        body = json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":"))
+        cached = {
+            'etag': f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"',
+            'body': body
+        }
+        redis_cache.set_public_response(tenant_id, slug, endpoint, params, cached)
+
+    headers = {"ETag": cached['etag'], "Cache-Control": PUBLIC_CACHE_CONTROL}
+
+    if _etag_matches(request.headers.get("if-none-match"), cached['etag']):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=cached['body'], media_type="application/json", headers=headers)
@@ -2,66 +2,123 @@
 
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Any
+import math
 import time
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.core.middleware import send_with_headers
 
 logger = logging.getLogger(__name__)
 
 
 # ============== RATE LIMITING ==============
 
+# GCRA: uma única chave por cliente guardando o TAT (theoretical arrival time)
+# em ms. O relógio é o do Redis, comum a todos os workers.
+# Retorna {permitido, restantes, retry_after_ms, reset_ms}.
+_GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+if tat - now > tolerance then
+    return {0, 0, tat - now - tolerance, tat - now}
+end
+
+local new_tat = tat + emission
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+local remaining = math.floor((tolerance + emission - (new_tat - now)) / emission)
+return {1, remaining, 0, new_tat - now}
+"""
+
+
 class RateLimiter:
     """
-    Sistema simples de rate limiting em memória.
-    Para produção, considere usar Redis.
+    Rate limiting por cliente (IP) compartilhado entre workers via Redis.
+
+    Usa GCRA: PUBLIC_API_RATE_LIMIT_PER_MINUTE requisições por
+    PUBLIC_API_RATE_LIMIT_WINDOW segundos, com rajada de até o limite inteiro.
+    Cada cliente ocupa uma chave com expiração e a verificação (limite e
+    restantes) é um único script Lua atômico. Sem Redis, aplica o mesmo
+    algoritmo em memória, por processo.
     """
+
+    PREFIX = "ratelimit:public"
+    _LOCAL_MAX_KEYS = 10000
+
     def __init__(self):
-        self.requests = defaultdict(list)
-        self.max_requests = 100  # Máximo de requisições
-        self.window = 60  # Janela de tempo em segundos (1 minuto)
-    
-    def is_allowed(self, identifier: str) -> bool:
+        self.max_requests = settings.PUBLIC_API_RATE_LIMIT_PER_MINUTE
+        self.window = settings.PUBLIC_API_RATE_LIMIT_WINDOW
+        self._emission_ms = max(1, (self.window * 1000) // max(1, self.max_requests))
+        self._tolerance_ms = self._emission_ms * (max(1, self.max_requests) - 1)
+        self._script = None
+        self._script_client = None
+        self._local: Dict[str, float] = {}
+
+    def hit(self, identifier: str) -> Dict[str, Any]:
         """
-        Verifica se o identificador (IP) está dentro do limite.
-        
-        Args:
-            identifier: IP do cliente
-            
+        Registra uma requisição do identificador (IP) e verifica o limite.
+
         Returns:
-            True se permitido, False se excedeu o limite
+            Dict com allowed, limit, remaining, retry_after e reset (segundos)
         """
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.window)
-        
-        # Remover requisições antigas
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if req_time > cutoff
-        ]
-        
-        # Verificar se excedeu o limite
-        if len(self.requests[identifier]) >= self.max_requests:
-            return False
-        
-        # Registrar nova requisição
-        self.requests[identifier].append(now)
-        return True
-    
-    def get_remaining(self, identifier: str) -> int:
-        """Retorna quantas requisições restam"""
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.window)
-        
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if req_time > cutoff
-        ]
-        
-        return max(0, self.max_requests - len(self.requests[identifier]))
+        client = get_redis_client()
+        result = None
+
+        if client is not None:
+            try:
+                if self._script_client is not client:
+                    self._script = client.register_script(_GCRA_SCRIPT)
+                    self._script_client = client
+                result = self._script(
+                    keys=[f"{self.PREFIX}:{identifier}"],
+                    args=[self._emission_ms, self._tolerance_ms]
+                )
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Rate limit sem Redis, usando limite local: {e}")
+
+        if result is None:
+            result = self._hit_local(identifier)
+
+        allowed, remaining, retry_after_ms, reset_ms = (int(value) for value in result)
+        return {
+            'allowed': bool(allowed),
+            'limit': self.max_requests,
+            'remaining': remaining,
+            'retry_after': math.ceil(retry_after_ms / 1000),
+            'reset': math.ceil(reset_ms / 1000)
+        }
+
+    def _hit_local(self, identifier: str):
+        """Mesmo GCRA do script Lua, em memória (apenas este processo)"""
+        now = time.monotonic() * 1000
+
+        if len(self._local) > self._LOCAL_MAX_KEYS:
+            self._local = {key: tat for key, tat in self._local.items() if tat > now}
+
+        tat = max(self._local.get(identifier, now), now)
+        if tat - now > self._tolerance_ms:
+            return 0, 0, tat - now - self._tolerance_ms, tat - now
+
+        new_tat = tat + self._emission_ms
+        self._local[identifier] = new_tat
+        remaining = (self._tolerance_ms + self._emission_ms - (new_tat - now)) // self._emission_ms
+        return 1, remaining, 0, new_tat - now
 
 
 # Instância global do rate limiter
@@ -70,78 +127,110 @@ rate_limiter = RateLimiter()
 
 # ============== MIDDLEWARE DE RATE LIMITING ==============
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+def _is_public_request(scope: Scope) -> bool:
+    return scope["type"] == "http" and scope["path"].startswith("/api/public")
+
+
+def _client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
     """
-    Middleware para aplicar rate limiting em rotas públicas.
+    Middleware ASGI para aplicar rate limiting em rotas públicas.
+    Não envolve o corpo da resposta: apenas adiciona os headers X-RateLimit-*.
     """
-    async def dispatch(self, request: Request, call_next: Callable):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Aplicar apenas em rotas públicas
-        if not request.url.path.startswith("/api/public"):
-            return await call_next(request)
-        
+        if not _is_public_request(scope):
+            await self.app(scope, receive, send)
+            return
+
         # Identificar cliente pelo IP
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Verificar rate limit
-        if not rate_limiter.is_allowed(client_ip):
+        client_ip = _client_ip(scope)
+
+        # Verificar rate limit (uma ida ao Redis, fora do event loop)
+        limit = await run_in_threadpool(rate_limiter.hit, client_ip)
+
+        if not limit['allowed']:
             logger.warning(f"Rate limit excedido para IP: {client_ip}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "detail": "Muitas requisições. Tente novamente em alguns instantes.",
-                    "retry_after": rate_limiter.window
+                    "retry_after": limit['retry_after']
                 },
                 headers={
-                    "Retry-After": str(rate_limiter.window),
-                    "X-RateLimit-Limit": str(rate_limiter.max_requests),
-                    "X-RateLimit-Remaining": "0"
+                    "Retry-After": str(limit['retry_after']),
+                    "X-RateLimit-Limit": str(limit['limit']),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(limit['reset'])
                 }
             )
-        
+            await response(scope, receive, send)
+            return
+
         # Adicionar headers de rate limit na resposta
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(rate_limiter.max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(rate_limiter.get_remaining(client_ip))
-        response.headers["X-RateLimit-Window"] = str(rate_limiter.window)
-        
-        return response
+        headers = {
+            "X-RateLimit-Limit": str(limit['limit']),
+            "X-RateLimit-Remaining": str(limit['remaining']),
+            "X-RateLimit-Reset": str(limit['reset']),
+            "X-RateLimit-Window": str(rate_limiter.window)
+        }
+        await self.app(scope, receive, send_with_headers(send, lambda: headers))
 
 
 # ============== MIDDLEWARE DE LOGGING ==============
 
-class PublicAPILoggingMiddleware(BaseHTTPMiddleware):
+class PublicAPILoggingMiddleware:
     """
-    Middleware para logging de requisições públicas.
+    Middleware ASGI para logging de requisições públicas.
+    X-Process-Time é o tempo até o início da resposta; o log final usa o
+    tempo total (inclui o envio do corpo, relevante para streaming).
     """
-    async def dispatch(self, request: Request, call_next: Callable):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Aplicar apenas em rotas públicas
-        if not request.url.path.startswith("/api/public"):
-            return await call_next(request)
-        
-        start_time = time.time()
-        client_ip = request.client.host if request.client else "unknown"
-        
+        if not _is_public_request(scope):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        client_ip = _client_ip(scope)
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
+
         # Log da requisição
-        logger.info(f"[PUBLIC API] {request.method} {request.url.path} | IP: {client_ip}")
-        
-        # Processar requisição
-        response = await call_next(request)
-        
-        # Calcular tempo de processamento
-        process_time = time.time() - start_time
-        
-        # Log da resposta
-        logger.info(
-            f"[PUBLIC API] {request.method} {request.url.path} | "
-            f"Status: {response.status_code} | "
-            f"Time: {process_time:.3f}s | "
-            f"IP: {client_ip}"
-        )
-        
-        # Adicionar header de tempo de processamento
-        response.headers["X-Process-Time"] = f"{process_time:.3f}"
-        
-        return response
+        logger.info(f"[PUBLIC API] {method} {path} | IP: {client_ip}")
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "X-Process-Time", f"{time.perf_counter() - start_time:.3f}"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Log da resposta
+            logger.info(
+                f"[PUBLIC API] {method} {path} | "
+                f"Status: {status_code} | "
+                f"Time: {time.perf_counter() - start_time:.3f}s | "
+                f"IP: {client_ip}"
+            )
 
 
 # ============== DEPENDENCY PARA VERIFICAÇÃO DE ACESSO ==============
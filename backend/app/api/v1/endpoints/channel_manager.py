@@ -9,6 +9,7 @@ import logging
 import math
 
 from app.core.database import get_db
+from app.core.redis import invalidate_availability_after_commit
 from app.api.deps import get_current_active_user
 from app.models.user import User
 
@@ -765,25 +766,36 @@ def get_availability_calendar(
                 detail="Período não pode exceder 365 dias"
             )
         
-        availability_query = db.query(RoomAvailability).join(Room).filter(
-            RoomAvailability.tenant_id == current_user.tenant_id,
-            RoomAvailability.date >= calendar_request.date_from,
-            RoomAvailability.date <= calendar_request.date_to,
-            RoomAvailability.is_active == True,
-            Room.is_active == True
-        )
-        
-        if calendar_request.room_ids:
-            availability_query = availability_query.filter(
-                RoomAvailability.room_id.in_(calendar_request.room_ids)
-            )
-        
         if calendar_request.property_id:
-            availability_query = availability_query.filter(
-                Room.property_id == calendar_request.property_id
+            # Janela da propriedade via cache Redis (invalidada por availability:updated)
+            window = RoomAvailabilityService(db).get_property_availability_window(
+                calendar_request.property_id,
+                calendar_request.date_from,
+                calendar_request.date_to,
+                current_user.tenant_id
             )
-        
-        availabilities = availability_query.all()
+            selected_room_ids = set(calendar_request.room_ids) if calendar_request.room_ids else None
+            availabilities = [
+                cell
+                for room_id, cells in window.items()
+                if selected_room_ids is None or room_id in selected_room_ids
+                for cell in cells.values()
+            ]
+        else:
+            availability_query = db.query(RoomAvailability).join(Room).filter(
+                RoomAvailability.tenant_id == current_user.tenant_id,
+                RoomAvailability.date >= calendar_request.date_from,
+                RoomAvailability.date <= calendar_request.date_to,
+                RoomAvailability.is_active == True,
+                Room.is_active == True
+            )
+            
+            if calendar_request.room_ids:
+                availability_query = availability_query.filter(
+                    RoomAvailability.room_id.in_(calendar_request.room_ids)
+                )
+            
+            availabilities = availability_query.all()
         
         rooms_query = db.query(Room).filter(
             Room.tenant_id == current_user.tenant_id,
@@ -881,10 +893,7 @@ def get_availability_calendar(
                 "pending_days": len([a for a in room_availabilities if a.sync_pending])
             })
         
-        configs = db.query(WuBookConfiguration).filter(
-            WuBookConfiguration.tenant_id == current_user.tenant_id,
-            WuBookConfiguration.is_active == True
-        ).all()
+        configs = WuBookConfigurationService(db).get_active_configurations_summary(current_user.tenant_id)
         
         channels_summary = []
         for config in configs:
@@ -1023,6 +1032,9 @@ def bulk_update_availability(
             updates[RoomAvailability.sync_pending] = True
         
         updated_count = existing_query.update(updates, synchronize_session=False)
+        invalidate_availability_after_commit(
+            db, current_user.tenant_id, valid_room_ids, bulk_request.date_from, bulk_request.date_to
+        )
         db.commit()
         
         completed_at = datetime.utcnow()
@@ -1387,6 +1399,9 @@ def reset_sync_errors(
             RoomAvailability.updated_at: datetime.utcnow()
         }, synchronize_session=False)
         
+        if count > 0:
+            invalidate_availability_after_commit(db, current_user.tenant_id, room_ids or None)
+        
         db.commit()
         
         logger.info(f"Reset concluído - {count} registros")
@@ -1443,6 +1458,9 @@ def force_mark_pending(
             RoomAvailability.updated_at: datetime.utcnow()
         }, synchronize_session=False)
         
+        if count > 0:
+            invalidate_availability_after_commit(db, current_user.tenant_id, room_ids or None, date_from, date_to)
+        
         db.commit()
         
         logger.info(f"Marcação concluída - {count} registros")
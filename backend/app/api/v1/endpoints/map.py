@@ -1,7 +1,7 @@
 # backend/app/api/v1/endpoints/map.py
 
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Body, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 import math
@@ -19,6 +19,16 @@ from app.models.user import User
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca de If-None-Match (aceita lista e '*')"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
 @router.get("/data", response_model=MapResponse)
 def get_map_data(
     request: Request,
@@ -30,10 +40,14 @@ def get_map_data(
     room_type_ids: Optional[str] = Query(None, description="IDs dos tipos de quarto separados por vírgula"),
     include_out_of_order: bool = Query(True, description="Incluir quartos fora de funcionamento"),
     include_cancelled: bool = Query(False, description="Incluir reservas canceladas"),
-    status_filter: Optional[str] = Query(None, description="Status das reservas separados por vírgula")
+    status_filter: Optional[str] = Query(None, description="Status das reservas separados por vírgula"),
+    since: Optional[datetime] = Query(None, description="Retorna apenas o delta desde este instante (generated_at do último delta)")
 ):
     """
-    Busca dados completos para o mapa de quartos
+    Busca dados completos para o mapa de quartos.
+    
+    - ETag/If-None-Match: sem alterações no período, responde 304 sem corpo.
+    - since: responde MapDeltaResponse só com as reservas/quartos alterados.
     """
     map_service = MapService(db)
     
@@ -71,7 +85,19 @@ def get_map_data(
     )
     
     try:
-        return map_service.get_map_data(current_user.tenant_id, map_request)
+        etag = map_service.get_map_etag(current_user.tenant_id, map_request, since)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        if since:
+            payload = map_service.get_map_delta(current_user.tenant_id, map_request, since)
+        else:
+            payload = map_service.get_map_data(current_user.tenant_id, map_request)
+        
+        # Resposta montada com model_construct: serializar direto, sem revalidar
+        return Response(content=payload.model_dump_json(), media_type="application/json", headers=headers)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
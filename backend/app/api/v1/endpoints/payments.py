@@ -3,7 +3,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Body
 from sqlalchemy.orm import Session
-from datetime import date, datetime
+from datetime import date
 
 from app.core.database import get_db
 from app.services.payment_service import PaymentService
@@ -691,34 +691,14 @@ def execute_bulk_operation(
                 )
             
             elif operation_data.operation == "refund":
-                # Para estorno, criar um novo pagamento negativo
-                from app.schemas.payment import PaymentCreate
-                refund_data = PaymentCreate(
-                    reservation_id=payment.reservation_id,
-                    amount=payment.amount,
-                    payment_method=payment.payment_method,
-                    payment_date=datetime.utcnow(),
-                    reference_number=f"REFUND-{payment.payment_number}",
-                    notes=f"Estorno de {payment.payment_number}. {operation_data.notes or ''}".strip(),
-                    is_partial=False
-                )
-                
-                # Criar pagamento de estorno
-                refund_payment = payment_service.create_payment(
-                    payment_data=refund_data,
+                # Estorno: PaymentService cria o pagamento com is_refund e atualiza os totais da reserva
+                result = payment_service.create_refund(
+                    payment=payment,
                     tenant_id=current_user.tenant_id,
                     current_user=current_user,
+                    notes=operation_data.notes,
                     request=request
                 )
-                
-                if refund_payment:
-                    # Marcar como estorno
-                    refund_payment.is_refund = True
-                    refund_payment.status = "confirmed"
-                    db.commit()
-                    result = refund_payment
-                else:
-                    result = None
             
             if result:
                 success_count += 1
@@ -3,7 +3,7 @@
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi import status as http_status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_, or_, func, text, desc, asc, not_
 from datetime import datetime, date, timedelta
@@ -11,6 +11,8 @@ from decimal import Decimal
 import math
 import logging
 import io
+import os
+import uuid
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
@@ -20,6 +22,10 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 from app.core.database import get_db
 from app.services.reservation_service import ReservationService
+from app.services.dashboard_service import DashboardService
+from app.services.reservation_export_service import ReservationExportService
+from app.services.occupancy_fact_service import OccupancyFactService
+from app.core.config import settings
 from app.services.voucher_service import VoucherService
 from app.services.voucher_service import VoucherService
 from app.schemas.reservation import (
@@ -64,29 +70,14 @@ def get_unpaid_reservations(
 ):
     """Busca reservas sem nenhum pagamento (R$0)"""
     try:
-        from app.models.payment import Payment
-        
-        # Subquery para calcular total pago
-        paid_subquery = db.query(
-            Payment.reservation_id,
-            func.sum(Payment.amount).label('total_paid')
-        ).filter(
-            Payment.tenant_id == current_user.tenant_id,
-            Payment.status == 'confirmed',
-            Payment.is_refund == False,
-            Payment.is_active == True
-        ).group_by(Payment.reservation_id).subquery()
-        
-        # Query principal
+        # Query principal (total pago armazenado na reserva)
         base_query = db.query(Reservation).options(
             joinedload(Reservation.guest)
-        ).outerjoin(
-            paid_subquery, Reservation.id == paid_subquery.c.reservation_id
         ).filter(
             Reservation.tenant_id == current_user.tenant_id,
             Reservation.is_active == True,
             Reservation.status.in_(['confirmed', 'pending', 'checked_in']),
-            func.coalesce(paid_subquery.c.total_paid, 0) == 0,  # Sem pagamentos
+            Reservation.paid_total == 0,  # Sem pagamentos
             Reservation.total_amount > 0  # Com valor a ser pago
         )
         
@@ -527,6 +518,56 @@ def create_reservation_filters(
     return ReservationFilters(**filter_data)
 
 
+# ===== PAGINAÇÃO (OFFSET OU CURSOR) =====
+
+def fetch_reservations_page(
+    reservation_service: ReservationService,
+    tenant_id: int,
+    filters: ReservationFilters,
+    page: int,
+    per_page: int,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    count: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Busca uma página de reservas no modo offset (page) ou cursor (keyset em
+    created_at, id) e calcula o total conforme o modo de contagem:
+    exact, estimated (limitada a RESERVATION_COUNT_ESTIMATE_CAP) ou none.
+    """
+    if pagination == "cursor":
+        reservations, next_cursor = reservation_service.get_reservations_page(
+            tenant_id, filters, cursor, per_page
+        )
+        count = count or "none"
+    else:
+        reservations = reservation_service.get_reservations(
+            tenant_id, filters, (page - 1) * per_page, per_page
+        )
+        next_cursor = None
+        count = count or "exact"
+    
+    total = None
+    pages = None
+    total_is_estimate = False
+    if count == "exact":
+        total = reservation_service.count_reservations(tenant_id, filters)
+    elif count == "estimated":
+        total, is_exact = reservation_service.count_reservations_capped(tenant_id, filters)
+        total_is_estimate = not is_exact
+    
+    if total is not None:
+        pages = math.ceil(total / per_page) if total > 0 else 0
+    
+    return {
+        "reservations": reservations,
+        "total": total,
+        "pages": pages,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
+    }
+
+
 # ===== ENDPOINT PRINCIPAL COM MULTI-SELECT =====
 
 @router.get("/", response_model=ReservationListResponse)
@@ -537,6 +578,11 @@ def list_reservations(
     page: int = Query(1, ge=1, description="Página (inicia em 1)"),
     per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
     
+    # Paginação por cursor (keyset) e contagem opcional
+    pagination: str = Query("offset", regex="^(offset|cursor)$", description="Modo de paginação: offset (page) ou cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em next_cursor (modo cursor)"),
+    count: Optional[str] = Query(None, regex="^(exact|estimated|none)$", description="Total: exact, estimated ou none (padrão: exact no modo offset, none no modo cursor)"),
+    
     # Filtros básicos existentes
     status: Optional[str] = Query(None, description="Filtrar por status (filtro único)"),
     source: Optional[str] = Query(None, description="Filtrar por canal (filtro único)"),
@@ -667,18 +713,20 @@ def list_reservations(
         
         # Usar o service atualizado
         reservation_service = ReservationService(db)
-        skip = (page - 1) * per_page
         
-        # Buscar reservas com filtros (incluindo multi-select)
-        reservations = reservation_service.get_reservations(
-            current_user.tenant_id, 
-            filters, 
-            skip, 
-            per_page
+        # Buscar reservas com filtros (incluindo multi-select), por offset ou cursor
+        result = fetch_reservations_page(
+            reservation_service,
+            current_user.tenant_id,
+            filters,
+            page,
+            per_page,
+            pagination=pagination,
+            cursor=cursor,
+            count=count
         )
-        
-        # Contar total
-        total = reservation_service.count_reservations(current_user.tenant_id, filters)
+        reservations = result["reservations"]
+        total = result["total"]
         
         # ===== CONVERTER PARA RESPONSE (MESMO CÓDIGO EXISTENTE) =====
         
@@ -781,17 +829,21 @@ def list_reservations(
             reservation_response = ReservationResponse(**reservation_dict)
             reservations_response.append(reservation_response)
         
-        # Calcular páginas
-        total_pages = math.ceil(total / per_page) if total > 0 else 0
-        
         return ReservationListResponse(
             reservations=reservations_response,
             total=total,
             page=page,
-            pages=total_pages,
-            per_page=per_page
+            pages=result["pages"],
+            per_page=per_page,
+            next_cursor=result["next_cursor"],
+            total_is_estimate=result["total_is_estimate"]
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erro ao listar reservas: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -810,6 +862,11 @@ def get_reservations_detailed(
     page: int = Query(1, ge=1, description="Página (inicia em 1)"),
     per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
     
+    # Paginação por cursor (keyset) e contagem opcional
+    pagination: str = Query("offset", regex="^(offset|cursor)$", description="Modo de paginação: offset (page) ou cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em next_cursor (modo cursor)"),
+    count: Optional[str] = Query(None, regex="^(exact|estimated|none)$", description="Total: exact, estimated ou none (padrão: exact no modo offset, none no modo cursor)"),
+    
     # Filtros básicos
     status: Optional[str] = Query(None, description="Status da reserva (filtro único)"),
     source: Optional[str] = Query(None, description="Origem da reserva (filtro único)"),
@@ -924,18 +981,20 @@ def get_reservations_detailed(
         
         # Usar o service atualizado
         reservation_service = ReservationService(db)
-        skip = (page - 1) * per_page
         
-        # Buscar reservas com filtros (incluindo multi-select)
-        reservations = reservation_service.get_reservations(
-            current_user.tenant_id, 
-            filters, 
-            skip, 
-            per_page
+        # Buscar reservas com filtros (incluindo multi-select), por offset ou cursor
+        result = fetch_reservations_page(
+            reservation_service,
+            current_user.tenant_id,
+            filters,
+            page,
+            per_page,
+            pagination=pagination,
+            cursor=cursor,
+            count=count
         )
-        
-        # Contar total
-        total = reservation_service.count_reservations(current_user.tenant_id, filters)
+        reservations = result["reservations"]
+        total = result["total"]
         
         # Converter para response expandido com guest_phone garantido
         detailed_reservations = []
@@ -1023,7 +1082,7 @@ def get_reservations_detailed(
         
         # Calcular estatísticas da busca usando total_paid
         summary = None
-        if total > 0 and reservations:
+        if reservations:
             total_amount = sum(float(r.total_amount or 0) for r in reservations)
             total_paid = sum(float(r.total_paid or 0) for r in reservations)
             total_pending = total_amount - total_paid
@@ -1054,18 +1113,22 @@ def get_reservations_detailed(
                 "avg_amount": round(avg_amount, 2)
             }
         
-        # Calcular páginas
-        pages = math.ceil(total / per_page) if total > 0 else 0
-        
         return ReservationListResponseWithDetails(
             reservations=detailed_reservations,
             total=total,
             page=page,
-            pages=pages,
+            pages=result["pages"],
             per_page=per_page,
+            next_cursor=result["next_cursor"],
+            total_is_estimate=result["total_is_estimate"],
             summary=summary
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erro ao listar reservas detalhadas: {str(e)}")
         raise HTTPException(
@@ -1270,32 +1333,15 @@ def get_checked_in_pending_payment(
 ):
     """Obtém reservas com check-in feito e saldo pendente"""
     try:
-        # Query mais complexa para usar total_paid
-        from app.models.payment import Payment
-        
-        # Subquery para calcular total pago de cada reserva
-        paid_subquery = db.query(
-            Payment.reservation_id,
-            func.sum(Payment.amount).label('total_paid')
-        ).filter(
-            Payment.tenant_id == current_user.tenant_id,
-            Payment.status == 'confirmed',
-            Payment.is_refund == False,
-            Payment.is_active == True
-        ).group_by(Payment.reservation_id).subquery()
-        
-        # Query principal com join da subquery
+        # Query principal usando o total pago armazenado na reserva
         base_query = db.query(Reservation).options(
             joinedload(Reservation.guest),
             selectinload(Reservation.reservation_rooms).joinedload(ReservationRoom.room)
-        ).outerjoin(
-            paid_subquery, Reservation.id == paid_subquery.c.reservation_id
         ).filter(
             Reservation.tenant_id == current_user.tenant_id,
             Reservation.is_active == True,
             Reservation.status == 'checked_in',
-            # Usar subquery em vez de paid_amount
-            Reservation.total_amount > func.coalesce(paid_subquery.c.total_paid, 0)
+            Reservation.total_amount > Reservation.paid_total
         )
         
         if property_id:
@@ -1348,94 +1394,266 @@ def get_dashboard_summary(
 ):
     """Obtém resumo consolidado para o dashboard"""
     try:
-        today = date.today()
+        return DashboardService(db).get_summary(current_user.tenant_id, property_id)
         
-        # Query base
-        base_query = db.query(Reservation).filter(
-            Reservation.tenant_id == current_user.tenant_id,
-            Reservation.is_active == True
+    except Exception as e:
+        logger.error(f"Erro ao buscar resumo do dashboard: {str(e)}")
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao buscar resumo do dashboard: {str(e)}"
+        )
+
+
+# ===== EXPORTAÇÃO =====
+# (declarada antes de /{reservation_id} para que /export não caia na rota por ID)
+
+def _run_reservation_export(
+    db: Session,
+    tenant_id: int,
+    filters: ReservationFilters,
+    export_format: str,
+    options: Dict[str, Any],
+    response: Response
+):
+    """
+    Exportações até RESERVATION_EXPORT_STREAM_LIMIT linhas são transmitidas na
+    própria resposta; acima disso a exportação é enfileirada (task Celery) e a
+    resposta traz o task_id e a URL de download.
+    """
+    export_service = ReservationExportService(db)
+    export_format = export_service.validate_format(export_format)
+    file_name = export_service.file_name(export_format)
+    total_records = export_service.count(tenant_id, filters)
+    
+    if total_records <= settings.RESERVATION_EXPORT_STREAM_LIMIT:
+        return StreamingResponse(
+            export_service.stream(export_format, tenant_id, filters, options),
+            media_type=export_service.content_type(export_format),
+            headers={
+                "Content-Disposition": f'attachment; filename="{file_name}"',
+                "X-Total-Records": str(total_records)
+            }
+        )
+    
+    from app.core.celery_app import export_reservations as export_reservations_task
+    
+    task = export_reservations_task.delay(
+        tenant_id=tenant_id,
+        export_format=export_format,
+        filters=filters.model_dump(mode="json", exclude_none=True),
+        options=options,
+        total_records=total_records
+    )
+    
+    logger.info(f"Exportação de {total_records} reservas enfileirada: task {task.id}")
+    
+    response.status_code = http_status.HTTP_202_ACCEPTED
+    now = datetime.utcnow()
+    return ReservationExportResponse(
+        file_url=f"/api/v1/reservations/export/{task.id}/download",
+        file_name=file_name,
+        total_records=total_records,
+        generated_at=now,
+        expires_at=now + timedelta(hours=settings.RESERVATION_EXPORT_TTL_HOURS),
+        task_id=task.id,
+        status="processing",
+        progress=0.0
+    )
+
+
+@router.get("/export", response_model=ReservationExportResponse)
+def export_reservations(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    format: str = Query("xlsx", description="Formato de exportação (xlsx, csv)"),
+    
+    # Reutilizar os mesmos filtros incluindo multi-select
+    status: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    status_list: Optional[str] = Query(None, description="Múltiplos status (separados por vírgula)"),
+    source_list: Optional[str] = Query(None, description="Múltiplas origens (separadas por vírgula)"),
+    property_id: Optional[int] = Query(None),
+    guest_id: Optional[int] = Query(None),
+    search: Optional[str] = Query(None),
+    check_in_from: Optional[date] = Query(None),
+    check_in_to: Optional[date] = Query(None),
+    check_out_from: Optional[date] = Query(None),
+    check_out_to: Optional[date] = Query(None),
+    created_from: Optional[str] = Query(None),
+    created_to: Optional[str] = Query(None),
+    guest_email: Optional[str] = Query(None),
+    guest_phone: Optional[str] = Query(None),
+    min_amount: Optional[float] = Query(None),
+    max_amount: Optional[float] = Query(None),
+    min_guests: Optional[int] = Query(None),
+    max_guests: Optional[int] = Query(None),
+    is_paid: Optional[bool] = Query(None),
+    requires_deposit: Optional[bool] = Query(None),
+    is_group_reservation: Optional[bool] = Query(None),
+    
+    # Parâmetros específicos da exportação
+    include_guest_details: bool = Query(True),
+    include_room_details: bool = Query(True),
+    include_payment_details: bool = Query(True),
+    include_property_details: bool = Query(False),
+):
+    """Exporta reservas com filtros personalizados - COM SUPORTE A MULTI-SELECT"""
+    try:
+        filters = create_reservation_filters(
+            status=status,
+            source=source,
+            status_list=status_list,
+            source_list=source_list,
+            property_id=property_id,
+            guest_id=guest_id,
+            search=search,
+            check_in_from=check_in_from,
+            check_in_to=check_in_to,
+            check_out_from=check_out_from,
+            check_out_to=check_out_to,
+            created_from=created_from,
+            created_to=created_to,
+            guest_email=guest_email,
+            guest_phone=guest_phone,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            min_guests=min_guests,
+            max_guests=max_guests,
+            is_paid=is_paid,
+            requires_deposit=requires_deposit,
+            is_group_reservation=is_group_reservation,
         )
         
-        if property_id:
-            base_query = base_query.filter(Reservation.property_id == property_id)
-        
-        # Estatísticas básicas
-        total_reservations = base_query.count()
-        
-        # Check-ins de hoje
-        todays_checkins = base_query.filter(
-            Reservation.check_in_date == today,
-            Reservation.status.in_(['confirmed', 'pending'])
-        ).count()
-        
-        # Check-outs de hoje  
-        pending_checkouts = base_query.filter(
-            Reservation.check_out_date <= today,
-            Reservation.status == 'checked_in'
-        ).count()
-        
-        # Hóspedes atuais (checked-in)
-        current_guests = base_query.filter(
-            Reservation.status == 'checked_in'
-        ).count()
+        options = {
+            "include_guest_details": include_guest_details,
+            "include_room_details": include_room_details,
+            "include_payment_details": include_payment_details,
+            "include_property_details": include_property_details,
+        }
         
-        # Receita total e pendente usando total_paid
-        from app.models.payment import Payment
+        return _run_reservation_export(db, current_user.tenant_id, filters, format, options, response)
         
-        # Subquery para calcular total pago
-        paid_subquery = db.query(
-            Payment.reservation_id,
-            func.sum(Payment.amount).label('total_paid')
-        ).filter(
-            Payment.tenant_id == current_user.tenant_id,
-            Payment.status == 'confirmed',
-            Payment.is_refund == False,
-            Payment.is_active == True
-        ).group_by(Payment.reservation_id).subquery()
-        
-        # Receita total
-        total_revenue = base_query.with_entities(
-            func.sum(Reservation.total_amount)
-        ).scalar() or 0
-        
-        # Receita paga (usando subquery)
-        paid_revenue = base_query.outerjoin(
-            paid_subquery, Reservation.id == paid_subquery.c.reservation_id
-        ).with_entities(
-            func.sum(func.coalesce(paid_subquery.c.total_paid, 0))
-        ).scalar() or 0
-        
-        pending_revenue = float(total_revenue) - float(paid_revenue)
-        
-        # Saldo pendente de check-ins usando total_paid
-        checked_in_pending = base_query.outerjoin(
-            paid_subquery, Reservation.id == paid_subquery.c.reservation_id
-        ).filter(
-            Reservation.status == 'checked_in',
-            Reservation.total_amount > func.coalesce(paid_subquery.c.total_paid, 0)
-        ).count()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erro ao exportar reservas: {str(e)}")
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao exportar reservas: {str(e)}"
+        )
+
+
+@router.post("/export", response_model=ReservationExportResponse)
+def export_reservations_post(
+    export_filters: ReservationExportFilters,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    format: str = Query("csv", description="Formato de exportação (csv, xlsx)")
+):
+    """Exporta reservas para CSV com filtros personalizados via POST - COM MULTI-SELECT"""
+    try:
+        # O ReservationExportFilters já herda de ReservationFilters que suporta multi-select
+        option_fields = set(ReservationExportFilters.model_fields) - set(ReservationFilters.model_fields)
+        options = export_filters.model_dump(include=option_fields)
+        filters = ReservationFilters(**export_filters.model_dump(exclude=option_fields, exclude_none=True))
         
-        return {
-            "total_reservations": total_reservations,
-            "todays_checkins": todays_checkins,
-            "pending_checkouts": pending_checkouts,
-            "current_guests": current_guests,
-            "total_revenue": float(total_revenue),
-            "paid_revenue": float(paid_revenue),
-            "pending_revenue": pending_revenue,
-            "checked_in_with_pending_payment": checked_in_pending,
-            "summary_date": today.isoformat(),
-            "property_id": property_id
-        }
+        return _run_reservation_export(db, current_user.tenant_id, filters, format, options, response)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
-        logger.error(f"Erro ao buscar resumo do dashboard: {str(e)}")
+        logger.error(f"Erro ao exportar reservas: {str(e)}")
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao buscar resumo do dashboard: {str(e)}"
+            detail=f"Erro ao exportar reservas: {str(e)}"
+        )
+
+
+def _validate_export_id(export_id: str) -> str:
+    """IDs de exportação são UUIDs de task (também evita path traversal)"""
+    try:
+        return str(uuid.UUID(export_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Exportação não encontrada"
         )
 
 
+@router.get("/export/{export_id}", response_model=ReservationExportResponse)
+def get_export_status(
+    export_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Status e progresso de uma exportação em background"""
+    from app.core.celery_app import celery_app
+    
+    export_id = _validate_export_id(export_id)
+    result = celery_app.AsyncResult(export_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    ready_path = ReservationExportService.find_export(current_user.tenant_id, export_id)
+    
+    if not ready_path and info.get("tenant_id") not in (None, current_user.tenant_id):
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Exportação não encontrada"
+        )
+    
+    if ready_path:
+        export_status, progress = "completed", 100.0
+    elif result.state == "FAILURE":
+        export_status, progress = "failed", None
+    else:
+        export_status, progress = "processing", info.get("percent")
+    
+    generated_at = datetime.utcfromtimestamp(os.path.getmtime(ready_path)) if ready_path else datetime.utcnow()
+    file_name = os.path.basename(ready_path) if ready_path else export_id
+    
+    return ReservationExportResponse(
+        file_url=f"/api/v1/reservations/export/{export_id}/download",
+        file_name=file_name,
+        total_records=info.get("total") or 0,
+        generated_at=generated_at,
+        expires_at=generated_at + timedelta(hours=settings.RESERVATION_EXPORT_TTL_HOURS),
+        task_id=export_id,
+        status=export_status,
+        progress=progress
+    )
+
+
+@router.get("/export/{export_id}/download")
+def download_export(
+    export_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download do arquivo de uma exportação concluída (somente do próprio tenant)"""
+    export_id = _validate_export_id(export_id)
+    path = ReservationExportService.find_export(current_user.tenant_id, export_id)
+    
+    if not path:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Exportação não encontrada ou ainda em processamento"
+        )
+    
+    export_format = path.rsplit(".", 1)[-1]
+    return FileResponse(
+        path,
+        media_type=ReservationExportService.content_type(export_format),
+        filename=f"reservas_{export_id[:8]}.{export_format}"
+    )
+
+
 # ===== CRUD BÁSICO =====
 
 @router.get("/{reservation_id}", response_model=ReservationResponse)
@@ -2284,73 +2502,7 @@ def get_dashboard_stats_expanded(
 ):
     """Obtém estatísticas expandidas do dashboard"""
     try:
-        reservation_service = ReservationService(db)
-        
-        # Query base
-        base_query = db.query(Reservation).filter(
-            Reservation.tenant_id == current_user.tenant_id,
-            Reservation.is_active == True
-        )
-        
-        if property_id:
-            base_query = base_query.filter(Reservation.property_id == property_id)
-        
-        # Estatísticas básicas
-        total_reservations = base_query.count()
-        
-        # Reservas por status
-        pending_checkins = base_query.filter(
-            Reservation.status == 'confirmed',
-            Reservation.check_in_date == date.today()
-        ).count()
-        
-        pending_checkouts = base_query.filter(
-            Reservation.status == 'checked_in',
-            Reservation.check_out_date == date.today()
-        ).count()
-        
-        # Receita total
-        total_revenue_query = base_query.with_entities(
-            func.sum(Reservation.total_amount)
-        ).scalar() or 0
-        
-        # Pagamentos em atraso (mock)
-        overdue_payments = 0
-        
-        # Taxa de ocupação (mock)
-        occupancy_rate = 75.0
-        
-        # Estatísticas adicionais
-        avg_nights = 2.5
-        avg_guests = 2.0
-        avg_amount = float(total_revenue_query) / total_reservations if total_reservations > 0 else 0
-        
-        # Distribuições por status e fonte
-        status_distribution = {}
-        source_distribution = {}
-        
-        for reservation in base_query.limit(1000):
-            status_distribution[reservation.status] = status_distribution.get(reservation.status, 0) + 1
-            source_distribution[reservation.source] = source_distribution.get(reservation.source, 0) + 1
-        
-        return {
-            "total_reservations": total_reservations,
-            "total_revenue": float(total_revenue_query),
-            "occupancy_rate": occupancy_rate,
-            "pending_checkins": pending_checkins,
-            "pending_checkouts": pending_checkouts,
-            "overdue_payments": overdue_payments,
-            "avg_nights": avg_nights,
-            "avg_guests": avg_guests,
-            "avg_amount": round(avg_amount, 2),
-            "this_month_reservations": total_reservations,
-            "this_month_revenue": float(total_revenue_query),
-            "last_month_reservations": total_reservations,
-            "last_month_revenue": float(total_revenue_query),
-            "status_distribution": status_distribution,
-            "source_distribution": source_distribution,
-            "recent_activity": []
-        }
+        return DashboardService(db).get_expanded_stats(current_user.tenant_id, property_id)
         
     except Exception as e:
         logger.error(f"Erro ao carregar estatísticas do dashboard: {str(e)}")
@@ -2385,131 +2537,54 @@ def get_occupancy_analysis(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Análise de ocupação em um período"""
-    reservation_service = ReservationService(db)
-    
+    """
+    Análise de ocupação em um período - lida dos fatos diários pré-agregados
+    (room_type_daily_facts), com ocupação, ADR e RevPAR por tipo de quarto.
+    """
     # Validar período
+    if end_date <= start_date:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Data final deve ser posterior à data inicial"
+        )
     if (end_date - start_date).days > 365:
         raise HTTPException(
             status_code=http_status.HTTP_400_BAD_REQUEST,
             detail="Período não pode exceder 365 dias"
         )
     
-    # Buscar reservas do período
-    reservations = reservation_service.get_reservations_by_date_range(
-        current_user.tenant_id,
-        start_date,
-        end_date,
-        property_id=property_id,
-        status_filter=['checked_in', 'checked_out']
+    summary = OccupancyFactService(db).get_period_summary(
+        current_user.tenant_id, start_date, end_date, property_id=property_id
     )
     
-    # Calcular métricas
-    total_days = (end_date - start_date).days
-    total_room_nights = 0
-    occupied_room_nights = 0
-    
-    # TODO: Implementar cálculo real de ocupação baseado nos quartos disponíveis
+    # Reservas vendidas que tocam o período (apenas contagem e média de estadia)
+    stays_query = db.query(
+        func.count(Reservation.id).label('reservations_count'),
+        func.avg(Reservation.check_out_date - Reservation.check_in_date).label('average_stay_length')
+    ).filter(
+        Reservation.tenant_id == current_user.tenant_id,
+        Reservation.is_active == True,
+        Reservation.status.in_(['confirmed', 'checked_in', 'checked_out']),
+        Reservation.check_in_date < end_date,
+        Reservation.check_out_date > start_date
+    )
+    if property_id:
+        stays_query = stays_query.filter(Reservation.property_id == property_id)
+    stays = stays_query.one()
     
     return {
         'period': {
             'start_date': start_date,
             'end_date': end_date,
-            'total_days': total_days
+            'total_days': (end_date - start_date).days
         },
-        'reservations_count': len(reservations),
-        'total_room_nights': total_room_nights,
-        'occupied_room_nights': occupied_room_nights,
-        'occupancy_rate': 0.0,
-        'average_stay_length': sum(r.nights for r in reservations) / len(reservations) if reservations else 0
+        'reservations_count': stays.reservations_count,
+        'total_room_nights': summary['available_room_nights'],
+        'occupied_room_nights': summary['sold_room_nights'],
+        'occupancy_rate': summary['occupancy_rate'],
+        'revenue': summary['revenue'],
+        'average_daily_rate': summary['average_daily_rate'],
+        'revenue_per_available_room': summary['revenue_per_available_room'],
+        'average_stay_length': round(float(stays.average_stay_length or 0), 2),
+        'by_room_type': summary['by_room_type']
     }
-
-
-# ===== EXPORTAÇÃO =====
-
-@router.get("/export", response_model=dict)
-def export_reservations(
-    request: Request,
-    response: Response,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-    format: str = Query("xlsx", description="Formato de exportação (xlsx, csv)"),
-    
-    # Reutilizar os mesmos filtros incluindo multi-select
-    status: Optional[str] = Query(None),
-    source: Optional[str] = Query(None),
-    status_list: Optional[str] = Query(None, description="Múltiplos status (separados por vírgula)"),
-    source_list: Optional[str] = Query(None, description="Múltiplas origens (separadas por vírgula)"),
-    property_id: Optional[int] = Query(None),
-    guest_id: Optional[int] = Query(None),
-    search: Optional[str] = Query(None),
-    check_in_from: Optional[date] = Query(None),
-    check_in_to: Optional[date] = Query(None),
-    check_out_from: Optional[date] = Query(None),
-    check_out_to: Optional[date] = Query(None),
-    created_from: Optional[str] = Query(None),
-    created_to: Optional[str] = Query(None),
-    guest_email: Optional[str] = Query(None),
-    guest_phone: Optional[str] = Query(None),
-    min_amount: Optional[float] = Query(None),
-    max_amount: Optional[float] = Query(None),
-    min_guests: Optional[int] = Query(None),
-    max_guests: Optional[int] = Query(None),
-    is_paid: Optional[bool] = Query(None),
-    requires_deposit: Optional[bool] = Query(None),
-    is_group_reservation: Optional[bool] = Query(None),
-    
-    # Parâmetros específicos da exportação
-    include_guest_details: bool = Query(True),
-    include_room_details: bool = Query(True),
-    include_payment_details: bool = Query(True),
-    include_property_details: bool = Query(False),
-):
-    """Exporta reservas com filtros personalizados - COM SUPORTE A MULTI-SELECT"""
-    try:
-        # Por ora, retornar uma resposta mock
-        # TODO: Implementar exportação real usando pandas
-        
-        return {
-            "message": "Exportação em desenvolvimento",
-            "filters_applied": {
-                "status": status,
-                "source": source,
-                "status_list": status_list,  # NOVO
-                "source_list": source_list,  # NOVO
-                "property_id": property_id,
-                "format": format,
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            "file_url": "/tmp/reservations_export.xlsx",
-            "file_name": f"reservas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}",
-            "total_records": 0,
-            "generated_at": datetime.utcnow().isoformat(),
-            "expires_at": datetime.utcnow().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Erro ao exportar reservas: {str(e)}")
-        raise HTTPException(
-            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao exportar reservas: {str(e)}"
-        )
-
-
-@router.post("/export", response_model=ReservationExportResponse)
-def export_reservations_post(
-    export_filters: ReservationExportFilters,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Exporta reservas para CSV com filtros personalizados via POST - COM MULTI-SELECT"""
-    
-    # O ReservationExportFilters já herda de ReservationFilters que suporta multi-select
-    return ReservationExportResponse(
-        file_url="http://exemplo.com/export.csv",
-        file_name="reservations_export.csv",
-        total_records=0,
-        generated_at=datetime.utcnow(),
-        expires_at=datetime.utcnow() + timedelta(hours=24)
-    )
\ No newline at end of file
@@ -8,6 +8,7 @@ import math
 import logging
 
 from app.core.database import get_db
+from app.core.redis import invalidate_availability_after_commit
 from app.services.room_availability_service import RoomAvailabilityService
 from app.integrations.wubook.sync_service import WuBookSyncService
 from app.schemas.room_availability import (
@@ -719,6 +720,9 @@ def reset_sync_errors(
             RoomAvailability.sync_pending: True
         }, synchronize_session=False)
         
+        if count > 0:
+            invalidate_availability_after_commit(db, current_user.tenant_id, room_ids or None, date_from, date_to)
+        
         db.commit()
         
         return {
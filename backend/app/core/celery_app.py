@@ -2,7 +2,7 @@
 
 import os
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from celery import Celery, Task
 from celery.schedules import crontab
 from kombu import Queue
@@ -106,6 +106,7 @@ def create_celery_app() -> Celery:
         'sync_all_availability': {'queue': 'sync_priority'},
         'sync_specific_configuration': {'queue': 'sync_priority'},
         'sync_incremental_availability': {'queue': 'sync_priority'},
+        'flush_wubook_sync_outbox': {'queue': 'sync_priority'},
         
         # Background tasks - prioridade normal
         'cleanup_old_sync_logs': {'queue': 'background'},
@@ -115,7 +116,10 @@ def create_celery_app() -> Celery:
         # Heavy tasks - prioridade baixa
         'full_sync_availability': {'queue': 'heavy'},
         'bulk_operations': {'queue': 'heavy'},
-        
+        'export_reservations': {'queue': 'heavy'},
+        'refresh_occupancy_facts': {'queue': 'heavy'},
+        'refresh_occupancy_fact_ranges': {'queue': 'background'},
+
         # Monitoring tasks
         'monitor_sync_health': {'queue': 'monitoring'},
         'generate_reports': {'queue': 'monitoring'},
@@ -184,6 +188,13 @@ def create_celery_app() -> Celery:
             }
         },
         
+        # Reconciliação dos fatos de ocupação - diário às 3h30
+        'refresh-occupancy-facts-daily': {
+            'task': 'refresh_occupancy_facts',
+            'schedule': crontab(hour=3, minute=30),  # 3:30 AM
+            'options': {'queue': 'heavy'}
+        },
+
         # Relatório de saúde semanal
         'weekly-health-report': {
             'task': 'generate_weekly_health_report',
@@ -302,6 +313,27 @@ def sync_specific_configuration(
         raise self.retry(countdown=120, max_retries=3, exc=e)
 
 
+@celery_app.task(bind=True, base=DatabaseTask, name='flush_wubook_sync_outbox')
+def flush_wubook_sync_outbox(self):
+    """Task disparada pelas escritas: envia ao WuBook as células vencidas do outbox"""
+    try:
+        from app.services.sync_outbox_service import SyncOutboxService
+
+        result = SyncOutboxService(self.db).flush()
+
+        if result.get('tenants'):
+            logger.info(
+                f"Outbox WuBook: {result['tenants']} tenants, {result['configurations']} configurações, "
+                f"{result['synced_count']} registros sincronizados"
+            )
+        return result
+
+    except Exception as e:
+        # Sem retry: os registros continuam com sync_pending e a sync incremental do beat os envia
+        logger.error(f"Erro no flush do outbox WuBook: {str(e)}")
+        raise
+
+
 @celery_app.task(bind=True, base=DatabaseTask, name='health_check_configurations')
 def health_check_configurations(self):
     """Task para verificação de saúde das configurações"""
@@ -552,6 +584,98 @@ def bulk_availability_update(
         raise self.retry(countdown=60, max_retries=2, exc=e)
 
 
+@celery_app.task(bind=True, base=DatabaseTask, name='export_reservations')
+def export_reservations(
+    self,
+    tenant_id: int,
+    export_format: str,
+    filters: dict,
+    options: dict,
+    total_records: int = 0
+):
+    """Task para exportação grande de reservas (CSV/XLSX em arquivo, com progresso)"""
+    try:
+        from app.services.reservation_export_service import ReservationExportService
+        from app.schemas.reservation import ReservationFilters
+        
+        logger.info(f"Iniciando exportação de reservas: tenant={tenant_id}, formato={export_format}")
+        
+        export_service = ReservationExportService(self.db)
+        export_service.cleanup_expired_exports()
+        
+        def report_progress(processed: int):
+            percent = round(processed / total_records * 100, 1) if total_records else None
+            self.update_state(state='PROGRESS', meta={
+                'tenant_id': tenant_id,
+                'processed': processed,
+                'total': total_records,
+                'percent': min(percent, 100.0) if percent is not None else None
+            })
+        
+        export_service.export_to_file(
+            export_format,
+            tenant_id,
+            self.request.id,
+            ReservationFilters(**filters),
+            options,
+            progress=report_progress
+        )
+        
+        logger.info(f"Exportação de reservas concluída: {self.request.id}")
+        return {
+            'tenant_id': tenant_id,
+            'export_id': self.request.id,
+            'format': export_format,
+            'total': total_records,
+            'percent': 100.0
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro na exportação de reservas: {str(e)}")
+        raise
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='refresh_occupancy_facts')
+def refresh_occupancy_facts(self, tenant_id: Optional[int] = None):
+    """Task noturna para reconciliar os fatos diários de ocupação"""
+    try:
+        from app.services.occupancy_fact_service import OccupancyFactService
+
+        logger.info(f"Iniciando recálculo dos fatos de ocupação (tenant={tenant_id or 'todos'})")
+
+        result = OccupancyFactService(self.db).refresh_all_properties(tenant_id=tenant_id)
+
+        logger.info(
+            f"Fatos de ocupação recalculados: {result['properties']} propriedades, "
+            f"{result['rows']} linhas, {len(result['errors'])} erros"
+        )
+        return result
+
+    except Exception as e:
+        logger.error(f"Erro ao recalcular fatos de ocupação: {str(e)}")
+        raise self.retry(countdown=600, max_retries=2, exc=e)
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name='refresh_occupancy_fact_ranges')
+def refresh_occupancy_fact_ranges(self, ranges: List[Dict[str, Any]]):
+    """Task para recalcular os fatos de ocupação alterados por um commit"""
+    try:
+        from app.services.occupancy_fact_service import OccupancyFactService
+
+        result = OccupancyFactService(self.db).refresh_ranges(ranges)
+
+        if result['errors']:
+            logger.warning(
+                f"Fatos de ocupação: {len(result['errors'])} de {result['ranges']} intervalos "
+                f"com erro (reconciliação noturna pendente)"
+            )
+        return result
+
+    except Exception as e:
+        logger.error(f"Erro ao recalcular intervalos de fatos de ocupação: {str(e)}")
+        raise self.retry(countdown=60, max_retries=2, exc=e)
+
+
 # ============== MONITORING E CALLBACKS ==============
 
 @celery_app.task(bind=True, name='monitor_sync_health')
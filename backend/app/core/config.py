@@ -56,6 +56,7 @@ class Settings(BaseSettings):
     MAX_ADVANCE_BOOKING_DAYS: int = 365
     DEFAULT_CHECK_IN_TIME: str = "14:00"
     DEFAULT_CHECK_OUT_TIME: str = "12:00"
+    PUBLIC_BOOKING_HOLD_TTL_SECONDS: int = 600  # Hold de quarto/noite durante o checkout público
     
     # Email Templates (para notificações de reservas públicas)
     BOOKING_CONFIRMATION_EMAIL_ENABLED: bool = True
@@ -73,6 +74,9 @@ class Settings(BaseSettings):
     WUBOOK_LCODE: Optional[int] = None
     WUBOOK_API_URL: str = "https://wired.wubook.net/xrws/"
     WUBOOK_API_TIMEOUT: int = 30  # segundos
+    WUBOOK_API_POOL_SIZE: int = 10  # Conexões keep-alive ociosas por processo
+    WUBOOK_API_KEEPALIVE_SECONDS: int = 60  # Descarta conexões ociosas há mais tempo
+    WUBOOK_API_GZIP_REQUEST_THRESHOLD: Optional[int] = 4096  # Bytes; None desativa gzip nas requisições
     
     # ============== CELERY CONFIGURATION ==============
     
@@ -106,6 +110,13 @@ class Settings(BaseSettings):
     CHANNEL_MANAGER_RETRY_DELAY_SECONDS: int = 60
     CHANNEL_MANAGER_BATCH_SIZE: int = 50
     CHANNEL_MANAGER_MAX_BATCH_SIZE: int = 500
+    WUBOOK_SYNC_MAX_CONCURRENCY: int = 4  # Configurações sincronizadas em paralelo (cada uma usa uma conexão do banco)
+    WUBOOK_SYNC_PER_ACCOUNT_CONCURRENCY: int = 1  # Jobs simultâneos por conta WuBook (lcode)
+    WUBOOK_OUTBOX_ENABLED: bool = True  # Envia alterações ao WuBook logo após as escritas (requer Redis)
+    WUBOOK_OUTBOX_DEBOUNCE_SECONDS: int = 5  # Aguarda novas escritas antes de enviar
+    WUBOOK_OUTBOX_MAX_DELAY_SECONDS: int = 30  # Envio máximo após a primeira escrita pendente
+    WUBOOK_SYNC_DELTA_ENABLED: bool = True  # Envia só células diferentes do último estado enviado
+    WUBOOK_SYNC_FINGERPRINT_MAX_AGE_DAYS: int = 7  # Reenvia células iguais após N dias (corrige divergências no canal; 0 = nunca)
     
     # Disponibilidade
     AVAILABILITY_SYNC_DAYS_AHEAD: int = 60
@@ -113,16 +124,19 @@ class Settings(BaseSettings):
     AVAILABILITY_MAX_PERIOD_DAYS: int = 365
     AVAILABILITY_BULK_MAX_ROOMS: int = 100
     AVAILABILITY_BULK_MAX_DAYS: int = 366
+    AVAILABILITY_UPSERT_CHUNK_SIZE: int = 1000  # Linhas por INSERT ... ON CONFLICT
     
     # Rate Limiting
     WUBOOK_API_RATE_LIMIT_PER_MINUTE: int = 100
     WUBOOK_API_RATE_LIMIT_BURST: int = 20
+    WUBOOK_API_THROTTLE_MAX_WAIT_SECONDS: int = 30  # Espera máxima por um token antes de reenfileirar
     WUBOOK_API_COOLDOWN_SECONDS: int = 1
     
     # Cache
     AVAILABILITY_CACHE_TTL_SECONDS: int = 300  # 5 minutos
     CONFIGURATION_CACHE_TTL_SECONDS: int = 600  # 10 minutos
     ROOM_MAPPING_CACHE_TTL_SECONDS: int = 1800  # 30 minutos
+    DASHBOARD_CACHE_TTL_SECONDS: int = 15  # Agregados do dashboard (polling da recepção)
     
     # Logs e Limpeza
     SYNC_LOG_RETENTION_DAYS: int = 90
@@ -151,6 +165,21 @@ class Settings(BaseSettings):
     API_RATE_LIMIT_PER_HOUR: int = 10000
     API_BURST_LIMIT: int = 100
     
+    # Listagens (paginação por cursor)
+    RESERVATION_COUNT_ESTIMATE_CAP: int = 10000  # Contagem "estimated" para de contar acima disso
+    
+    # Exportação de reservas
+    RESERVATION_EXPORT_STREAM_LIMIT: int = 5000  # Acima disso a exportação vira task Celery
+    RESERVATION_EXPORT_DIR: str = "/tmp/pms_exports"
+    RESERVATION_EXPORT_TTL_HOURS: int = 24
+    
+    # Mapa (polling since=)
+    MAP_DELTA_OVERLAP_SECONDS: int = 60  # Cursor recua isso: cobre transações que commitam depois da query
+
+    # Fatos diários de ocupação (room_type_daily_facts)
+    OCCUPANCY_FACTS_PAST_DAYS: int = 30  # Janela recalculada pela task noturna
+    OCCUPANCY_FACTS_FUTURE_DAYS: int = 365
+
     # Background Tasks
     MAX_CONCURRENT_SYNC_TASKS: int = 5
     MAX_CONCURRENT_BULK_TASKS: int = 3
@@ -0,0 +1,41 @@
+# backend/app/core/middleware.py
+
+import os
+from typing import Awaitable, Callable, Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def send_with_headers(send: Send, headers: Callable[[], Dict[str, str]]) -> Callable[[Message], Awaitable[None]]:
+    """
+    Envolve o send ASGI adicionando headers em http.response.start.
+    Os demais eventos (inclusive cada chunk de um streaming/SSE) passam direto.
+    """
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            response_headers = MutableHeaders(scope=message)
+            for name, value in headers().items():
+                response_headers.append(name, value)
+        await send(message)
+
+    return wrapped
+
+
+class TimezoneMiddleware:
+    """
+    Middleware ASGI puro: adiciona X-Timezone às respostas HTTP.
+    O TZ do processo é definido uma única vez, na montagem da aplicação.
+    """
+
+    def __init__(self, app: ASGIApp, timezone: str = "America/Sao_Paulo"):
+        self.app = app
+        self.timezone = timezone
+        os.environ['TZ'] = timezone
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send_with_headers(send, lambda: {"X-Timezone": self.timezone}))
@@ -0,0 +1,485 @@
+# backend/app/core/redis.py
+
+import json
+import time
+import logging
+from typing import Optional, List, Dict, Any, Callable, Iterable
+from datetime import date
+
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ============== CLIENTE COMPARTILHADO ==============
+
+_client: Optional[redis.Redis] = None
+_last_failure: float = 0.0
+_RECONNECT_INTERVAL_SECONDS = 30
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Retorna o cliente Redis compartilhado do processo (lazy).
+    Em caso de falha de conexão retorna None e só tenta novamente após
+    alguns segundos, para que o cache degrade sem derrubar as requisições.
+    """
+    global _client, _last_failure
+
+    if _client is not None:
+        return _client
+
+    if time.monotonic() - _last_failure < _RECONNECT_INTERVAL_SECONDS:
+        return None
+
+    try:
+        client = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            socket_keepalive=True,
+            health_check_interval=30
+        )
+        client.ping()
+        _client = client
+        logger.info("✅ Cache Redis conectado")
+    except Exception as e:
+        _last_failure = time.monotonic()
+        logger.warning(f"⚠️ Cache Redis indisponível: {e}")
+
+    return _client
+
+
+def _reset_client() -> None:
+    global _client, _last_failure
+    _client = None
+    _last_failure = time.monotonic()
+
+
+# ============== CACHE ==============
+
+class RedisCache:
+    """
+    Cache de leitura compartilhado entre processos.
+
+    Guarda janelas de disponibilidade por propriedade, configurações WuBook,
+    mapeamentos de quartos, agregados do dashboard e respostas da API pública, com os TTLs definidos em settings. Qualquer erro
+    do Redis é tratado como cache miss: a leitura cai para o banco.
+
+    Chaves:
+        cache:availability:{tenant}:{property}:{date_from}:{date_to}  janela (JSON)
+        cache:availability:windows:{tenant}:{property}                índice de janelas (set)
+        cache:availability:rooms:{tenant}                             room_id -> property_id (hash)
+        cache:wubook:configurations:{tenant}                          configurações (JSON)
+        cache:wubook:room_mappings:{configuration}                    mapeamentos (JSON)
+        cache:dashboard:{tenant}:{property|all}:{kind}                agregados do dashboard (JSON)
+        cache:public:{slug}:{endpoint}:{params}                       respostas da API pública (JSON)
+        cache:public:keys:{tenant}                                    índice de respostas públicas (set)
+    """
+
+    PREFIX = "cache"
+
+    def __init__(self, client_factory: Callable[[], Optional[redis.Redis]] = get_redis_client):
+        self._client_factory = client_factory
+
+    # ============== PRIMITIVAS ==============
+
+    def _client(self) -> Optional[redis.Redis]:
+        return self._client_factory()
+
+    def get_json(self, key: str) -> Optional[Any]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+            return json.loads(raw) if raw is not None else None
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao ler cache '{key}': {e}")
+            _reset_client()
+        except ValueError:
+            logger.warning(f"⚠️ Valor inválido no cache '{key}', descartando")
+            self.delete(key)
+        return None
+
+    def set_json(self, key: str, value: Any, ttl: int) -> bool:
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            client.set(key, json.dumps(value, default=str), ex=ttl)
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao gravar cache '{key}': {e}")
+            _reset_client()
+            return False
+
+    def delete(self, *keys: str) -> None:
+        client = self._client()
+        if client is None or not keys:
+            return
+        try:
+            client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao remover chaves do cache: {e}")
+            _reset_client()
+
+    # ============== JANELAS DE DISPONIBILIDADE ==============
+
+    def _availability_key(self, tenant_id: int, property_id: int, date_from: date, date_to: date) -> str:
+        return f"{self.PREFIX}:availability:{tenant_id}:{property_id}:{date_from.isoformat()}:{date_to.isoformat()}"
+
+    def _availability_index_key(self, tenant_id: int, property_id: int) -> str:
+        return f"{self.PREFIX}:availability:windows:{tenant_id}:{property_id}"
+
+    def _availability_rooms_key(self, tenant_id: int) -> str:
+        return f"{self.PREFIX}:availability:rooms:{tenant_id}"
+
+    def get_availability_window(
+        self,
+        tenant_id: int,
+        property_id: int,
+        date_from: date,
+        date_to: date
+    ) -> Optional[Dict[str, Any]]:
+        """Janela [date_from, date_to] (inclusivo) de uma propriedade, se em cache"""
+        return self.get_json(self._availability_key(tenant_id, property_id, date_from, date_to))
+
+    def set_availability_window(
+        self,
+        tenant_id: int,
+        property_id: int,
+        date_from: date,
+        date_to: date,
+        window: Dict[str, Any],
+        room_ids: Iterable[int]
+    ) -> None:
+        """
+        Grava a janela e a registra no índice da propriedade, junto com o
+        mapa quarto -> propriedade usado pela invalidação por quarto.
+        """
+        client = self._client()
+        if client is None:
+            return
+
+        ttl = settings.AVAILABILITY_CACHE_TTL_SECONDS
+        key = self._availability_key(tenant_id, property_id, date_from, date_to)
+        index_key = self._availability_index_key(tenant_id, property_id)
+        rooms_key = self._availability_rooms_key(tenant_id)
+        room_map = {str(room_id): property_id for room_id in room_ids}
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(key, json.dumps(window, default=str), ex=ttl)
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, ttl)
+            if room_map:
+                pipe.hset(rooms_key, mapping=room_map)
+                pipe.expire(rooms_key, settings.ROOM_MAPPING_CACHE_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao gravar janela de disponibilidade: {e}")
+            _reset_client()
+
+    def invalidate_availability(
+        self,
+        tenant_id: int,
+        room_ids: Optional[Iterable[int]] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        property_ids: Optional[Iterable[int]] = None
+    ) -> int:
+        """
+        Remove as janelas afetadas por uma escrita: apenas das propriedades dos
+        quartos informados e apenas as que intersectam [date_from, date_to].
+        Sem quartos nem propriedades, invalida todas as janelas do tenant.
+        Retorna o número de janelas removidas.
+        """
+        client = self._client()
+        if client is None:
+            return 0
+
+        try:
+            if property_ids is not None:
+                properties = {int(p) for p in property_ids}
+            elif room_ids is not None:
+                room_ids = [str(room_id) for room_id in room_ids]
+                if not room_ids:
+                    return 0
+                values = client.hmget(self._availability_rooms_key(tenant_id), room_ids)
+                properties = {int(v) for v in values if v is not None}
+            else:
+                prefix = f"{self.PREFIX}:availability:windows:{tenant_id}:"
+                properties = {
+                    int(key[len(prefix):])
+                    for key in client.scan_iter(match=f"{prefix}*", count=500)
+                }
+
+            removed = 0
+            for property_id in properties:
+                index_key = self._availability_index_key(tenant_id, property_id)
+                stale = [
+                    key for key in client.smembers(index_key)
+                    if self._window_overlaps(key, date_from, date_to)
+                ]
+                if stale:
+                    pipe = client.pipeline(transaction=False)
+                    pipe.delete(*stale)
+                    pipe.srem(index_key, *stale)
+                    pipe.execute()
+                    removed += len(stale)
+
+            if removed:
+                logger.debug(f"Cache: {removed} janelas de disponibilidade invalidadas (tenant {tenant_id})")
+            return removed
+
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao invalidar janelas de disponibilidade: {e}")
+            _reset_client()
+            return 0
+
+    @staticmethod
+    def _window_overlaps(key: str, date_from: Optional[date], date_to: Optional[date]) -> bool:
+        """Verifica se a janela codificada na chave intersecta o período alterado"""
+        try:
+            window_from, window_to = (date.fromisoformat(part) for part in key.rsplit(':', 2)[-2:])
+        except ValueError:
+            return True
+        if date_to is not None and window_from > date_to:
+            return False
+        if date_from is not None and window_to < date_from:
+            return False
+        return True
+
+    # ============== CONFIGURAÇÕES WUBOOK ==============
+
+    def _configurations_key(self, tenant_id: int) -> str:
+        return f"{self.PREFIX}:wubook:configurations:{tenant_id}"
+
+    def get_configurations(self, tenant_id: int) -> Optional[List[Dict[str, Any]]]:
+        return self.get_json(self._configurations_key(tenant_id))
+
+    def set_configurations(self, tenant_id: int, configurations: List[Dict[str, Any]]) -> None:
+        self.set_json(
+            self._configurations_key(tenant_id),
+            configurations,
+            settings.CONFIGURATION_CACHE_TTL_SECONDS
+        )
+
+    def invalidate_configurations(self, tenant_id: int) -> None:
+        self.delete(self._configurations_key(tenant_id))
+
+    # ============== MAPEAMENTOS DE QUARTOS ==============
+
+    def _room_mappings_key(self, configuration_id: int) -> str:
+        return f"{self.PREFIX}:wubook:room_mappings:{configuration_id}"
+
+    def get_room_mappings(self, configuration_id: int) -> Optional[List[Dict[str, Any]]]:
+        return self.get_json(self._room_mappings_key(configuration_id))
+
+    def set_room_mappings(self, configuration_id: int, mappings: List[Dict[str, Any]]) -> None:
+        self.set_json(
+            self._room_mappings_key(configuration_id),
+            mappings,
+            settings.ROOM_MAPPING_CACHE_TTL_SECONDS
+        )
+
+    def invalidate_room_mappings(self, configuration_id: int) -> None:
+        self.delete(self._room_mappings_key(configuration_id))
+
+    # ============== DASHBOARD ==============
+
+    def _dashboard_key(self, tenant_id: int, property_id: Optional[int], kind: str) -> str:
+        return f"{self.PREFIX}:dashboard:{tenant_id}:{property_id or 'all'}:{kind}"
+
+    def _dashboard_index_key(self, tenant_id: int) -> str:
+        return f"{self.PREFIX}:dashboard:keys:{tenant_id}"
+
+    def get_dashboard(self, tenant_id: int, property_id: Optional[int], kind: str) -> Optional[Dict[str, Any]]:
+        return self.get_json(self._dashboard_key(tenant_id, property_id, kind))
+
+    def set_dashboard(
+        self,
+        tenant_id: int,
+        property_id: Optional[int],
+        kind: str,
+        data: Dict[str, Any]
+    ) -> None:
+        """Grava agregados do dashboard (TTL curto) e registra a chave no índice do tenant"""
+        client = self._client()
+        if client is None:
+            return
+
+        ttl = settings.DASHBOARD_CACHE_TTL_SECONDS
+        key = self._dashboard_key(tenant_id, property_id, kind)
+        index_key = self._dashboard_index_key(tenant_id)
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(key, json.dumps(data, default=str), ex=ttl)
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao gravar cache do dashboard: {e}")
+            _reset_client()
+
+    def invalidate_dashboard(self, tenant_id: int) -> None:
+        """Remove todos os agregados de dashboard do tenant (todas as propriedades)"""
+        client = self._client()
+        if client is None:
+            return
+
+        index_key = self._dashboard_index_key(tenant_id)
+        try:
+            keys = list(client.smembers(index_key))
+            client.delete(index_key, *keys)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache do dashboard: {e}")
+            _reset_client()
+
+    # ============== API PÚBLICA ==============
+
+    def _public_key(self, slug: str, endpoint: str, params: str) -> str:
+        return f"{self.PREFIX}:public:{slug}:{endpoint}:{params}"
+
+    def _public_index_key(self, tenant_id: int) -> str:
+        return f"{self.PREFIX}:public:keys:{tenant_id}"
+
+    def get_public_response(self, slug: str, endpoint: str, params: str) -> Optional[Dict[str, Any]]:
+        """Resposta pública em cache: {'etag': ..., 'body': JSON serializado}"""
+        return self.get_json(self._public_key(slug, endpoint, params))
+
+    def set_public_response(
+        self,
+        tenant_id: int,
+        slug: str,
+        endpoint: str,
+        params: str,
+        response: Dict[str, Any]
+    ) -> None:
+        """Grava a resposta (PUBLIC_API_CACHE_TTL) e registra a chave no índice do tenant"""
+        client = self._client()
+        if client is None:
+            return
+
+        ttl = settings.PUBLIC_API_CACHE_TTL
+        key = self._public_key(slug, endpoint, params)
+        index_key = self._public_index_key(tenant_id)
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(key, json.dumps(response), ex=ttl)
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao gravar cache da API pública: {e}")
+            _reset_client()
+
+    def invalidate_public(self, tenant_id: int) -> None:
+        """Remove todas as respostas públicas do tenant (todas as propriedades e slugs)"""
+        client = self._client()
+        if client is None:
+            return
+
+        index_key = self._public_index_key(tenant_id)
+        try:
+            keys = list(client.smembers(index_key))
+            client.delete(index_key, *keys)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache da API pública: {e}")
+            _reset_client()
+
+
+# ✅ Instância global do cache
+redis_cache = RedisCache()
+
+
+# ============== INVALIDAÇÃO APÓS COMMIT ==============
+
+_SESSION_CALLBACKS_KEY = "redis_cache_invalidations"
+_SESSION_AVAILABILITY_KEY = "redis_cache_availability_invalidations"
+
+
+def invalidate_after_commit(session: Optional[Session], callback: Callable, *args: Any) -> None:
+    """
+    Agenda uma invalidação para depois do commit da sessão (evita que um leitor
+    concorrente repopule o cache com dados ainda não commitados). Sem sessão,
+    invalida imediatamente.
+    """
+    if session is None:
+        callback(*args)
+        return
+
+    pending = session.info.setdefault(_SESSION_CALLBACKS_KEY, set())
+    pending.add((callback, args))
+
+
+def invalidate_availability_after_commit(
+    session: Optional[Session],
+    tenant_id: int,
+    room_ids: Optional[Iterable[int]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> None:
+    """
+    Agenda a invalidação das janelas de disponibilidade afetadas por uma
+    escrita em room_availability. As escritas da mesma transação são somadas
+    por tenant (quartos e período que cobre todas) e invalidadas uma única vez
+    após o commit. room_ids=None invalida todos os quartos do tenant; datas
+    None deixam o período aberto.
+    """
+    if session is None:
+        redis_cache.invalidate_availability(tenant_id, room_ids=room_ids, date_from=date_from, date_to=date_to)
+        return
+
+    pending = session.info.setdefault(_SESSION_AVAILABILITY_KEY, {})
+    scope = pending.get(tenant_id)
+    if scope is None:
+        pending[tenant_id] = {
+            'room_ids': set(room_ids) if room_ids is not None else None,
+            'date_from': date_from,
+            'date_to': date_to
+        }
+        return
+
+    if scope['room_ids'] is not None:
+        if room_ids is None:
+            scope['room_ids'] = None
+        else:
+            scope['room_ids'].update(room_ids)
+    scope['date_from'] = min(scope['date_from'], date_from) if scope['date_from'] and date_from else None
+    scope['date_to'] = max(scope['date_to'], date_to) if scope['date_to'] and date_to else None
+
+
+@event.listens_for(Session, "after_commit")
+def _run_invalidations_after_commit(session: Session) -> None:
+    pending = session.info.pop(_SESSION_CALLBACKS_KEY, None) or set()
+    availability = session.info.pop(_SESSION_AVAILABILITY_KEY, None) or {}
+
+    for callback, args in pending:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache após commit: {e}")
+
+    for tenant_id, scope in availability.items():
+        try:
+            redis_cache.invalidate_availability(tenant_id, **scope)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao invalidar janelas de disponibilidade após commit: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations_after_rollback(session: Session) -> None:
+    # Rollback de savepoint: a transação externa ainda pode commitar
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_SESSION_CALLBACKS_KEY, None)
+    session.info.pop(_SESSION_AVAILABILITY_KEY, None)
@@ -0,0 +1,52 @@
+# backend/app/integrations/wubook/async_client.py
+
+import asyncio
+from typing import Dict, List, Any, Optional
+import logging
+
+from app.integrations.wubook.wubook_client import WuBookClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWuBookClient:
+    """
+    Variante assíncrona do WuBookClient.
+
+    O XML-RPC da stdlib é bloqueante; cada chamada roda em uma thread
+    (asyncio.to_thread) sobre o mesmo transporte keep-alive compartilhado do
+    processo, então várias contas podem ser atendidas em paralelo sem bloquear
+    o event loop. As respostas e erros são os mesmos do cliente síncrono.
+    Um semáforo opcional limita as chamadas simultâneas desta conta.
+    """
+
+    def __init__(self, token: str, lcode: int, max_concurrent_calls: Optional[int] = None):
+        self.token = token
+        self.lcode = lcode
+        self._client = WuBookClient(token, lcode)
+        self._semaphore = asyncio.Semaphore(max_concurrent_calls) if max_concurrent_calls else None
+
+    async def _call(self, method: str, *args, **kwargs):
+        func = getattr(self._client, method)
+        if self._semaphore is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def fetch_rooms(self) -> List[Dict]:
+        return await self._call("fetch_rooms")
+
+    async def fetch_availability(self, dfrom: str, dto: str, rooms: List[int] = None):
+        return await self._call("fetch_availability", dfrom, dto, rooms)
+
+    async def update_availability(self, availability_data: List[Dict]) -> Dict[str, Any]:
+        return await self._call("update_availability", availability_data)
+
+    async def create_room(self, name: str, beds: int, price: float, **kwargs) -> int:
+        return await self._call("create_room", name, beds, price, **kwargs)
+
+    async def delete_room(self, room_id: int) -> bool:
+        return await self._call("delete_room", room_id)
+
+    async def test_connection(self) -> Dict[str, Any]:
+        return await self._call("test_connection")
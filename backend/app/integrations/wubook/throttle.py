@@ -0,0 +1,144 @@
+# backend/app/integrations/wubook/throttle.py
+
+import hashlib
+import math
+import threading
+import time
+from typing import Dict, Tuple
+import logging
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# Token bucket: hash {tokens, ts} por conta, relógio do Redis.
+# Consome 1 token e retorna 0, ou retorna em quantos ms haverá um token.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return wait
+"""
+
+
+class WuBookRateLimited(Exception):
+    """A conta WuBook não teria token disponível dentro da espera máxima"""
+
+    def __init__(self, lcode, retry_after: float):
+        self.lcode = lcode
+        self.retry_after = retry_after
+        super().__init__(
+            f"Limite de chamadas WuBook atingido (lcode {lcode}); tente novamente em {retry_after:.1f}s"
+        )
+
+
+class WuBookThrottle:
+    """
+    Limite de chamadas à API WuBook por conta (token + lcode), compartilhado
+    entre workers Celery, processos da API e sincronizações manuais.
+
+    Token bucket no Redis (script Lua atômico) com capacidade
+    WUBOOK_API_RATE_LIMIT_BURST e reposição de WUBOOK_API_RATE_LIMIT_PER_MINUTE
+    tokens por minuto. acquire() espera o próximo token em vez de falhar; se a
+    espera passar de WUBOOK_API_THROTTLE_MAX_WAIT_SECONDS levanta
+    WuBookRateLimited (com retry_after) para que o chamador reenfileire.
+    Sem Redis, aplica o mesmo bucket em memória, por processo.
+    """
+
+    PREFIX = "throttle:wubook"
+
+    def __init__(self):
+        self.capacity = max(1, settings.WUBOOK_API_RATE_LIMIT_BURST)
+        self.rate_per_ms = max(1, settings.WUBOOK_API_RATE_LIMIT_PER_MINUTE) / 60000
+        self._script = None
+        self._script_client = None
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._local_lock = threading.Lock()
+
+    @classmethod
+    def _key(cls, token: str, lcode) -> str:
+        # O token não vai em claro para o Redis
+        token_hash = hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:16]
+        return f"{cls.PREFIX}:{token_hash}:{lcode}"
+
+    def acquire(self, token: str, lcode, max_wait_seconds: float = None) -> float:
+        """
+        Consome um token da conta, esperando se necessário.
+        Retorna o tempo esperado (segundos).
+
+        Raises:
+            WuBookRateLimited: Se o token não estiver disponível dentro da espera máxima
+        """
+        if max_wait_seconds is None:
+            max_wait_seconds = settings.WUBOOK_API_THROTTLE_MAX_WAIT_SECONDS
+
+        key = self._key(token, lcode)
+        waited = 0.0
+
+        while True:
+            wait_seconds = self._try_acquire(key) / 1000
+            if wait_seconds <= 0:
+                if waited:
+                    logger.debug(f"WuBook lcode {lcode}: aguardou {waited:.2f}s pelo limite de chamadas")
+                return waited
+
+            if waited + wait_seconds > max_wait_seconds:
+                logger.warning(f"⚠️ Limite de chamadas WuBook atingido para lcode {lcode}")
+                raise WuBookRateLimited(lcode, wait_seconds)
+
+            time.sleep(wait_seconds)
+            waited += wait_seconds
+
+    def _try_acquire(self, key: str) -> float:
+        """0 se consumiu um token; senão, ms até o próximo token"""
+        client = get_redis_client()
+
+        if client is not None:
+            try:
+                if self._script_client is not client:
+                    self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+                    self._script_client = client
+                return float(self._script(keys=[key], args=[self.capacity, self.rate_per_ms]))
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Limite WuBook sem Redis, usando bucket local: {e}")
+
+        return self._try_acquire_local(key)
+
+    def _try_acquire_local(self, key: str) -> float:
+        """Mesmo bucket do script Lua, em memória (apenas este processo)"""
+        now = time.monotonic() * 1000
+
+        with self._local_lock:
+            tokens, updated_at = self._local.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate_per_ms)
+
+            if tokens >= 1:
+                self._local[key] = (tokens - 1, now)
+                return 0
+
+            self._local[key] = (tokens, now)
+            return math.ceil((1 - tokens) / self.rate_per_ms)
+
+
+# Instância global (por processo; o estado fica no Redis)
+wubook_throttle = WuBookThrottle()
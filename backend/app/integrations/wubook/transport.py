@@ -0,0 +1,143 @@
+# backend/app/integrations/wubook/transport.py
+
+import http.client
+import os
+import ssl
+import threading
+import time
+import xmlrpc.client
+from collections import deque
+from typing import Optional
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSafeTransport(xmlrpc.client.SafeTransport):
+    """
+    Transporte XML-RPC (HTTPS) com pool de conexões HTTP/1.1 keep-alive.
+
+    O SafeTransport padrão guarda uma única conexão e não é thread-safe; aqui
+    cada chamada retira uma conexão do pool (ou abre uma nova), usa-a durante a
+    requisição e a devolve ao final. Conexões ociosas há mais de
+    WUBOOK_API_KEEPALIVE_SECONDS são descartadas antes de reaproveitar; uma
+    conexão que o servidor já fechou é reaberta pelo retry do próprio Transport.
+    Respostas gzip são aceitas e requisições acima de encode_threshold bytes
+    são enviadas comprimidas.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        pool_size: int,
+        keepalive_seconds: float,
+        encode_threshold: Optional[int] = None
+    ):
+        super().__init__(context=ssl.create_default_context())
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.encode_threshold = encode_threshold
+        self._idle = deque()  # (host, conexão, devolvida_em)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def request(self, host, handler, request_body, verbose=False):
+        try:
+            return super().request(host, handler, request_body, verbose)
+        finally:
+            self._checkin()
+
+    def make_connection(self, host):
+        current = getattr(self._local, 'connection', None)
+        if current and current[0] == host:
+            return current[1]
+
+        connection = self._checkout(host)
+        self._local.connection = (host, connection)
+        return connection
+
+    def close(self):
+        """Descarta a conexão em uso (chamado pelo Transport após erros)"""
+        current = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if current:
+            current[1].close()
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões ociosas do pool"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for _, connection, _ in idle:
+            connection.close()
+
+    def _checkout(self, host) -> http.client.HTTPSConnection:
+        now = time.monotonic()
+        stale = []
+        connection = None
+
+        with self._lock:
+            while self._idle:
+                idle_host, idle_connection, returned_at = self._idle.pop()
+                if idle_host == host and now - returned_at < self.keepalive_seconds:
+                    connection = idle_connection
+                    break
+                stale.append(idle_connection)
+
+        for old in stale:
+            old.close()
+
+        if connection is not None:
+            return connection
+
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        logger.debug(f"WuBook: nova conexão HTTPS para {chost}")
+        return http.client.HTTPSConnection(
+            chost, None, context=self.context, timeout=self.timeout, **(x509 or {})
+        )
+
+    def _checkin(self) -> None:
+        current = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if current is None:
+            return
+
+        host, connection = current
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((host, connection, time.monotonic()))
+                return
+        connection.close()
+
+
+# ============== TRANSPORTE COMPARTILHADO ==============
+
+_transport: Optional[PooledSafeTransport] = None
+_transport_pid: Optional[int] = None
+_transport_lock = threading.Lock()
+
+
+def get_wubook_transport() -> PooledSafeTransport:
+    """
+    Transporte compartilhado do processo. Recriado após fork (workers Celery
+    prefork) para que processos filhos não compartilhem sockets do pai.
+    """
+    global _transport, _transport_pid
+
+    pid = os.getpid()
+    if _transport is not None and _transport_pid == pid:
+        return _transport
+
+    with _transport_lock:
+        if _transport is None or _transport_pid != pid:
+            _transport = PooledSafeTransport(
+                timeout=settings.WUBOOK_API_TIMEOUT,
+                pool_size=settings.WUBOOK_API_POOL_SIZE,
+                keepalive_seconds=settings.WUBOOK_API_KEEPALIVE_SECONDS,
+                encode_threshold=settings.WUBOOK_API_GZIP_REQUEST_THRESHOLD
+            )
+            _transport_pid = pid
+
+    return _transport
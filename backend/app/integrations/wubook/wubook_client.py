@@ -5,13 +5,41 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, date
 import logging
 
+from app.core.config import settings
+from app.integrations.wubook.transport import get_wubook_transport
+from app.integrations.wubook.throttle import wubook_throttle, WuBookRateLimited
+
 logger = logging.getLogger(__name__)
 
+
+class _ThrottledServerProxy:
+    """ServerProxy que consome um token do limite da conta antes de cada chamada"""
+
+    def __init__(self, server: xmlrpc.client.ServerProxy, token: str, lcode: int):
+        self._server = server
+        self._token = token
+        self._lcode = lcode
+
+    def __getattr__(self, name):
+        method = getattr(self._server, name)
+
+        def call(*args):
+            wubook_throttle.acquire(self._token, self._lcode)
+            return method(*args)
+
+        return call
+
+
 class WuBookClient:
     def __init__(self, token: str, lcode: int):
         self.token = token
         self.lcode = lcode
-        self.server = xmlrpc.client.ServerProxy('https://wired.wubook.net/xrws/')
+        # Transporte compartilhado do processo: conexões keep-alive reaproveitadas entre clientes
+        self.server = _ThrottledServerProxy(
+            xmlrpc.client.ServerProxy(settings.WUBOOK_API_URL, transport=get_wubook_transport()),
+            token,
+            lcode
+        )
     
     def _date_to_european_format(self, date_input) -> str:
         """Converte data para formato europeu DD/MM/YYYY"""
@@ -119,6 +147,8 @@ class WuBookClient:
             error_msg = f"Erro XML-RPC ao criar quarto: {fault.faultCode} - {fault.faultString}"
             logger.error(error_msg)
             raise Exception(error_msg)
+        except WuBookRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Erro ao criar quarto na WuBook: {str(e)}")
             raise Exception(f"Falha na criação: {str(e)}")
@@ -154,6 +184,8 @@ class WuBookClient:
             error_msg = f"Erro XML-RPC ao remover quarto: {fault.faultCode} - {fault.faultString}"
             logger.error(error_msg)
             raise Exception(error_msg)
+        except WuBookRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Erro ao remover quarto da WuBook: {str(e)}")
             raise Exception(f"Falha na remoção: {str(e)}")
@@ -289,6 +321,8 @@ class WuBookClient:
                 logger.error(error_msg)
                 return {"success": False, "message": error_msg}
                 
+        except WuBookRateLimited:
+            raise
         except Exception as e:
             error_msg = f"Erro ao atualizar disponibilidade: {str(e)}"
             logger.error(error_msg)
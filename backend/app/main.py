@@ -5,13 +5,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 import traceback
 import os
 
 from app.core.config import settings
 from app.core.database import check_db_connection
+from app.core.middleware import TimezoneMiddleware
 
 # ✅ IMPORTAR MIDDLEWARES DA API PÚBLICA
 from app.api.public.middleware import (
@@ -23,19 +23,6 @@ from app.api.public.middleware import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# ✅ MIDDLEWARE DE TIMEZONE
-class TimezoneMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        # Definir timezone para a sessão
-        os.environ['TZ'] = 'America/Sao_Paulo'
-        
-        response = await call_next(request)
-        
-        # Adicionar header com timezone
-        response.headers["X-Timezone"] = "America/Sao_Paulo"
-        
-        return response
-
 # Criar instância da aplicação
 app = FastAPI(
     title=settings.APP_NAME,
@@ -51,6 +38,8 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 logger.info("✅ Pasta de uploads configurada: /uploads")
 
 # ✅ ADICIONAR MIDDLEWARES (ORDEM IMPORTA!)
+# Todos são ASGI puros (sem BaseHTTPMiddleware): não envolvem o corpo da
+# resposta, então streaming/SSE passam direto. Benchmark: benchmark_middleware.py
 # 1. Timezone primeiro
 app.add_middleware(TimezoneMiddleware)
 
@@ -19,6 +19,9 @@ from .room_availability import RoomAvailability
 # Guest & Reservation models
 from .guest import Guest
 from .reservation import Reservation, ReservationRoom
+from .room_night_occupancy import RoomNightOccupancy
+from .room_type_daily_fact import RoomTypeDailyFact
+from .reservation_number_sequence import ReservationNumberSequence
 
 # Payment models
 from .payment import Payment
@@ -35,6 +38,7 @@ from .wubook_configuration import WuBookConfiguration
 from .wubook_room_mapping import WuBookRoomMapping
 from .wubook_rate_plan import WuBookRatePlan
 from .wubook_sync_log import WuBookSyncLog
+from .wubook_availability_fingerprint import WuBookAvailabilityFingerprint
 
 # ✅ NOVO: Public Booking Engine
 from .booking_engine_config import BookingEngineConfig
@@ -57,6 +61,9 @@ __all__ = [
     "Guest",
     "Reservation",
     "ReservationRoom",
+    "RoomNightOccupancy",
+    "RoomTypeDailyFact",
+    "ReservationNumberSequence",
     
     # Payments
     "Payment",
@@ -73,6 +80,7 @@ __all__ = [
     "WuBookRoomMapping",
     "WuBookRatePlan",
     "WuBookSyncLog",
+    "WuBookAvailabilityFingerprint",
     
     # ✅ NOVO: Public Booking Engine
     "BookingEngineConfig",
@@ -1,10 +1,12 @@
 # backend/app/models/booking_engine_config.py
 
 from sqlalchemy import Column, String, Text, Boolean, Integer, JSON, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import relationship, object_session
 from typing import Optional, Dict, Any, List
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class BookingEngineConfig(BaseModel, TenantMixin):
@@ -282,4 +284,30 @@ class BookingEngineConfig(BaseModel, TenantMixin):
                 "title": self.meta_title,
                 "description": self.meta_description
             }
-        }
\ No newline at end of file
+        }
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+# Contadores gravados a cada visita/reserva pública; não aparecem nas respostas
+# públicas e não devem esvaziar o cache do tenant
+_STATISTIC_FIELDS = {'total_visits', 'total_bookings', 'updated_at'}
+
+
+@event.listens_for(BookingEngineConfig, "after_insert")
+@event.listens_for(BookingEngineConfig, "after_delete")
+def _invalidate_public_cache(mapper, connection, target):
+    """Alterações no motor de reservas invalidam as respostas públicas do tenant após o commit"""
+    invalidate_after_commit(object_session(target), redis_cache.invalidate_public, target.tenant_id)
+
+
+@event.listens_for(BookingEngineConfig, "after_update")
+def _invalidate_public_cache_on_update(mapper, connection, target):
+    """Como _invalidate_public_cache, ignorando updates que só mexem nos contadores"""
+    state = inspect(target)
+    if any(
+        state.attrs[attr.key].history.has_changes()
+        for attr in mapper.column_attrs
+        if attr.key not in _STATISTIC_FIELDS
+    ):
+        invalidate_after_commit(object_session(target), redis_cache.invalidate_public, target.tenant_id)
@@ -1,11 +1,13 @@
 # backend/app/models/payment_method.py
 
 from sqlalchemy import Column, String, Text, Boolean, Integer, Numeric, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, object_session
 from sqlalchemy import UniqueConstraint
 from typing import Optional, Dict, Any
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class PaymentMethod(BaseModel, TenantMixin):
@@ -220,4 +222,14 @@ class PaymentMethod(BaseModel, TenantMixin):
             created_methods.append(method)
         
         db_session.flush()  # Para obter os IDs
-        return created_methods
\ No newline at end of file
+        return created_methods
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+@event.listens_for(PaymentMethod, "after_insert")
+@event.listens_for(PaymentMethod, "after_update")
+@event.listens_for(PaymentMethod, "after_delete")
+def _invalidate_public_cache(mapper, connection, target):
+    """Métodos de pagamento são do tenant: invalida as respostas públicas de todas as propriedades após o commit"""
+    invalidate_after_commit(object_session(target), redis_cache.invalidate_public, target.tenant_id)
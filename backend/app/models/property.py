@@ -1,9 +1,11 @@
 # backend/app/models/property.py
 
 from sqlalchemy import Column, String, Text, Boolean, Integer, Numeric, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, object_session
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class Property(BaseModel, TenantMixin):
@@ -172,4 +174,14 @@ class Property(BaseModel, TenantMixin):
                 "latitude": float(self.latitude) if self.latitude else None,
                 "longitude": float(self.longitude) if self.longitude else None
             } if self.latitude and self.longitude else None
-        }
\ No newline at end of file
+        }
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+@event.listens_for(Property, "after_insert")
+@event.listens_for(Property, "after_update")
+@event.listens_for(Property, "after_delete")
+def _invalidate_public_cache(mapper, connection, target):
+    """Qualquer escrita na propriedade (inclusive slug e settings) invalida as respostas públicas do tenant após o commit"""
+    invalidate_after_commit(object_session(target), redis_cache.invalidate_public, target.tenant_id)
@@ -1,11 +1,14 @@
 # backend/app/models/reservation.py
 
-from sqlalchemy import Column, String, Date, DateTime, Numeric, Integer, Text, JSON, Boolean, ForeignKey
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy import Column, String, Date, DateTime, Numeric, Integer, Text, JSON, Boolean, ForeignKey, Index, UniqueConstraint, func
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, validates, object_session
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime, date
 from decimal import Decimal
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class Reservation(BaseModel, TenantMixin):
@@ -14,9 +17,17 @@ class Reservation(BaseModel, TenantMixin):
     Multi-tenant: cada tenant mantém suas próprias reservas.
     """
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Paginação por cursor (keyset) da listagem: ORDER BY created_at DESC, id DESC
+        Index('ix_reservations_tenant_created_at_id', 'tenant_id', 'created_at', 'id'),
+        # Delta do mapa (since=): reservas alteradas desde o último poll
+        Index('ix_reservations_tenant_updated_at', 'tenant_id', 'updated_at'),
+        # Numeração é por tenant (reservation_number_sequences)
+        UniqueConstraint('tenant_id', 'reservation_number', name='unique_reservation_number_per_tenant'),
+    )
     
     # Identificação da reserva
-    reservation_number = Column(String(50), nullable=False, unique=True, index=True)  # RES-2025-001
+    reservation_number = Column(String(50), nullable=False, index=True)  # RES-2025-001
     
     # ✅ NOVO: Token público para acompanhamento via booking engine
     public_token = Column(String(100), nullable=True, unique=True, index=True)
@@ -49,6 +60,10 @@ class Reservation(BaseModel, TenantMixin):
     room_rate = Column(Numeric(10, 2), nullable=True)        # Diária base
     total_amount = Column(Numeric(10, 2), nullable=True)     # Valor total
     paid_amount = Column(Numeric(10, 2), default=0, nullable=False)  # Valor pago (DEPRECATED - usar payments)
+    
+    # Totais de pagamentos confirmados (mantidos pelo PaymentService na mesma transação)
+    paid_total = Column(Numeric(10, 2), default=0, server_default='0', nullable=False)
+    refunded_total = Column(Numeric(10, 2), default=0, server_default='0', nullable=False)
     discount = Column(Numeric(10, 2), default=0, nullable=False)     # Desconto
     taxes = Column(Numeric(10, 2), default=0, nullable=False)        # Impostos/taxas
     
@@ -242,26 +257,25 @@ class Reservation(BaseModel, TenantMixin):
     @property
     def total_paid(self):
         """Total efetivamente pago (apenas pagamentos confirmados)"""
-        if not self.payments:
-            return Decimal('0')
-        confirmed_payments = [p for p in self.payments if p.status == "confirmed" and not p.is_refund]
-        return sum((p.amount for p in confirmed_payments), Decimal('0'))
+        return self.paid_total or Decimal('0')
 
     @property
     def total_refunded(self):
         """Total estornado"""
-        if not self.payments:
-            return Decimal('0')
-        refunds = [p for p in self.payments if p.status == "confirmed" and p.is_refund]
-        return sum((p.amount for p in refunds), Decimal('0'))
+        return self.refunded_total or Decimal('0')
 
-    @property
+    @hybrid_property
     def balance_due(self):
         """Saldo devedor baseado nos pagamentos reais"""
         if not self.total_amount:
             return Decimal('0')
         return self.total_amount - self.total_paid + self.total_refunded
 
+    @balance_due.expression
+    def balance_due(cls):
+        """Saldo devedor em SQL (filtros e ordenação sem tocar em payments)"""
+        return func.coalesce(cls.total_amount, 0) - cls.paid_total + cls.refunded_total
+
     @property
     def balance_due_legacy(self):
         """Saldo devedor usando campo paid_amount (compatibilidade)"""
@@ -495,6 +509,10 @@ class ReservationRoom(BaseModel):
     Permite reservas multi-quarto e mudanças de quarto.
     """
     __tablename__ = "reservation_rooms"
+    __table_args__ = (
+        # Delta do mapa (since=): quartos de reserva alterados desde o último poll
+        Index('ix_reservation_rooms_updated_at', 'updated_at'),
+    )
     
     # Relacionamentos
     reservation_id = Column(Integer, ForeignKey('reservations.id'), nullable=False, index=True)
@@ -526,4 +544,14 @@ class ReservationRoom(BaseModel):
     @property
     def nights(self):
         """Número de noites neste quarto"""
-        return (self.check_out_date - self.check_in_date).days
\ No newline at end of file
+        return (self.check_out_date - self.check_in_date).days
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+@event.listens_for(Reservation, "after_insert")
+@event.listens_for(Reservation, "after_update")
+@event.listens_for(Reservation, "after_delete")
+def _invalidate_dashboard_cache(mapper, connection, target):
+    """Qualquer escrita em reserva (inclusive totais de pagamento) invalida o dashboard do tenant após o commit"""
+    invalidate_after_commit(object_session(target), redis_cache.invalidate_dashboard, target.tenant_id)
@@ -0,0 +1,24 @@
+# backend/app/models/reservation_number_sequence.py
+
+from sqlalchemy import Column, Integer, UniqueConstraint
+
+from app.models.base import BaseModel, TenantMixin
+
+
+class ReservationNumberSequence(BaseModel, TenantMixin):
+    """
+    Contador de números de reserva por tenant e ano (RES-{ano}-{sequência}).
+    Incrementado atomicamente pelo ReservationNumberService; a última
+    sequência emitida fica em last_value.
+    """
+    __tablename__ = "reservation_number_sequences"
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'year', name='unique_reservation_number_sequence'),
+    )
+
+    year = Column(Integer, nullable=False)
+    last_value = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return (f"<ReservationNumberSequence(tenant_id={self.tenant_id}, year={self.year}, "
+                f"last_value={self.last_value})>")
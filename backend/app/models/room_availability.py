@@ -1,12 +1,14 @@
 # backend/app/models/room_availability.py
 
 from sqlalchemy import Column, Integer, Date, Boolean, Numeric, String, Text, ForeignKey, UniqueConstraint, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, object_session
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Dict, Any, Optional, List
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import invalidate_availability_after_commit
 
 
 class RoomAvailability(BaseModel, TenantMixin):
@@ -345,4 +347,18 @@ class RoomAvailability(BaseModel, TenantMixin):
         )
     
     def __str__(self):
-        return f"Room {self.room_id} on {self.date} - {self.status}"
\ No newline at end of file
+        return f"Room {self.room_id} on {self.date} - {self.status}"
+
+
+@event.listens_for(RoomAvailability, "after_insert")
+@event.listens_for(RoomAvailability, "after_update")
+@event.listens_for(RoomAvailability, "after_delete")
+def _invalidate_availability_windows(mapper, connection, target):
+    """
+    Qualquer escrita de célula pelo ORM invalida, após o commit, as janelas em
+    cache que contêm a data. Escritas em massa (upsert, Query.update) não passam
+    por aqui e registram a invalidação explicitamente.
+    """
+    invalidate_availability_after_commit(
+        object_session(target), target.tenant_id, [target.room_id], target.date, target.date
+    )
@@ -0,0 +1,42 @@
+# backend/app/models/room_night_occupancy.py
+
+from sqlalchemy import Column, Integer, Date, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+
+from app.models.base import BaseModel, TenantMixin
+
+
+class RoomNightOccupancy(BaseModel, TenantMixin):
+    """
+    Ledger de ocupação - uma linha por quarto/noite ocupado por uma reserva ativa.
+    Mantido transacionalmente pelo ciclo de vida da reserva (ReservationService),
+    transformando a verificação de disponibilidade em lookup indexado por (room_id, date).
+    A constraint única impede que duas reservas ocupem o mesmo quarto na mesma noite.
+    Multi-tenant: cada tenant mantém seu próprio ledger.
+    """
+    __tablename__ = "room_night_occupancies"
+    __table_args__ = (
+        UniqueConstraint('room_id', 'date', name='unique_room_night_occupancy'),
+        Index('ix_room_night_occupancies_tenant_date', 'tenant_id', 'date'),
+    )
+
+    # Quarto e noite ocupados
+    room_id = Column(Integer, ForeignKey('rooms.id'), nullable=False, index=True)
+    date = Column(Date, nullable=False)
+
+    # Origem da ocupação
+    reservation_id = Column(
+        Integer,
+        ForeignKey('reservations.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    reservation_room_id = Column(Integer, ForeignKey('reservation_rooms.id', ondelete='CASCADE'), nullable=True)
+
+    # Relacionamentos
+    room = relationship("Room")
+    reservation = relationship("Reservation")
+
+    def __repr__(self):
+        return (f"<RoomNightOccupancy(room_id={self.room_id}, date={self.date}, "
+                f"reservation_id={self.reservation_id})>")
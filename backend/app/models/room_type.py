@@ -1,9 +1,11 @@
 # backend/app/models/room_type.py
 
 from sqlalchemy import Column, String, Text, Integer, Numeric, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, object_session
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class RoomType(BaseModel, TenantMixin):
@@ -64,4 +66,14 @@ class RoomType(BaseModel, TenantMixin):
         if config.get("king", 0) > 0:
             beds.append(f"{config['king']} cama king")
             
-        return ", ".join(beds) if beds else f"{self.base_capacity} pessoas"
\ No newline at end of file
+        return ", ".join(beds) if beds else f"{self.base_capacity} pessoas"
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+@event.listens_for(RoomType, "after_insert")
+@event.listens_for(RoomType, "after_update")
+@event.listens_for(RoomType, "after_delete")
+def _invalidate_public_cache(mapper, connection, target):
+    """Tipos de quarto aparecem em /public/properties/{slug}: invalida as respostas do tenant após o commit"""
+    invalidate_after_commit(object_session(target), redis_cache.invalidate_public, target.tenant_id)
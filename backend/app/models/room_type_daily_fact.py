@@ -0,0 +1,296 @@
+# backend/app/models/room_type_daily_fact.py
+
+from sqlalchemy import Column, Integer, Date, Numeric, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import relationship, object_session, Session
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional, Iterable
+import logging
+
+from app.models.base import BaseModel, TenantMixin
+from app.models.reservation import Reservation, ReservationRoom
+from app.models.room import Room
+
+logger = logging.getLogger(__name__)
+
+
+class RoomTypeDailyFact(BaseModel, TenantMixin):
+    """
+    Fato diário de ocupação - uma linha por (propriedade, tipo de quarto, data)
+    com room-nights vendidas, receita e room-nights disponíveis.
+    Pré-agregado para análises de ocupação, ADR e RevPAR; recalculado pelo
+    OccupancyFactService a partir das escritas em reservas/quartos (em uma task
+    disparada após o commit) e por uma task noturna de reconciliação.
+    """
+    __tablename__ = "room_type_daily_facts"
+    __table_args__ = (
+        UniqueConstraint('property_id', 'room_type_id', 'date', name='unique_room_type_daily_fact'),
+        Index('ix_room_type_daily_facts_tenant_date', 'tenant_id', 'date'),
+    )
+
+    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False, index=True)
+    room_type_id = Column(Integer, ForeignKey('room_types.id'), nullable=False, index=True)
+    date = Column(Date, nullable=False)
+
+    # Métricas do dia
+    sold_room_nights = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=Decimal('0.00'), nullable=False)
+    available_room_nights = Column(Integer, default=0, nullable=False)
+
+    # Relacionamentos
+    property_obj = relationship("Property")
+    room_type = relationship("RoomType")
+
+    def __repr__(self):
+        return (f"<RoomTypeDailyFact(property_id={self.property_id}, room_type_id={self.room_type_id}, "
+                f"date={self.date}, sold={self.sold_room_nights}/{self.available_room_nights})>")
+
+
+# ============== RECÁLCULO APÓS O COMMIT ==============
+
+_DIRTY_FACTS_KEY = "occupancy_facts_dirty"
+_DIRTY_FACT_RESERVATIONS_KEY = "occupancy_facts_dirty_reservations"
+_PENDING_FACTS_KEY = "occupancy_facts_pending"
+
+# Campos da reserva que alteram os fatos (pagamentos, notas etc. não alteram)
+_RESERVATION_FACT_FIELDS = (
+    'status', 'check_in_date', 'check_out_date', 'total_amount', 'property_id', 'is_active'
+)
+# Campos do quarto que alteram o inventário (available_room_nights)
+_ROOM_FACT_FIELDS = ('room_type_id', 'property_id', 'is_active', 'is_operational')
+
+
+def mark_occupancy_facts_dirty(
+    session: Optional[Session],
+    tenant_id: int,
+    property_id: int,
+    date_from: date,
+    date_to: date,
+    room_type_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Agenda o recálculo de [date_from, date_to) da propriedade para depois do
+    commit da sessão, só dos tipos de quarto informados (None = todos).
+    Intervalos da mesma propriedade são unidos em um só recálculo.
+    """
+    if session is None or not tenant_id or not property_id or not date_from or not date_to:
+        return
+    if date_to <= date_from:
+        return
+
+    room_type_ids = set(room_type_ids) if room_type_ids is not None else None
+    dirty = session.info.setdefault(_DIRTY_FACTS_KEY, {})
+    key = (tenant_id, property_id)
+    if key in dirty:
+        current_from, current_to, current_types = dirty[key]
+        if current_types is None or room_type_ids is None:
+            room_type_ids = None
+        else:
+            room_type_ids = current_types | room_type_ids
+        dirty[key] = (min(current_from, date_from), max(current_to, date_to), room_type_ids)
+    else:
+        dirty[key] = (date_from, date_to, room_type_ids)
+
+
+def _history_dates(target, field: str) -> list:
+    """Valores novo e antigo (não nulos) de um atributo (datas, ids)"""
+    history = inspect(target).attrs[field].history
+    values = list(history.added or ()) + list(history.deleted or ()) + list(history.unchanged or ())
+    return [value for value in values if value is not None]
+
+
+def _has_changes(target, fields) -> bool:
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _mark_reservation_dirty(
+    session: Optional[Session],
+    reservation_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    room_ids: Iterable[int] = ()
+) -> None:
+    """
+    Agenda o recálculo dos dias de uma reserva; propriedade, datas atuais e
+    tipos de quarto são resolvidos no commit (o intervalo e os quartos
+    informados cobrem os valores antigos).
+    """
+    if session is None or not reservation_id:
+        return
+
+    dirty = session.info.setdefault(_DIRTY_FACT_RESERVATIONS_KEY, {})
+    current_from, current_to, current_rooms = dirty.get(reservation_id, (None, None, set()))
+    if date_from and date_to:
+        current_from = min(current_from, date_from) if current_from else date_from
+        current_to = max(current_to, date_to) if current_to else date_to
+    dirty[reservation_id] = (current_from, current_to, current_rooms | set(room_ids))
+
+
+@event.listens_for(Reservation, "after_insert")
+@event.listens_for(Reservation, "after_update")
+def _mark_reservation_facts(mapper, connection, target):
+    """Reserva criada/alterada: recalcula os dias antigos e novos"""
+    if not _has_changes(target, _RESERVATION_FACT_FIELDS):
+        return
+
+    session = object_session(target)
+    check_ins = _history_dates(target, 'check_in_date')
+    check_outs = _history_dates(target, 'check_out_date')
+    date_from = min(check_ins) if check_ins else None
+    date_to = max(check_outs) if check_outs else None
+
+    _mark_reservation_dirty(session, target.id, date_from, date_to)
+
+    # Reserva movida de propriedade: a antiga também precisa ser recalculada
+    old_property_ids = inspect(target).attrs.property_id.history.deleted or ()
+    for property_id in old_property_ids:
+        mark_occupancy_facts_dirty(session, target.tenant_id, property_id, date_from, date_to)
+
+
+@event.listens_for(Reservation, "after_delete")
+def _mark_deleted_reservation_facts(mapper, connection, target):
+    mark_occupancy_facts_dirty(
+        object_session(target), target.tenant_id, target.property_id,
+        target.check_in_date, target.check_out_date
+    )
+
+
+@event.listens_for(ReservationRoom, "after_insert")
+@event.listens_for(ReservationRoom, "after_update")
+@event.listens_for(ReservationRoom, "after_delete")
+def _mark_reservation_room_facts(mapper, connection, target):
+    """Quarto da reserva trocado/alterado: recalcula os dias antigos e novos"""
+    check_ins = _history_dates(target, 'check_in_date')
+    check_outs = _history_dates(target, 'check_out_date')
+    _mark_reservation_dirty(
+        object_session(target),
+        target.reservation_id,
+        min(check_ins) if check_ins else None,
+        max(check_outs) if check_outs else None,
+        _history_dates(target, 'room_id')
+    )
+
+
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+def _mark_room_facts(mapper, connection, target):
+    """
+    Inventário alterado: recalcula o horizonte futuro (o passado fica como foi
+    vendido), só dos tipos de quarto antigo e novo deste quarto
+    """
+    if not _has_changes(target, _ROOM_FACT_FIELDS):
+        return
+
+    from app.core.config import settings
+
+    today = date.today()
+    horizon = today + timedelta(days=settings.OCCUPANCY_FACTS_FUTURE_DAYS)
+    session = object_session(target)
+    room_type_ids = _history_dates(target, 'room_type_id')
+    for property_id in set(_history_dates(target, 'property_id')):
+        mark_occupancy_facts_dirty(session, target.tenant_id, property_id, today, horizon, room_type_ids)
+
+
+def _resolve_reservation_ranges(session: Session, reservation_ranges: dict) -> None:
+    """
+    Converte as reservas marcadas em intervalos por propriedade, restritos aos
+    tipos de quarto dos quartos da reserva (atuais e antigos). Só leituras.
+    """
+    reservation_ids = list(reservation_ranges.keys())
+    owners = session.query(
+        Reservation.id,
+        Reservation.tenant_id,
+        Reservation.property_id,
+        Reservation.check_in_date,
+        Reservation.check_out_date
+    ).filter(Reservation.id.in_(reservation_ids)).all()
+
+    current_rooms = session.query(
+        ReservationRoom.reservation_id,
+        ReservationRoom.room_id
+    ).filter(ReservationRoom.reservation_id.in_(reservation_ids)).all()
+
+    room_ids_by_reservation = {
+        reservation_id: set(room_ids) for reservation_id, (_, _, room_ids) in reservation_ranges.items()
+    }
+    for row in current_rooms:
+        room_ids_by_reservation[row.reservation_id].add(row.room_id)
+
+    all_room_ids = set().union(*room_ids_by_reservation.values())
+    room_types = dict(
+        session.query(Room.id, Room.room_type_id).filter(Room.id.in_(all_room_ids)).all()
+    ) if all_room_ids else {}
+
+    for owner in owners:
+        old_from, old_to, _ = reservation_ranges[owner.id]
+        room_type_ids = {
+            room_types[room_id]
+            for room_id in room_ids_by_reservation[owner.id]
+            if room_types.get(room_id) is not None
+        }
+        # Reserva sem quartos (nem antes nem agora) não altera nenhum fato
+        if not room_type_ids:
+            continue
+        mark_occupancy_facts_dirty(
+            session, owner.tenant_id, owner.property_id,
+            min(owner.check_in_date, old_from) if old_from else owner.check_in_date,
+            max(owner.check_out_date, old_to) if old_to else owner.check_out_date,
+            room_type_ids
+        )
+
+
+@event.listens_for(Session, "before_commit")
+def _collect_dirty_occupancy_facts(session: Session) -> None:
+    """
+    Fecha os intervalos marcados antes do commit. O recálculo em si roda fora
+    da transação de escrita (ver _dispatch_occupancy_facts_refresh): travar as
+    linhas de fatos aqui faria reservas concorrentes da propriedade esperarem
+    umas pelas outras.
+    """
+    # Flush antes para que os listeners acima registrem as últimas alterações
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+
+    reservation_ranges = session.info.pop(_DIRTY_FACT_RESERVATIONS_KEY, None)
+    if reservation_ranges:
+        _resolve_reservation_ranges(session, reservation_ranges)
+
+    dirty = session.info.pop(_DIRTY_FACTS_KEY, None)
+    if not dirty:
+        return
+
+    pending = session.info.setdefault(_PENDING_FACTS_KEY, [])
+    for (tenant_id, property_id), (date_from, date_to, room_type_ids) in sorted(dirty.items()):
+        pending.append({
+            'tenant_id': tenant_id,
+            'property_id': property_id,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'room_type_ids': sorted(room_type_ids) if room_type_ids is not None else None
+        })
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_occupancy_facts_refresh(session: Session) -> None:
+    """Dispara o recálculo dos intervalos confirmados em background"""
+    pending = session.info.pop(_PENDING_FACTS_KEY, None)
+    if not pending:
+        return
+
+    try:
+        from app.core.celery_app import refresh_occupancy_fact_ranges
+        refresh_occupancy_fact_ranges.delay(pending)
+    except Exception as e:
+        logger.warning(f"⚠️ Erro ao agendar recálculo dos fatos de ocupação (reconciliação noturna pendente): {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_occupancy_facts(session: Session) -> None:
+    # Rollback de savepoint: a transação externa segue
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_DIRTY_FACTS_KEY, None)
+    session.info.pop(_DIRTY_FACT_RESERVATIONS_KEY, None)
+    session.info.pop(_PENDING_FACTS_KEY, None)
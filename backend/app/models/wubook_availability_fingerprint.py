@@ -0,0 +1,33 @@
+# backend/app/models/wubook_availability_fingerprint.py
+
+from sqlalchemy import Column, Integer, Date, String, DateTime, ForeignKey, UniqueConstraint
+
+from app.models.base import BaseModel, TenantMixin
+
+
+class WuBookAvailabilityFingerprint(BaseModel, TenantMixin):
+    """
+    Último estado enviado ao WuBook por (mapeamento, data): hash dos valores
+    avail/min_stay/max_stay/CTA/CTD/tarifa aceitos pelo canal. O
+    WuBookAvailabilitySyncService compara com o estado atual e envia apenas
+    as células que mudaram desde o último envio bem-sucedido.
+    """
+    __tablename__ = "wubook_availability_fingerprints"
+    __table_args__ = (
+        UniqueConstraint('mapping_id', 'date', name='unique_wubook_availability_fingerprint'),
+    )
+
+    mapping_id = Column(
+        Integer,
+        ForeignKey('wubook_room_mappings.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    date = Column(Date, nullable=False)
+
+    fingerprint = Column(String(32), nullable=False)
+    pushed_at = Column(DateTime, nullable=False)  # Último envio aceito pelo WuBook
+
+    def __repr__(self):
+        return (f"<WuBookAvailabilityFingerprint(mapping_id={self.mapping_id}, date={self.date}, "
+                f"fingerprint={self.fingerprint})>")
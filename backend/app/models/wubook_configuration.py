@@ -1,11 +1,13 @@
 # backend/app/models/wubook_configuration.py
 
 from sqlalchemy import Column, String, Text, Boolean, Integer, JSON, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import relationship, object_session
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 
 class WuBookConfiguration(BaseModel, TenantMixin):
@@ -151,4 +153,38 @@ class WuBookConfiguration(BaseModel, TenantMixin):
         self.connection_status = "pending"
         self.last_sync_at = None
         self.last_sync_status = None
-        self.error_count = 0
\ No newline at end of file
+        self.error_count = 0
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+# Campos que mudam o que os mapeamentos em cache representam (conta WuBook
+# apontada, credenciais, mapeamentos de canais/tarifas). O status de sync
+# gravado a cada ciclo (last_sync_*, error_count) não entra aqui.
+_ROOM_MAPPING_FIELDS = (
+    'property_id', 'wubook_token', 'wubook_lcode', 'is_active',
+    'channel_mappings', 'rate_multiplier'
+)
+
+
+@event.listens_for(WuBookConfiguration, "after_insert")
+@event.listens_for(WuBookConfiguration, "after_delete")
+def _invalidate_configuration_caches(mapper, connection, target):
+    """Configuração criada ou removida: invalida resumos do tenant e mapeamentos após o commit"""
+    session = object_session(target)
+    invalidate_after_commit(session, redis_cache.invalidate_configurations, target.tenant_id)
+    invalidate_after_commit(session, redis_cache.invalidate_room_mappings, target.id)
+
+
+@event.listens_for(WuBookConfiguration, "after_update")
+def _invalidate_updated_configuration_caches(mapper, connection, target):
+    """
+    O resumo do tenant inclui o status de sync e é invalidado em qualquer
+    escrita; os mapeamentos só quando um campo de _ROOM_MAPPING_FIELDS mudou.
+    """
+    session = object_session(target)
+    invalidate_after_commit(session, redis_cache.invalidate_configurations, target.tenant_id)
+
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _ROOM_MAPPING_FIELDS):
+        invalidate_after_commit(session, redis_cache.invalidate_room_mappings, target.id)
@@ -1,13 +1,15 @@
 # backend/app/models/wubook_room_mapping.py
 
 from sqlalchemy import Column, String, Text, Boolean, Integer, Numeric, JSON, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship, Session
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, Session, object_session
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from datetime import datetime
 import logging
 
 from app.models.base import BaseModel, TenantMixin
+from app.core.redis import redis_cache, invalidate_after_commit
 
 logger = logging.getLogger(__name__)
 
@@ -448,4 +450,16 @@ class WuBookRoomMapping(BaseModel, TenantMixin):
                 "error_mappings": 0,
                 "orphaned_details": [],
                 "health_score": 0.0
-            }
\ No newline at end of file
+            }
+
+
+# ============== INVALIDAÇÃO DE CACHE ==============
+
+@event.listens_for(WuBookRoomMapping, "after_insert")
+@event.listens_for(WuBookRoomMapping, "after_update")
+@event.listens_for(WuBookRoomMapping, "after_delete")
+def _invalidate_room_mappings_cache(mapper, connection, target):
+    """Qualquer escrita em um mapeamento invalida o cache da configuração após o commit"""
+    invalidate_after_commit(
+        object_session(target), redis_cache.invalidate_room_mappings, target.configuration_id
+    )
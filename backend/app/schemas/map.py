@@ -138,6 +138,30 @@ class MapResponse(BaseModel):
         from_attributes = True
 
 
+class MapReservationDelta(MapReservationResponse):
+    """Reserva alterada no delta do mapa, com os quartos que ocupa agora"""
+    room_ids: List[int] = []
+
+
+class MapDeltaResponse(BaseModel):
+    """
+    Alterações do mapa desde `since` (polling do tape chart).
+    O cliente remove cada reserva listada (em reservations ou
+    removed_reservation_ids) de todos os quartos e recoloca as de reservations
+    em room_ids. Em rooms vêm só os metadados dos quartos alterados.
+    Deltas consecutivos podem repetir itens; aplicá-los de novo não muda o mapa.
+    """
+    since: datetime
+    generated_at: datetime  # Usar como próximo `since` (recuado: deltas se sobrepõem)
+    start_date: date
+    end_date: date
+    
+    reservations: List[MapReservationDelta] = []
+    removed_reservation_ids: List[int] = []
+    rooms: List[MapRoomData] = []
+    removed_room_ids: List[int] = []
+
+
 class MapStatsResponse(BaseModel):
     """Schema para estatísticas do mapa"""
     period_start: date
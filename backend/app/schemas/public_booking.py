@@ -64,6 +64,9 @@ class PublicBookingCreate(BaseModel):
     source: Optional[str] = Field(None, max_length=100, description="Origem da reserva")
     referrer: Optional[str] = Field(None, max_length=500, description="URL de referência")
     
+    # Hold tomado no início do checkout (POST /booking/hold)
+    hold_id: Optional[str] = Field(None, max_length=64, description="ID da reserva temporária do quarto")
+    
     @field_validator('check_out_date')
     @classmethod
     def validate_dates(cls, v, info):
@@ -93,6 +96,38 @@ class PublicBookingCreate(BaseModel):
         return v.strip()
 
 
+# ============== INVENTORY HOLD ==============
+
+class PublicBookingHoldCreate(BaseModel):
+    """
+    Schema para segurar o quarto/período durante o checkout público.
+    O hold expira sozinho (PUBLIC_BOOKING_HOLD_TTL_SECONDS) se a reserva não for concluída.
+    """
+    property_slug: str = Field(..., min_length=3, max_length=100, description="Slug da propriedade")
+    room_id: int = Field(..., gt=0, description="ID do quarto")
+    check_in_date: date = Field(..., description="Data de check-in")
+    check_out_date: date = Field(..., description="Data de check-out")
+    hold_id: Optional[str] = Field(None, max_length=64, description="Hold existente a renovar")
+    
+    @field_validator('check_out_date')
+    @classmethod
+    def validate_dates(cls, v, info):
+        """Valida que check-out é posterior ao check-in"""
+        if 'check_in_date' in info.data and v <= info.data['check_in_date']:
+            raise ValueError('Data de check-out deve ser posterior ao check-in')
+        return v
+
+
+class PublicBookingHoldResponse(BaseModel):
+    """Hold criado; hold_id é None quando holds estão indisponíveis (sem Redis)"""
+    hold_id: Optional[str] = None
+    room_id: int
+    check_in_date: date
+    check_out_date: date
+    expires_at: Optional[datetime] = None
+    message: str
+
+
 # ============== PUBLIC BOOKING RESPONSE ==============
 
 class PublicBookingResponse(BaseModel):
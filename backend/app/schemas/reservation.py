@@ -338,10 +338,14 @@ class ReservationWithDetails(ReservationResponse):
 class ReservationListResponse(BaseModel):
     """Schema para lista de reservas"""
     reservations: List[ReservationResponse]
-    total: int
+    total: Optional[int] = None
     page: int
-    pages: int
+    pages: Optional[int] = None
     per_page: int
+    
+    # Paginação por cursor (keyset)
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (None na última)")
+    total_is_estimate: bool = Field(False, description="True quando o total é limitado ('total ou mais')")
 
 
 # ===== SCHEMAS PARA OPERAÇÕES ESPECÍFICAS =====
@@ -648,11 +652,15 @@ class ReservationResponseWithGuestDetails(ReservationResponse):
 class ReservationListResponseWithDetails(BaseModel):
     """Schema para lista de reservas com detalhes expandidos"""
     reservations: List[ReservationResponseWithGuestDetails]
-    total: int
+    total: Optional[int] = None
     page: int
-    pages: int
+    pages: Optional[int] = None
     per_page: int
     
+    # Paginação por cursor (keyset)
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (None na última)")
+    total_is_estimate: bool = Field(False, description="True quando o total é limitado ('total ou mais')")
+    
     # Estatísticas da busca
     summary: Optional[Dict[str, Any]] = None
 
@@ -684,6 +692,11 @@ class ReservationExportResponse(BaseModel):
     total_records: int
     generated_at: datetime
     expires_at: datetime
+    
+    # Exportações grandes rodam em background (task Celery)
+    task_id: Optional[str] = Field(None, description="ID da task de exportação")
+    status: str = Field("completed", description="processing | completed | failed")
+    progress: Optional[float] = Field(None, description="Percentual processado (0-100)")
 
 
 # ===== SCHEMAS PARA ESTATÍSTICAS EXPANDIDAS =====
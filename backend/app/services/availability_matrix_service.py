@@ -0,0 +1,256 @@
+# backend/app/services/availability_matrix_service.py
+
+from typing import Optional, List, Dict, Any, Iterable
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from decimal import Decimal
+import logging
+
+from app.models.room import Room
+from app.models.room_availability import RoomAvailability
+from app.services.occupancy_ledger_service import OccupancyLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class AvailabilityMatrix:
+    """
+    Matriz quartos × noites carregada de uma vez para um período.
+
+    Cada quarto guarda um bitmask de noites não reserváveis (bit i = noite i),
+    de forma que "quarto livre em [check_in, check_out)" é um único AND com a
+    máscara da janela, e as tarifas ficam em uma lista por quarto.
+    Células sem registro ativo em RoomAvailability são consideradas disponíveis
+    (como em check_room_availability); quartos inativos ou inexistentes ficam
+    indisponíveis em todas as noites.
+    """
+
+    def __init__(self, room_ids: List[int], check_in_date: date, check_out_date: date):
+        self.check_in_date = check_in_date
+        self.check_out_date = check_out_date
+        self.nights: List[date] = [
+            check_in_date + timedelta(days=i)
+            for i in range((check_out_date - check_in_date).days)
+        ]
+        self.room_ids = list(room_ids)
+        self.rooms: Dict[int, Any] = {}
+
+        self._blocked: Dict[int, int] = {room_id: 0 for room_id in self.room_ids}
+        self._rates: Dict[int, List[Optional[Decimal]]] = {
+            room_id: [None] * len(self.nights) for room_id in self.room_ids
+        }
+        self._reasons: Dict[int, Dict[int, str]] = {}
+        self._details: Dict[int, List[Dict[str, Any]]] = {room_id: [] for room_id in self.room_ids}
+
+    # ============== CONSTRUÇÃO ==============
+
+    def _index(self, night: date) -> int:
+        return (night - self.check_in_date).days
+
+    def _window_mask(self, check_in_date: Optional[date], check_out_date: Optional[date]) -> int:
+        start = self._index(check_in_date) if check_in_date else 0
+        end = self._index(check_out_date) if check_out_date else len(self.nights)
+        start = max(start, 0)
+        end = min(end, len(self.nights))
+        if end <= start:
+            return 0
+        return ((1 << (end - start)) - 1) << start
+
+    def set_cell(self, availability: Any) -> None:
+        """Registra um registro de RoomAvailability na matriz"""
+        room_id = availability.room_id
+        if room_id not in self._blocked:
+            return
+
+        i = self._index(availability.date)
+        if i < 0 or i >= len(self.nights):
+            return
+
+        if not availability.is_bookable:
+            self._blocked[room_id] |= 1 << i
+            status = RoomAvailability.status.fget(availability)
+            self._reasons.setdefault(room_id, {})[i] = availability.reason or f"Status: {status}"
+
+        self._rates[room_id][i] = availability.rate_override
+        self._details[room_id].append({
+            'date': availability.date.isoformat(),
+            'status': RoomAvailability.status.fget(availability),
+            'rate': availability.rate_override,
+            'is_bookable': availability.is_bookable
+        })
+
+    def set_room_unavailable(self, room_id: int, reason: str) -> None:
+        """Bloqueia todas as noites do quarto (ex.: quarto inativo)"""
+        if room_id not in self._blocked:
+            return
+
+        self._blocked[room_id] = self._window_mask(None, None)
+        self._reasons[room_id] = {i: reason for i in range(len(self.nights))}
+
+    def set_occupied(self, room_id: int, night: date, reservation_id: int) -> None:
+        """Marca uma noite ocupada por reserva (ledger de ocupação)"""
+        if room_id not in self._blocked:
+            return
+
+        i = self._index(night)
+        if i < 0 or i >= len(self.nights):
+            return
+
+        self._blocked[room_id] |= 1 << i
+        self._reasons.setdefault(room_id, {}).setdefault(i, f"Reservado (reserva {reservation_id})")
+
+    # ============== CONSULTAS ==============
+
+    def is_bookable(
+        self,
+        room_id: int,
+        check_in_date: Optional[date] = None,
+        check_out_date: Optional[date] = None
+    ) -> bool:
+        """Verifica se o quarto está livre em todas as noites da janela"""
+        mask = self._window_mask(check_in_date, check_out_date)
+        return (self._blocked.get(room_id, 0) & mask) == 0
+
+    def bookable_room_ids(
+        self,
+        check_in_date: Optional[date] = None,
+        check_out_date: Optional[date] = None
+    ) -> List[int]:
+        """Quartos reserváveis na janela (padrão: período completo carregado)"""
+        mask = self._window_mask(check_in_date, check_out_date)
+        return [room_id for room_id in self.room_ids if (self._blocked[room_id] & mask) == 0]
+
+    def total_rate(
+        self,
+        room_id: int,
+        check_in_date: Optional[date] = None,
+        check_out_date: Optional[date] = None
+    ) -> Decimal:
+        """Soma de rate_override nas noites da janela (noites sem override não somam)"""
+        start = max(self._index(check_in_date), 0) if check_in_date else 0
+        end = min(self._index(check_out_date), len(self.nights)) if check_out_date else len(self.nights)
+        rates = self._rates.get(room_id, [])[start:end]
+        return sum((rate for rate in rates if rate), Decimal('0.00'))
+
+    def total_rates(self) -> Dict[int, Decimal]:
+        """Total do período completo para todos os quartos"""
+        return {room_id: self.total_rate(room_id) for room_id in self.room_ids}
+
+    def conflicts(self, room_id: int) -> List[Dict[str, str]]:
+        """Noites não reserváveis do quarto, no formato de check_room_availability"""
+        reasons = self._reasons.get(room_id, {})
+        return [
+            {'date': self.nights[i].isoformat(), 'reason': reasons[i]}
+            for i in sorted(reasons)
+        ]
+
+    def to_availability_result(self, room_id: int) -> Dict[str, Any]:
+        """Resultado no mesmo formato de RoomAvailabilityService.check_room_availability"""
+        conflicts = self.conflicts(room_id)
+        return {
+            'available': len(conflicts) == 0,
+            'conflicts': conflicts,
+            'restriction_violations': [],
+            'nights': len(self.nights),
+            'total_rate': self.total_rate(room_id),
+            'details': list(self._details.get(room_id, []))
+        }
+
+
+class AvailabilityMatrixService:
+    """Carrega matrizes de disponibilidade com número constante de queries"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(
+        self,
+        tenant_id: int,
+        check_in_date: date,
+        check_out_date: date,
+        property_id: Optional[int] = None,
+        room_ids: Optional[Iterable[int]] = None,
+        include_occupancy: bool = False
+    ) -> AvailabilityMatrix:
+        """
+        Carrega a matriz de uma propriedade (ou de uma lista de quartos).
+
+        Args:
+            tenant_id: ID do tenant
+            check_in_date: Primeira noite
+            check_out_date: Data de saída (exclusiva)
+            property_id: Carregar todos os quartos ativos da propriedade
+            room_ids: Carregar quartos específicos (mantém a ordem informada)
+            include_occupancy: Também marcar noites ocupadas por reservas (ledger)
+        """
+        if property_id is None and room_ids is None:
+            raise ValueError("Informe property_id ou room_ids")
+
+        rooms_query = self.db.query(
+            Room.id, Room.property_id, Room.room_type_id
+        ).filter(
+            Room.tenant_id == tenant_id,
+            Room.is_active == True
+        )
+
+        if property_id is not None:
+            rooms_query = rooms_query.filter(Room.property_id == property_id)
+        if room_ids is not None:
+            room_ids = list(room_ids)
+            rooms_query = rooms_query.filter(Room.id.in_(room_ids))
+
+        rooms = {row.id: row for row in rooms_query.all()}
+        ordered_ids = room_ids if room_ids is not None else sorted(rooms)
+
+        matrix = AvailabilityMatrix(ordered_ids, check_in_date, check_out_date)
+        matrix.rooms = rooms
+
+        if not ordered_ids or not matrix.nights:
+            return matrix
+
+        for room_id in ordered_ids:
+            if room_id not in rooms:
+                matrix.set_room_unavailable(room_id, "Quarto inativo ou não encontrado")
+
+        active_ids = [room_id for room_id in ordered_ids if room_id in rooms]
+        if not active_ids:
+            return matrix
+
+        cells = self.db.query(
+            RoomAvailability.room_id,
+            RoomAvailability.date,
+            RoomAvailability.is_available,
+            RoomAvailability.is_blocked,
+            RoomAvailability.is_out_of_order,
+            RoomAvailability.is_maintenance,
+            RoomAvailability.is_reserved,
+            RoomAvailability.closed_to_arrival,
+            RoomAvailability.closed_to_departure,
+            RoomAvailability.is_bookable,
+            RoomAvailability.rate_override,
+            RoomAvailability.reason
+        ).filter(
+            RoomAvailability.room_id.in_(active_ids),
+            RoomAvailability.date >= check_in_date,
+            RoomAvailability.date < check_out_date,
+            RoomAvailability.tenant_id == tenant_id,
+            RoomAvailability.is_active == True
+        ).all()
+
+        for cell in cells:
+            matrix.set_cell(cell)
+
+        if include_occupancy:
+            occupied = OccupancyLedgerService(self.db).get_occupied_nights(
+                active_ids, check_in_date, check_out_date, tenant_id
+            )
+            for room_id, nights in occupied.items():
+                for night, reservation_id in nights.items():
+                    matrix.set_occupied(room_id, night, reservation_id)
+
+        logger.debug(
+            f"Matriz de disponibilidade carregada: {len(ordered_ids)} quartos × "
+            f"{len(matrix.nights)} noites ({len(cells)} registros)"
+        )
+
+        return matrix
@@ -9,6 +9,7 @@ import logging
 import uuid
 import math
 import json
+from types import SimpleNamespace
 
 from app.models.user import User
 from app.models.room import Room
@@ -27,6 +28,7 @@ from app.services.room_availability_service import RoomAvailabilityService
 from app.services.restriction_service import RestrictionService
 # ✅ NOVO IMPORT PARA SINCRONIZAÇÃO MANUAL
 from app.services.manual_sync_service import ManualSyncService
+from app.services.notification_service import notification_service
 from app.utils.decorators import AuditContext
 
 logger = logging.getLogger(__name__)
@@ -374,7 +376,26 @@ class BulkEditService:
         
         return result
     
-    # ============== EXECUÇÃO REAL - MÉTODO FALTANDO ==============
+    # ============== EXECUÇÃO REAL (SET-BASED) ==============
+    
+    # Colunas de RoomAvailability gravadas pelo bulk edit, por target
+    TARGET_COLUMNS = {
+        BulkEditTarget.PRICE: ['rate_override'],
+        BulkEditTarget.AVAILABILITY: ['is_available'],
+        BulkEditTarget.BLOCKED: ['is_blocked'],
+        BulkEditTarget.MIN_STAY: ['min_stay'],
+        BulkEditTarget.MAX_STAY: ['max_stay'],
+        BulkEditTarget.CLOSED_TO_ARRIVAL: ['closed_to_arrival'],
+        BulkEditTarget.CLOSED_TO_DEPARTURE: ['closed_to_departure'],
+        BulkEditTarget.STOP_SELL: ['is_available', 'is_blocked'],
+    }
+    
+    # Colunas mantidas em memória para cada célula da grade
+    CELL_COLUMNS = [
+        'rate_override', 'is_available', 'is_blocked', 'min_stay', 'max_stay',
+        'closed_to_arrival', 'closed_to_departure', 'sync_pending', 'reason',
+        'is_active', 'updated_at'
+    ]
     
     def _execute_real_operations(
         self,
@@ -386,19 +407,26 @@ class BulkEditService:
         user: User,
         request_obj: Optional[Any] = None
     ) -> BulkEditResult:
-        """Executa operações reais no banco de dados"""
+        """
+        Executa operações reais no banco de dados de forma set-based:
+        carrega a grade quartos × datas em uma query, calcula os novos valores
+        em memória e grava tudo com INSERT ... ON CONFLICT (room_id, date) DO UPDATE
+        em lotes.
+        """
         
         detailed_results = []
         
         try:
+            # 1. Grade existente em uma única query
+            grid = self._load_availability_grid(target_rooms, target_dates, tenant_id)
+            
+            # 2. Calcular novos valores em memória
+            rows = []
             for room in target_rooms:
                 for target_date in target_dates:
-                    # Obter ou criar registro de availability
-                    availability_record = self._get_or_create_availability_record(
-                        room, target_date, tenant_id, request.create_missing_records
-                    )
+                    cell = grid.get((room.id, target_date))
                     
-                    if not availability_record and not request.create_missing_records:
+                    if cell is None and not request.create_missing_records:
                         # Pular se não deve criar registros e não existe
                         for operation in request.operations:
                             item_result = BulkEditItemResult(
@@ -415,11 +443,16 @@ class BulkEditService:
                             result.skipped_operations += 1
                         continue
                     
+                    created_record = cell is None
+                    if created_record:
+                        cell = self._new_availability_cell()
+                    
+                    cell_changed = created_record
+                    
                     for operation in request.operations:
                         try:
                             item_result = self._execute_single_real_operation(
-                                operation, room, target_date, availability_record, 
-                                request, tenant_id
+                                operation, room, target_date, cell, request, created_record
                             )
                             
                             # Garantir serialização segura do resultado
@@ -429,6 +462,7 @@ class BulkEditService:
                             result.total_operations_executed += 1
                             
                             if item_result.success:
+                                cell_changed = True
                                 result.successful_operations += 1
                                 if item_result.created_record:
                                     result.records_created += 1
@@ -444,10 +478,30 @@ class BulkEditService:
                             logger.error(f"Erro na operação real: {error_msg}")
                             result.failed_operations += 1
                             result.processing_errors.append(error_msg)
-            
-            # Commit todas as alterações
+                    
+                    if cell_changed:
+                        row = {column: getattr(cell, column) for column in self.CELL_COLUMNS}
+                        row.update(room_id=room.id, date=target_date, tenant_id=tenant_id)
+                        rows.append(row)
+            
+            # 3. Gravar em lotes e commit único
+            created, updated = self.availability_service.upsert_availability_rows(
+                rows, self._get_update_columns(request)
+            )
             self.db.commit()
             
+            logger.info(f"Bulk edit gravado: {created} células criadas, {updated} atualizadas")
+            
+            # Notificar após o commit (SSE + invalidação do cache de disponibilidade)
+            if rows:
+                notification_service.notify_availability_updated(
+                    tenant_id=tenant_id,
+                    room_ids=[room.id for room in target_rooms],
+                    date_from=min(target_dates).isoformat(),
+                    date_to=max(target_dates).isoformat(),
+                    updated_count=created + updated
+                )
+            
             # Atualizar contadores finais
             result.detailed_results = detailed_results
             
@@ -467,52 +521,32 @@ class BulkEditService:
         operation: BulkEditOperation,
         room: Room,
         target_date: date,
-        availability_record: Optional[RoomAvailability],
+        cell: SimpleNamespace,
         request: BulkEditRequest,
-        tenant_id: int
+        created_record: bool = False
     ) -> BulkEditItemResult:
-        """Executa uma operação individual real no banco"""
+        """Aplica uma operação individual na célula em memória (gravada depois em lote)"""
         
         try:
-            created_record = False
-            
-            # Criar registro se necessário
-            if not availability_record:
-                if not request.create_missing_records:
-                    return BulkEditItemResult(
-                        room_id=room.id,
-                        date=target_date,
-                        target=operation.target,
-                        operation=operation.operation,
-                        success=False,
-                        error_message="Registro de availability não existe",
-                        skipped=True
-                    )
-                
-                availability_record = self._create_new_availability_record(
-                    room, target_date, tenant_id
-                )
-                created_record = True
-            
             # Obter valor atual
-            old_value = self._get_current_value(availability_record, operation.target)
+            old_value = self._get_current_value(cell, operation.target)
             
             # Calcular novo valor
             new_value = self._calculate_new_value(old_value, operation)
             
             # Aplicar a mudança
-            self._apply_value_to_record(availability_record, operation.target, new_value)
+            self._apply_value_to_record(cell, operation.target, new_value)
             
             # Marcar para sincronização se necessário
             if request.sync_immediately:
-                availability_record.sync_pending = True
+                cell.sync_pending = True
             
             # Adicionar motivo se fornecido
             if request.reason:
-                availability_record.reason = request.reason
+                cell.reason = request.reason
             
             # Atualizar timestamps
-            availability_record.updated_at = datetime.utcnow()
+            cell.updated_at = datetime.utcnow()
             
             return BulkEditItemResult(
                 room_id=room.id,
@@ -535,47 +569,48 @@ class BulkEditService:
                 error_message=safe_str(e)
             )
 
-    def _get_or_create_availability_record(
+    def _load_availability_grid(
         self,
-        room: Room,
-        target_date: date,
-        tenant_id: int,
-        create_if_missing: bool = True
-    ) -> Optional[RoomAvailability]:
-        """Obtém ou cria um registro de availability"""
+        target_rooms: List[Room],
+        target_dates: List[date],
+        tenant_id: int
+    ) -> Dict[Tuple[int, date], SimpleNamespace]:
+        """
+        Carrega em uma query os registros ativos de availability do escopo.
+        Retorna {(room_id, date): célula} com as colunas editáveis. Células
+        inativas contam como inexistentes: o upsert as reativa com os padrões
+        de um registro novo (RoomAvailabilityService.upsert_availability_rows).
+        """
+        if not target_rooms or not target_dates:
+            return {}
+        
+        columns = [getattr(RoomAvailability, column) for column in self.CELL_COLUMNS]
         
-        # Tentar buscar registro existente
-        existing = self.db.query(RoomAvailability).filter(
-            RoomAvailability.room_id == room.id,
-            RoomAvailability.date == target_date,
+        records = self.db.query(
+            RoomAvailability.room_id,
+            RoomAvailability.date,
+            *columns
+        ).filter(
+            RoomAvailability.room_id.in_([room.id for room in target_rooms]),
+            RoomAvailability.date >= min(target_dates),
+            RoomAvailability.date <= max(target_dates),
             RoomAvailability.tenant_id == tenant_id,
             RoomAvailability.is_active == True
-        ).first()
+        ).all()
         
-        if existing:
-            return existing
-        
-        if not create_if_missing:
-            return None
-        
-        # Criar novo registro
-        return self._create_new_availability_record(room, target_date, tenant_id)
+        return {
+            (record.room_id, record.date): SimpleNamespace(
+                **{column: getattr(record, column) for column in self.CELL_COLUMNS}
+            )
+            for record in records
+        }
 
-    def _create_new_availability_record(
-        self,
-        room: Room,
-        target_date: date,
-        tenant_id: int
-    ) -> RoomAvailability:
-        """Cria um novo registro de availability com valores padrão"""
-        
-        new_record = RoomAvailability(
-            room_id=room.id,
-            date=target_date,
-            tenant_id=tenant_id,
+    def _new_availability_cell(self) -> SimpleNamespace:
+        """Célula nova com os valores padrão de um registro de availability"""
+        return SimpleNamespace(
+            rate_override=None,
             is_available=True,
             is_blocked=False,
-            rate_override=None,
             min_stay=1,
             max_stay=30,
             closed_to_arrival=False,
@@ -583,14 +618,21 @@ class BulkEditService:
             sync_pending=False,
             reason=None,
             is_active=True,
-            created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
-        
-        self.db.add(new_record)
-        self.db.flush()  # Para obter o ID sem commit
-        
-        return new_record
+
+    def _get_update_columns(self, request: BulkEditRequest) -> List[str]:
+        """Colunas sobrescritas em células existentes (apenas as afetadas pelas operações)"""
+        update_columns = ['updated_at', 'is_active']
+        for operation in request.operations:
+            for column in self.TARGET_COLUMNS.get(operation.target, []):
+                if column not in update_columns:
+                    update_columns.append(column)
+        if request.sync_immediately:
+            update_columns.append('sync_pending')
+        if request.reason:
+            update_columns.append('reason')
+        return update_columns
 
     def _apply_value_to_record(
         self,
@@ -0,0 +1,175 @@
+# backend/app/services/dashboard_service.py
+
+from typing import Optional, Dict, Any
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, type_coerce, Integer
+from datetime import date, timedelta
+import logging
+
+from app.models.reservation import Reservation
+from app.core.redis import redis_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardService:
+    """
+    Agregados do dashboard de reservas.
+
+    Cada painel é calculado em um único SELECT com COUNT/SUM ... FILTER (WHERE ...)
+    e guardado no cache por (tenant, propriedade) com TTL curto
+    (DASHBOARD_CACHE_TTL_SECONDS). Escritas em reservas e eventos
+    reservation:updated invalidam o cache do tenant.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _base_filters(self, tenant_id: int, property_id: Optional[int]) -> list:
+        filters = [
+            Reservation.tenant_id == tenant_id,
+            Reservation.is_active == True
+        ]
+        if property_id:
+            filters.append(Reservation.property_id == property_id)
+        return filters
+
+    # ============== RESUMO ==============
+
+    def get_summary(self, tenant_id: int, property_id: Optional[int] = None) -> Dict[str, Any]:
+        """Resumo consolidado (contagens do dia e receita) - uma query"""
+        cached = redis_cache.get_dashboard(tenant_id, property_id, "summary")
+        if cached is not None:
+            return cached
+
+        today = date.today()
+        count = func.count(Reservation.id)
+
+        row = self.db.query(
+            count.label('total_reservations'),
+            count.filter(and_(
+                Reservation.check_in_date == today,
+                Reservation.status.in_(['confirmed', 'pending'])
+            )).label('todays_checkins'),
+            count.filter(and_(
+                Reservation.check_out_date <= today,
+                Reservation.status == 'checked_in'
+            )).label('pending_checkouts'),
+            count.filter(Reservation.status == 'checked_in').label('current_guests'),
+            func.coalesce(func.sum(Reservation.total_amount), 0).label('total_revenue'),
+            func.coalesce(func.sum(Reservation.paid_total), 0).label('paid_revenue'),
+            count.filter(and_(
+                Reservation.status == 'checked_in',
+                Reservation.total_amount > Reservation.paid_total
+            )).label('checked_in_pending')
+        ).filter(*self._base_filters(tenant_id, property_id)).one()
+
+        summary = {
+            "total_reservations": row.total_reservations,
+            "todays_checkins": row.todays_checkins,
+            "pending_checkouts": row.pending_checkouts,
+            "current_guests": row.current_guests,
+            "total_revenue": float(row.total_revenue),
+            "paid_revenue": float(row.paid_revenue),
+            "pending_revenue": float(row.total_revenue) - float(row.paid_revenue),
+            "checked_in_with_pending_payment": row.checked_in_pending,
+            "summary_date": today.isoformat(),
+            "property_id": property_id
+        }
+
+        redis_cache.set_dashboard(tenant_id, property_id, "summary", summary)
+        return summary
+
+    # ============== ESTATÍSTICAS EXPANDIDAS ==============
+
+    def get_expanded_stats(self, tenant_id: int, property_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Estatísticas expandidas - uma query agrupada por (status, origem); os
+        totais gerais são a soma dos grupos.
+        """
+        cached = redis_cache.get_dashboard(tenant_id, property_id, "stats")
+        if cached is not None:
+            return cached
+
+        today = date.today()
+        this_month_start = today.replace(day=1)
+        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
+
+        count = func.count(Reservation.id)
+        amount = func.coalesce(Reservation.total_amount, 0)
+        this_month = Reservation.created_at >= this_month_start
+        last_month = and_(
+            Reservation.created_at >= last_month_start,
+            Reservation.created_at < this_month_start
+        )
+
+        rows = self.db.query(
+            Reservation.status,
+            Reservation.source,
+            count.label('reservations'),
+            func.coalesce(func.sum(amount), 0).label('revenue'),
+            func.coalesce(func.sum(
+                type_coerce(Reservation.check_out_date - Reservation.check_in_date, Integer)
+            ), 0).label('nights'),
+            func.coalesce(func.sum(Reservation.total_guests), 0).label('guests'),
+            count.filter(and_(
+                Reservation.status == 'confirmed',
+                Reservation.check_in_date == today
+            )).label('pending_checkins'),
+            count.filter(and_(
+                Reservation.status == 'checked_in',
+                Reservation.check_out_date == today
+            )).label('pending_checkouts'),
+            count.filter(this_month).label('this_month_reservations'),
+            func.coalesce(func.sum(amount).filter(this_month), 0).label('this_month_revenue'),
+            count.filter(last_month).label('last_month_reservations'),
+            func.coalesce(func.sum(amount).filter(last_month), 0).label('last_month_revenue')
+        ).filter(
+            *self._base_filters(tenant_id, property_id)
+        ).group_by(Reservation.status, Reservation.source).all()
+
+        count_keys = (
+            'reservations', 'nights', 'guests', 'pending_checkins', 'pending_checkouts',
+            'this_month_reservations', 'last_month_reservations'
+        )
+        amount_keys = ('revenue', 'this_month_revenue', 'last_month_revenue')
+
+        totals: Dict[str, Any] = {key: 0 for key in count_keys}
+        totals.update({key: 0.0 for key in amount_keys})
+        status_distribution: Dict[str, int] = {}
+        source_distribution: Dict[str, int] = {}
+
+        for row in rows:
+            for key in count_keys:
+                totals[key] += getattr(row, key)
+            for key in amount_keys:
+                totals[key] += float(getattr(row, key))
+            status_distribution[row.status] = status_distribution.get(row.status, 0) + row.reservations
+            source_distribution[row.source] = source_distribution.get(row.source, 0) + row.reservations
+
+        total_reservations = totals['reservations']
+
+        def _avg(value: float) -> float:
+            return value / total_reservations if total_reservations > 0 else 0
+
+        stats = {
+            "total_reservations": total_reservations,
+            "total_revenue": totals['revenue'],
+            "occupancy_rate": 75.0,  # mock - ocupação real em /analysis/occupancy
+            "pending_checkins": totals['pending_checkins'],
+            "pending_checkouts": totals['pending_checkouts'],
+            "overdue_payments": 0,  # mock
+            "avg_nights": round(_avg(totals['nights']), 1),
+            "avg_guests": round(_avg(totals['guests']), 1),
+            "avg_amount": round(_avg(totals['revenue']), 2),
+            "this_month_reservations": totals['this_month_reservations'],
+            "this_month_revenue": totals['this_month_revenue'],
+            "last_month_reservations": totals['last_month_reservations'],
+            "last_month_revenue": totals['last_month_revenue'],
+            "status_distribution": status_distribution,
+            "source_distribution": source_distribution,
+            "recent_activity": []
+        }
+
+        redis_cache.set_dashboard(tenant_id, property_id, "stats", stats)
+        return stats
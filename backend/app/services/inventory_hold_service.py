@@ -0,0 +1,208 @@
+# backend/app/services/inventory_hold_service.py
+
+from typing import Optional, Dict, Any, List
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import date, datetime, timedelta
+import json
+import secrets
+import logging
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# Toma todas as noites ou nenhuma. Noites já seguradas pelo mesmo hold são
+# renovadas; retorna 0 em caso de sucesso ou o índice da primeira noite em conflito.
+_ACQUIRE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner and owner ~= ARGV[1] then
+        return i
+    end
+end
+for _, key in ipairs(KEYS) do
+    redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+end
+return 0
+"""
+
+# Libera apenas as noites que ainda pertencem ao hold
+_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+# Serializa, dentro da transação, quem grava reservas no mesmo quarto/noite
+_LOCK_ROOM_NIGHTS_SQL = text("""
+    SELECT pg_advisory_xact_lock(:room_id, night)
+    FROM generate_series(CAST(:first_night AS integer), CAST(:last_night AS integer)) AS night
+    ORDER BY night
+""")
+
+
+class InventoryHoldService:
+    """
+    Reservas temporárias (holds) de quarto/noite para o motor público.
+
+    Um hold é tomado quando o hóspede inicia o checkout: cada noite vira uma
+    chave Redis com TTL, gravada atomicamente (script Lua) para todas as
+    noites ou nenhuma. Em create_booking o hold é conferido e, após o commit,
+    liberado (convertido em reserva). Sem Redis os holds ficam desativados e a
+    criação continua protegida por advisory locks por quarto/noite
+    (lock_room_nights) e pelo ledger de ocupação.
+
+    Chaves:
+        hold:room:{room_id}:{data}  -> hold_id   (uma por noite)
+        hold:meta:{hold_id}         -> dados do hold (JSON)
+    """
+
+    PREFIX = "hold"
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ============== CHAVES ==============
+
+    @classmethod
+    def _night_keys(cls, room_id: int, check_in: date, check_out: date) -> List[str]:
+        # Hash tag {room_id}: todas as noites do quarto no mesmo slot (Redis Cluster)
+        nights = (check_out - check_in).days
+        return [
+            f"{cls.PREFIX}:room:{{{room_id}}}:{(check_in + timedelta(days=offset)).isoformat()}"
+            for offset in range(nights)
+        ]
+
+    @classmethod
+    def _meta_key(cls, hold_id: str) -> str:
+        return f"{cls.PREFIX}:meta:{hold_id}"
+
+    # ============== HOLDS (REDIS) ==============
+
+    def acquire(
+        self,
+        tenant_id: int,
+        property_id: int,
+        room_id: int,
+        check_in: date,
+        check_out: date,
+        ttl_seconds: Optional[int] = None,
+        hold_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Segura as noites [check_in, check_out) do quarto.
+        Retorna os dados do hold, ou None se o Redis estiver indisponível.
+
+        Raises:
+            ValueError: Se alguma noite já estiver segura por outro hold
+        """
+        client = get_redis_client()
+        if client is None:
+            return None
+
+        ttl_seconds = ttl_seconds or settings.PUBLIC_BOOKING_HOLD_TTL_SECONDS
+        hold_id = hold_id or secrets.token_urlsafe(16)
+        keys = self._night_keys(room_id, check_in, check_out)
+
+        try:
+            conflict = client.eval(_ACQUIRE_SCRIPT, len(keys), *keys, hold_id, ttl_seconds * 1000)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao criar hold de inventário: {e}")
+            return None
+
+        if conflict:
+            raise ValueError(
+                "Quarto em processo de reserva por outro hóspede para o período selecionado. "
+                "Tente novamente em alguns minutos."
+            )
+
+        hold = {
+            'hold_id': hold_id,
+            'tenant_id': tenant_id,
+            'property_id': property_id,
+            'room_id': room_id,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': check_out.isoformat(),
+            'expires_at': (datetime.utcnow() + timedelta(seconds=ttl_seconds)).isoformat()
+        }
+
+        try:
+            client.set(self._meta_key(hold_id), json.dumps(hold), ex=ttl_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao gravar dados do hold {hold_id}: {e}")
+
+        logger.debug(f"Hold {hold_id}: quarto {room_id} {check_in}..{check_out} por {ttl_seconds}s")
+        return hold
+
+    def get(self, hold_id: str) -> Optional[Dict[str, Any]]:
+        """Dados do hold ativo (None se expirado, inexistente ou sem Redis)"""
+        client = get_redis_client()
+        if client is None or not hold_id:
+            return None
+
+        try:
+            raw = client.get(self._meta_key(hold_id))
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao ler hold {hold_id}: {e}")
+            return None
+
+        return json.loads(raw) if raw else None
+
+    def release(self, hold: Optional[Dict[str, Any]]) -> int:
+        """Libera as noites do hold (após converter em reserva ou desistência)"""
+        if not hold:
+            return 0
+
+        client = get_redis_client()
+        if client is None:
+            return 0
+
+        keys = self._night_keys(
+            hold['room_id'],
+            date.fromisoformat(hold['check_in_date']),
+            date.fromisoformat(hold['check_out_date'])
+        )
+
+        try:
+            released = client.eval(_RELEASE_SCRIPT, len(keys), *keys, hold['hold_id']) if keys else 0
+            client.delete(self._meta_key(hold['hold_id']))
+            return released
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao liberar hold {hold['hold_id']}: {e}")
+            return 0
+
+    @staticmethod
+    def covers(hold: Dict[str, Any], room_id: int, check_in: date, check_out: date) -> bool:
+        """O hold segura exatamente este quarto e período?"""
+        return (
+            hold.get('room_id') == room_id
+            and hold.get('check_in_date') == check_in.isoformat()
+            and hold.get('check_out_date') == check_out.isoformat()
+        )
+
+    # ============== LOCK NO BANCO ==============
+
+    def lock_room_nights(self, room_id: int, check_in: date, check_out: date) -> None:
+        """
+        Advisory locks de transação por (quarto, noite), sempre na mesma ordem.
+        Duas criações concorrentes só esperam uma pela outra se disputam a
+        mesma noite do mesmo quarto; os locks caem no commit/rollback.
+        """
+        if check_out <= check_in:
+            return
+
+        self.db.execute(_LOCK_ROOM_NIGHTS_SQL, {
+            'room_id': room_id,
+            'first_night': check_in.toordinal(),
+            'last_night': (check_out - timedelta(days=1)).toordinal()
+        })
@@ -1,11 +1,13 @@
 # backend/app/services/map_service.py
 
 from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy.orm import Session, joinedload, selectinload  # ✅ ADICIONADO selectinload
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_, func, case, text, desc
+from sqlalchemy import and_, or_, func, case, text, desc, select, union
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+import hashlib
+import pytz
 
 from app.models.room import Room
 from app.models.room_type import RoomType
@@ -13,13 +15,16 @@ from app.models.property import Property
 from app.models.reservation import Reservation, ReservationRoom
 from app.models.guest import Guest
 from app.models.room_availability import RoomAvailability
+from app.models.base import now_sp
+from app.core.config import settings
 from app.schemas.map import (
     MapDataRequest, MapResponse, MapCategoryData, MapRoomData, 
     MapReservationResponse, MapStatsResponse, MapAvailabilityCheck,
-    MapBulkOperation, MapQuickBooking
+    MapBulkOperation, MapQuickBooking, MapDeltaResponse, MapReservationDelta
 )
 from app.services.reservation_service import ReservationService
 from app.services.room_availability_service import RoomAvailabilityService
+from app.services.occupancy_fact_service import OccupancyFactService
 from app.utils.decorators import audit_operation
 
 
@@ -35,199 +40,292 @@ class MapService:
         request: MapDataRequest
     ) -> MapResponse:
         """
-        Busca dados completos para o mapa de quartos
+        Busca dados completos para o mapa de quartos.
+
+        Quartos e reservas vêm de queries apenas com as colunas usadas (sem
+        carregar o grafo ORM) e a resposta é montada com model_construct, sem
+        revalidação; cada reserva é construída uma vez e compartilhada entre
+        os quartos que ocupa.
         """
         # Validar período
         if (request.end_date - request.start_date).days > 90:
             raise ValueError("Período não pode exceder 90 dias")
         
         # Buscar propriedade se especificada
-        property_info = None
+        property_name = None
         if request.property_id:
-            property_info = self.db.query(Property).filter(
-                Property.id == request.property_id,
-                Property.tenant_id == tenant_id,
-                Property.is_active == True
-            ).first()
-        
-        # Buscar quartos agrupados por tipo
-        categories = self._get_rooms_by_category(
-            tenant_id, 
-            request.property_id, 
-            request.room_type_ids,
-            request.include_out_of_order
-        )
+            property_name = self.db.execute(
+                select(Property.name).where(
+                    Property.id == request.property_id,
+                    Property.tenant_id == tenant_id,
+                    Property.is_active == True
+                )
+            ).scalar()
         
-        # Buscar reservas do período
-        reservations = self._get_period_reservations(
+        # Quartos (já ordenados por tipo e número) e reservas por quarto
+        room_rows = self._get_room_rows(
             tenant_id,
-            request.start_date,
-            request.end_date,
             request.property_id,
-            request.status_filter,
-            request.include_cancelled
+            request.room_type_ids,
+            request.include_out_of_order
         )
+        room_reservations = self._get_room_reservations(tenant_id, request)
         
-        # Mapear reservas por quarto
-        room_reservations = self._map_reservations_by_room(reservations, request.start_date, request.end_date)
+        # Ocupação por tipo de quarto no período (fatos diários)
+        facts_by_room_type = {
+            item['room_type_id']: item
+            for item in OccupancyFactService(self.db).get_room_type_totals(
+                tenant_id, request.start_date, request.end_date, property_id=request.property_id
+            )
+        }
         
-        # Construir dados das categorias
-        category_data = []
-        total_rooms = 0
-        total_operational_rooms = 0
-        total_reservations = 0
-        total_revenue = Decimal('0.00')
+        total_days = (request.end_date - request.start_date).days
         status_counts = {}
+        categories: Dict[int, Dict[str, Any]] = {}
         
-        for room_type, rooms in categories.items():
-            category_rooms = []
-            category_stats = {
-                'total_rooms': len(rooms),
-                'operational_rooms': 0,
-                'out_of_order_rooms': 0,
-                'occupied_rooms': 0,
-                'available_rooms': 0,
-                'total_reservations': 0,
-                'total_revenue': Decimal('0.00'),
-                'occupancy_rate': 0.0
-            }
+        for room in room_rows:
+            category = categories.get(room.room_type_id)
+            if category is None:
+                category = categories[room.room_type_id] = {
+                    'room_type': room,
+                    'rooms': [],
+                    'operational_rooms': 0,
+                    'out_of_order_rooms': 0,
+                    'occupied_rooms': 0,
+                    'available_rooms': 0,
+                    'total_reservations': 0,
+                    'total_revenue': Decimal('0.00')
+                }
             
-            for room in rooms:
-                # Reservas deste quarto no período
-                room_room_reservations = room_reservations.get(room.id, [])
-                
-                # Calcular ocupação do quarto
-                occupancy_days = self._calculate_room_occupancy_days(
-                    room_room_reservations, request.start_date, request.end_date
-                )
-                total_days = (request.end_date - request.start_date).days
-                occupancy_rate = (occupancy_days / total_days * 100) if total_days > 0 else 0
-                
-                # Converter reservas para response schema
-                map_reservations = []
-                for reservation in room_room_reservations:
-                    map_reservation = MapReservationResponse(
-                        id=reservation.id,
-                        reservation_number=reservation.reservation_number,
-                        status=reservation.status,
-                        guest_name=reservation.guest.full_name if reservation.guest else "Hóspede não informado",
-                        guest_email=reservation.guest.email if reservation.guest else None,
-                        check_in_date=reservation.check_in_date,
-                        check_out_date=reservation.check_out_date,
-                        nights=reservation.nights,
-                        total_amount=reservation.total_amount or Decimal('0.00'),
-                        paid_amount=reservation.total_paid,  # ✅ CORRIGIDO: Agora payments estão carregados
-                        total_paid=reservation.total_paid,   # ✅ ADICIONADO: Campo adicional se necessário
-                        balance_due=reservation.balance_due,
-                        total_guests=reservation.total_guests,
-                        source=reservation.source,
-                        notes=reservation.internal_notes,
-                        parking_requested=reservation.parking_requested or False,  # ✅ CORREÇÃO PRINCIPAL: Campo de estacionamento
-                        is_arrival=reservation.check_in_date == date.today(),
-                        is_departure=reservation.check_out_date == date.today(),
-                        is_current=(reservation.status == 'checked_in')
-                    )
-                    map_reservations.append(map_reservation)
-                    
-                    # Contar por status
-                    status_counts[reservation.status] = status_counts.get(reservation.status, 0) + 1
-                
-                # Dados do quarto
-                room_data = MapRoomData(
-                    id=room.id,
-                    room_number=room.room_number,
-                    name=room.name,
-                    floor=room.floor,
-                    building=room.building,
-                    max_occupancy=room.max_occupancy or room.room_type.max_capacity,
-                    is_operational=room.is_operational,
-                    is_out_of_order=room.is_out_of_order,
-                    maintenance_notes=room.maintenance_notes,
-                    housekeeping_notes=room.housekeeping_notes,
-                    reservations=map_reservations,
-                    occupancy_days=occupancy_days,
-                    total_days_in_period=total_days,
-                    occupancy_rate=occupancy_rate
-                )
-                
-                category_rooms.append(room_data)
-                
-                # Atualizar estatísticas da categoria
-                if room.is_operational:
-                    category_stats['operational_rooms'] += 1
-                if room.is_out_of_order:
-                    category_stats['out_of_order_rooms'] += 1
-                if room_room_reservations:
-                    category_stats['occupied_rooms'] += 1
-                else:
-                    category_stats['available_rooms'] += 1
-                
-                category_stats['total_reservations'] += len(room_room_reservations)
-                category_stats['total_revenue'] += sum(r.total_amount or Decimal('0.00') for r in room_room_reservations)
+            # Reservas deste quarto no período
+            map_reservations = room_reservations.get(room.id, [])
+            
+            occupancy_days = self._calculate_room_occupancy_days(
+                map_reservations, request.start_date, request.end_date
+            )
+            occupancy_rate = (occupancy_days / total_days * 100) if total_days > 0 else 0
             
-            # Calcular ocupação média da categoria
-            if category_stats['total_rooms'] > 0:
-                total_room_days = category_stats['total_rooms'] * total_days
-                occupied_days = sum(room.occupancy_days for room in category_rooms)
-                category_stats['occupancy_rate'] = (occupied_days / total_room_days * 100) if total_room_days > 0 else 0
+            for reservation in map_reservations:
+                status_counts[reservation.status] = status_counts.get(reservation.status, 0) + 1
             
-            # Dados da categoria
-            category_data.append(MapCategoryData(
-                room_type_id=room_type.id,
-                room_type_name=room_type.name,
-                room_type_slug=room_type.slug,
-                room_type_description=room_type.description,
+            category['rooms'].append(MapRoomData.model_construct(
+                **self._room_fields(room),
+                reservations=map_reservations,
+                occupancy_days=occupancy_days,
+                total_days_in_period=total_days,
+                occupancy_rate=occupancy_rate
+            ))
+            
+            # Atualizar estatísticas da categoria
+            if room.is_operational:
+                category['operational_rooms'] += 1
+            if room.is_out_of_order:
+                category['out_of_order_rooms'] += 1
+            if map_reservations:
+                category['occupied_rooms'] += 1
+            else:
+                category['available_rooms'] += 1
+            
+            category['total_reservations'] += len(map_reservations)
+            category['total_revenue'] += sum(
+                (reservation.total_amount for reservation in map_reservations), Decimal('0.00')
+            )
+        
+        # Construir dados das categorias
+        category_data = []
+        for room_type_id, category in categories.items():
+            room_type = category['room_type']
+            category_data.append(MapCategoryData.model_construct(
+                room_type_id=room_type_id,
+                room_type_name=room_type.room_type_name,
+                room_type_slug=room_type.room_type_slug,
+                room_type_description=room_type.room_type_description,
                 base_capacity=room_type.base_capacity,
                 max_capacity=room_type.max_capacity,
-                rooms=category_rooms,
-                total_rooms=category_stats['total_rooms'],
-                operational_rooms=category_stats['operational_rooms'],
-                out_of_order_rooms=category_stats['out_of_order_rooms'],
-                occupied_rooms=category_stats['occupied_rooms'],
-                available_rooms=category_stats['available_rooms'],
-                total_reservations=category_stats['total_reservations'],
-                total_revenue=category_stats['total_revenue'],
-                average_occupancy_rate=category_stats['occupancy_rate']
+                rooms=category['rooms'],
+                total_rooms=len(category['rooms']),
+                operational_rooms=category['operational_rooms'],
+                out_of_order_rooms=category['out_of_order_rooms'],
+                occupied_rooms=category['occupied_rooms'],
+                available_rooms=category['available_rooms'],
+                total_reservations=category['total_reservations'],
+                total_revenue=category['total_revenue'],
+                # Ocupação média da categoria (fatos diários pré-agregados)
+                average_occupancy_rate=facts_by_room_type.get(room_type_id, {}).get('occupancy_rate', 0.0)
             ))
-            
-            # Atualizar totais gerais
-            total_rooms += category_stats['total_rooms']
-            total_operational_rooms += category_stats['operational_rooms']
-            total_reservations += category_stats['total_reservations']
-            total_revenue += category_stats['total_revenue']
         
-        # Calcular ocupação geral
-        total_days = (request.end_date - request.start_date).days
-        total_room_nights = total_operational_rooms * total_days
-        occupied_room_nights = sum(
-            sum(room.occupancy_days for room in category.rooms) 
-            for category in category_data
-        )
+        # Calcular ocupação geral (apenas das categorias exibidas)
+        shown_facts = [facts_by_room_type[c.room_type_id] for c in category_data if c.room_type_id in facts_by_room_type]
+        total_room_nights = sum(item['available_room_nights'] for item in shown_facts)
+        occupied_room_nights = sum(item['sold_room_nights'] for item in shown_facts)
         overall_occupancy_rate = (occupied_room_nights / total_room_nights * 100) if total_room_nights > 0 else 0
         
         # Gerar cabeçalhos de data
-        date_headers = []
-        current_date = request.start_date
-        while current_date < request.end_date:
-            date_headers.append(current_date)
-            current_date += timedelta(days=1)
+        date_headers = [request.start_date + timedelta(days=offset) for offset in range(max(total_days, 0))]
         
-        return MapResponse(
+        return MapResponse.model_construct(
             start_date=request.start_date,
             end_date=request.end_date,
             total_days=total_days,
             property_id=request.property_id,
-            property_name=property_info.name if property_info else None,
+            property_name=property_name,
             categories=category_data,
-            total_rooms=total_rooms,
-            total_operational_rooms=total_operational_rooms,
-            total_reservations=total_reservations,
-            total_revenue=total_revenue,
+            total_rooms=sum(c.total_rooms for c in category_data),
+            total_operational_rooms=sum(c.operational_rooms for c in category_data),
+            total_reservations=sum(c.total_reservations for c in category_data),
+            total_revenue=sum((c.total_revenue for c in category_data), Decimal('0.00')),
             overall_occupancy_rate=overall_occupancy_rate,
             status_counts=status_counts,
             date_headers=date_headers
         )
 
+    def get_map_delta(
+        self,
+        tenant_id: int,
+        request: MapDataRequest,
+        since: datetime
+    ) -> MapDeltaResponse:
+        """
+        Alterações do mapa desde `since`: reservas e quartos cujo updated_at
+        (ou o de algum ReservationRoom ou do hóspede) é posterior. Reservas
+        alteradas que não atendem mais aos filtros/período vão em
+        removed_reservation_ids.
+        
+        updated_at é gravado no flush, não no commit: uma transação com
+        updated_at anterior a esta query pode commitar depois dela. Por isso o
+        próximo cursor (generated_at) recua MAP_DELTA_OVERLAP_SECONDS e deltas
+        consecutivos se sobrepõem; reaplicar uma reserva/quarto é idempotente.
+        """
+        if (request.end_date - request.start_date).days > 90:
+            raise ValueError("Período não pode exceder 90 dias")
+        
+        # Marca tomada antes das queries, recuada pela margem de sobreposição
+        generated_at = now_sp().replace(tzinfo=None) - timedelta(seconds=settings.MAP_DELTA_OVERLAP_SECONDS)
+        since = self._normalize_since(since)
+        
+        # Reservas alteradas (sem filtro de período/status, para detectar remoções)
+        changed_reservations = select(Reservation.id).where(
+            Reservation.tenant_id == tenant_id,
+            Reservation.updated_at > since
+        )
+        changed_rooms_of_reservations = select(ReservationRoom.reservation_id).join(
+            Reservation, Reservation.id == ReservationRoom.reservation_id
+        ).where(
+            Reservation.tenant_id == tenant_id,
+            ReservationRoom.updated_at > since
+        )
+        # Nome/e-mail do hóspede aparecem na reserva
+        changed_guests_of_reservations = select(Reservation.id).join(
+            Guest, Guest.id == Reservation.guest_id
+        ).where(
+            Reservation.tenant_id == tenant_id,
+            Guest.updated_at > since
+        )
+        if request.property_id:
+            changed_reservations = changed_reservations.where(Reservation.property_id == request.property_id)
+            changed_rooms_of_reservations = changed_rooms_of_reservations.where(
+                Reservation.property_id == request.property_id
+            )
+            changed_guests_of_reservations = changed_guests_of_reservations.where(
+                Reservation.property_id == request.property_id
+            )
+        
+        changed_ids = set(self.db.execute(
+            union(changed_reservations, changed_rooms_of_reservations, changed_guests_of_reservations)
+        ).scalars().all())
+        
+        reservations: Dict[int, MapReservationDelta] = {}
+        if changed_ids:
+            rows = self.db.execute(
+                self._reservation_rows_query(tenant_id, request).where(Reservation.id.in_(changed_ids))
+            ).all()
+            today = date.today()
+            for row in rows:
+                delta = reservations.get(row.id)
+                if delta is None:
+                    delta = reservations[row.id] = MapReservationDelta.model_construct(
+                        **self._reservation_fields(row, today),
+                        room_ids=[]
+                    )
+                delta.room_ids.append(row.room_id)
+        
+        # Quartos alterados (metadados); os que deixaram de atender ao filtro saem
+        changed_room_rows = self.db.execute(
+            self._room_rows_query(
+                tenant_id, request.property_id, request.room_type_ids,
+                include_out_of_order=True, include_inactive=True
+            ).where(Room.updated_at > since)
+        ).all()
+        
+        rooms = []
+        removed_room_ids = []
+        total_days = (request.end_date - request.start_date).days
+        for room in changed_room_rows:
+            if not room.is_active or (room.is_out_of_order and not request.include_out_of_order):
+                removed_room_ids.append(room.id)
+                continue
+            rooms.append(MapRoomData.model_construct(
+                **self._room_fields(room),
+                total_days_in_period=total_days
+            ))
+        
+        return MapDeltaResponse.model_construct(
+            since=since,
+            generated_at=generated_at,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            reservations=list(reservations.values()),
+            removed_reservation_ids=sorted(changed_ids - set(reservations.keys())),
+            rooms=rooms,
+            removed_room_ids=removed_room_ids
+        )
+
+    def get_map_etag(
+        self,
+        tenant_id: int,
+        request: MapDataRequest,
+        since: Optional[datetime] = None
+    ) -> str:
+        """
+        ETag fraco do mapa a partir de contagens e do último updated_at de
+        reservas/hóspedes/quartos no filtro - duas queries agregadas, sem montar
+        a resposta. Inclui a data de hoje (is_arrival/is_departure dependem dela).
+        """
+        reservation_version = self.db.execute(
+            select(
+                func.count(ReservationRoom.id),
+                func.max(Reservation.updated_at),
+                func.max(ReservationRoom.updated_at),
+                func.max(Guest.updated_at)
+            ).select_from(ReservationRoom).join(
+                Reservation, Reservation.id == ReservationRoom.reservation_id
+            ).join(
+                Guest, Guest.id == Reservation.guest_id
+            ).where(*self._period_reservation_filters(tenant_id, request))
+        ).one()
+        
+        room_version = self.db.execute(
+            select(
+                func.count(Room.id),
+                func.max(Room.updated_at),
+                func.max(RoomType.updated_at)
+            ).select_from(Room).join(
+                RoomType, RoomType.id == Room.room_type_id
+            ).where(*self._room_filters(
+                tenant_id, request.property_id, request.room_type_ids, request.include_out_of_order
+            ))
+        ).one()
+        
+        seed = repr((
+            tenant_id,
+            request.model_dump(mode='json'),
+            self._normalize_since(since).isoformat() if since else None,
+            date.today().isoformat(),
+            tuple(reservation_version),
+            tuple(room_version)
+        ))
+        return f'W/"{hashlib.sha1(seed.encode()).hexdigest()}"'
+
     def get_map_stats(
         self, 
         tenant_id: int, 
@@ -255,10 +353,9 @@ class MapService:
         
         rooms = rooms_query.all()
         
-        # ✅ CORRIGIDO: Buscar reservas do período COM payments carregados
+        # Buscar reservas do período (totais de pagamento armazenados na reserva)
         reservations_query = self.db.query(Reservation).options(
-            joinedload(Reservation.reservation_rooms).joinedload(ReservationRoom.room),
-            selectinload(Reservation.payments)  # ✅ ADICIONADO: Carrega payments
+            joinedload(Reservation.reservation_rooms).joinedload(ReservationRoom.room)
         ).filter(
             Reservation.tenant_id == tenant_id,
             Reservation.is_active == True,
@@ -289,28 +386,23 @@ class MapService:
         out_of_order_rooms = sum(1 for room in rooms if room.is_out_of_order)
         maintenance_rooms = sum(1 for room in rooms if room.maintenance_notes)
         
-        # Estatísticas de ocupação
-        total_room_nights = operational_rooms * total_days
-        occupied_room_nights = 0
-        
-        for reservation in reservations:
-            # Calcular noites ocupadas dentro do período
-            res_start = max(reservation.check_in_date, start_date)
-            res_end = min(reservation.check_out_date, end_date)
-            if res_start < res_end:
-                nights_in_period = (res_end - res_start).days
-                occupied_room_nights += nights_in_period
-        
-        available_room_nights = total_room_nights - occupied_room_nights
-        occupancy_rate = (occupied_room_nights / total_room_nights * 100) if total_room_nights > 0 else 0
+        # Estatísticas de ocupação (fatos diários pré-agregados)
+        facts = OccupancyFactService(self.db).get_period_summary(
+            tenant_id, start_date, end_date, property_id=property_id
+        )
+        total_room_nights = facts['available_room_nights']
+        occupied_room_nights = facts['sold_room_nights']
+        available_room_nights = max(total_room_nights - occupied_room_nights, 0)
+        occupancy_rate = facts['occupancy_rate']
         
-        # ✅ CORRIGIDO: Estatísticas de receita usando total_paid (agora payments estão carregados)
+        # ✅ CORRIGIDO: Estatísticas de receita usando total_paid (armazenado na reserva)
         total_revenue = sum(r.total_amount or Decimal('0.00') for r in reservations if r.status != 'cancelled')
         confirmed_revenue = sum(r.total_amount or Decimal('0.00') for r in reservations if r.status in ['confirmed', 'checked_in', 'checked_out'])
         pending_revenue = sum(r.total_amount or Decimal('0.00') for r in reservations if r.status == 'pending')
         
-        average_daily_rate = (total_revenue / occupied_room_nights) if occupied_room_nights > 0 else Decimal('0.00')
-        revenue_per_available_room = (total_revenue / total_room_nights) if total_room_nights > 0 else Decimal('0.00')
+        # ADR e RevPAR sobre a receita das noites dentro do período
+        average_daily_rate = facts['average_daily_rate']
+        revenue_per_available_room = facts['revenue_per_available_room']
         
         # Contadores de reservas
         total_reservations = len(reservations)
@@ -341,32 +433,20 @@ class MapService:
                 if res_room.room and res_room.room.room_type_id in room_types:
                     room_types[res_room.room.room_type_id]['reservations'].append(reservation)
         
+        facts_by_room_type = {item['room_type_id']: item for item in facts['by_room_type']}
+        
         for rt_id, rt_data in room_types.items():
-            rt_total_rooms = len(rt_data['rooms'])
-            rt_operational = sum(1 for r in rt_data['rooms'] if r.is_operational)
-            rt_reservations = len(rt_data['reservations'])
-            rt_revenue = sum(r.total_amount or Decimal('0.00') for r in rt_data['reservations'] if r.status != 'cancelled')
-            rt_room_nights = rt_operational * total_days
-            rt_occupied_nights = 0
-            
-            for reservation in rt_data['reservations']:
-                res_start = max(reservation.check_in_date, start_date)
-                res_end = min(reservation.check_out_date, end_date)
-                if res_start < res_end:
-                    nights = (res_end - res_start).days
-                    rt_occupied_nights += nights
-            
-            rt_occupancy = (rt_occupied_nights / rt_room_nights * 100) if rt_room_nights > 0 else 0
+            rt_facts = facts_by_room_type.get(rt_id, {})
             
             category_stats.append({
                 'room_type_id': rt_id,
                 'room_type_name': rt_data['room_type'].name,
-                'total_rooms': rt_total_rooms,
-                'operational_rooms': rt_operational,
-                'total_reservations': rt_reservations,
-                'total_revenue': float(rt_revenue),
-                'occupancy_rate': rt_occupancy,
-                'average_daily_rate': float(rt_revenue / rt_occupied_nights) if rt_occupied_nights > 0 else 0
+                'total_rooms': len(rt_data['rooms']),
+                'operational_rooms': sum(1 for r in rt_data['rooms'] if r.is_operational),
+                'total_reservations': len(rt_data['reservations']),
+                'total_revenue': float(rt_facts.get('revenue', 0)),
+                'occupancy_rate': rt_facts.get('occupancy_rate', 0.0),
+                'average_daily_rate': float(rt_facts.get('average_daily_rate', 0))
             })
         
         return MapStatsResponse(
@@ -398,129 +478,236 @@ class MapService:
             category_stats=category_stats
         )
 
-    def _get_rooms_by_category(
-        self, 
-        tenant_id: int, 
+    # ============== CONSULTAS ENXUTAS DO MAPA ==============
+
+    @staticmethod
+    def _normalize_since(since: datetime) -> datetime:
+        """updated_at é gravado sem timezone, no horário de São Paulo (now_sp)"""
+        if since.tzinfo is not None:
+            since = since.astimezone(pytz.timezone('America/Sao_Paulo')).replace(tzinfo=None)
+        return since
+
+    def _room_filters(
+        self,
+        tenant_id: int,
         property_id: Optional[int] = None,
         room_type_ids: Optional[List[int]] = None,
-        include_out_of_order: bool = True
-    ) -> Dict[RoomType, List[Room]]:
-        """
-        Busca quartos agrupados por categoria
-        """
-        query = self.db.query(Room).options(
-            joinedload(Room.room_type)
-        ).filter(
-            Room.tenant_id == tenant_id,
-            Room.is_active == True
-        )
-        
+        include_out_of_order: bool = True,
+        include_inactive: bool = False
+    ) -> list:
+        filters = [Room.tenant_id == tenant_id]
+        if not include_inactive:
+            filters.append(Room.is_active == True)
         if property_id:
-            query = query.filter(Room.property_id == property_id)
-        
+            filters.append(Room.property_id == property_id)
         if room_type_ids:
-            query = query.filter(Room.room_type_id.in_(room_type_ids))
-        
+            filters.append(Room.room_type_id.in_(room_type_ids))
         if not include_out_of_order:
-            query = query.filter(Room.is_out_of_order == False)
-        
-        rooms = query.order_by(Room.room_type_id, Room.room_number).all()
-        
-        # Agrupar por tipo de quarto
-        categories = {}
-        for room in rooms:
-            if room.room_type not in categories:
-                categories[room.room_type] = []
-            categories[room.room_type].append(room)
-        
-        return categories
+            filters.append(Room.is_out_of_order == False)
+        return filters
 
-    def _get_period_reservations(
+    def _room_rows_query(
         self,
         tenant_id: int,
-        start_date: date,
-        end_date: date,
         property_id: Optional[int] = None,
-        status_filter: Optional[List[str]] = None,
-        include_cancelled: bool = False
-    ) -> List[Reservation]:
+        room_type_ids: Optional[List[int]] = None,
+        include_out_of_order: bool = True,
+        include_inactive: bool = False
+    ):
+        """Colunas de quarto e do tipo de quarto usadas pelo mapa"""
+        return select(
+            Room.id,
+            Room.is_active,
+            Room.room_type_id,
+            Room.room_number,
+            Room.name,
+            Room.floor,
+            Room.building,
+            Room.max_occupancy,
+            Room.is_operational,
+            Room.is_out_of_order,
+            Room.maintenance_notes,
+            Room.housekeeping_notes,
+            RoomType.name.label('room_type_name'),
+            RoomType.slug.label('room_type_slug'),
+            RoomType.description.label('room_type_description'),
+            RoomType.base_capacity,
+            RoomType.max_capacity
+        ).join(
+            RoomType, RoomType.id == Room.room_type_id
+        ).where(
+            *self._room_filters(tenant_id, property_id, room_type_ids, include_out_of_order, include_inactive)
+        )
+
+    def _get_room_rows(
+        self, 
+        tenant_id: int, 
+        property_id: Optional[int] = None,
+        room_type_ids: Optional[List[int]] = None,
+        include_out_of_order: bool = True
+    ) -> list:
         """
-        ✅ CORRIGIDO: Busca reservas que se sobrepõem ao período COM payments carregados
+        Busca quartos ordenados por categoria e número
         """
-        query = self.db.query(Reservation).options(
-            joinedload(Reservation.guest),
-            selectinload(Reservation.reservation_rooms).joinedload(ReservationRoom.room),
-            selectinload(Reservation.payments)  # ✅ ADICIONADO: Carrega payments para evitar N+1 queries
-        ).filter(
+        return self.db.execute(
+            self._room_rows_query(tenant_id, property_id, room_type_ids, include_out_of_order).order_by(
+                Room.room_type_id, Room.room_number
+            )
+        ).all()
+
+    @staticmethod
+    def _room_fields(room) -> Dict[str, Any]:
+        return {
+            'id': room.id,
+            'room_number': room.room_number,
+            'name': room.name,
+            'floor': room.floor,
+            'building': room.building,
+            'max_occupancy': room.max_occupancy or room.max_capacity,
+            'is_operational': room.is_operational,
+            'is_out_of_order': room.is_out_of_order,
+            'maintenance_notes': room.maintenance_notes,
+            'housekeeping_notes': room.housekeeping_notes
+        }
+
+    def _period_reservation_filters(self, tenant_id: int, request: MapDataRequest) -> list:
+        """
+        ✅ CORRIGIDO: Reservas que se sobrepõem ao período
+        """
+        filters = [
             Reservation.tenant_id == tenant_id,
             Reservation.is_active == True,
-            # ✅ CORREÇÃO PRINCIPAL: Nova lógica de sobreposição
             or_(
                 # Caso 1: Reservas que se sobrepõem ao período (lógica matemática correta)
                 and_(
-                    Reservation.check_out_date >= start_date,  # Termina depois do início
-                    Reservation.check_in_date < end_date      # Começa antes do fim
+                    Reservation.check_out_date >= request.start_date,  # Termina depois do início
+                    Reservation.check_in_date < request.end_date       # Começa antes do fim
                 ),
                 # Caso 2: Reservas checked-in sempre visíveis (independente do período)
                 and_(
                     Reservation.status == 'checked_in',
                     or_(
-                        Reservation.check_out_date >= start_date,  # Checkout futuro
-                        Reservation.check_out_date.is_(None)       # Checkout indefinido
+                        Reservation.check_out_date >= request.start_date,  # Checkout futuro
+                        Reservation.check_out_date.is_(None)               # Checkout indefinido
                     )
                 )
             )
-        )
-        
-        if property_id:
-            query = query.filter(Reservation.property_id == property_id)
+        ]
         
-        if status_filter:
-            query = query.filter(Reservation.status.in_(status_filter))
-        
-        if not include_cancelled:
-            query = query.filter(Reservation.status != 'cancelled')
+        if request.property_id:
+            filters.append(Reservation.property_id == request.property_id)
         
-        # ✅ EXECUTAR A QUERY ANTES DO DEBUG
-        reservations = query.all()
+        if request.status_filter:
+            filters.append(Reservation.status.in_(request.status_filter))
         
-        # 🔍 DEBUG TEMPORÁRIO - remover depois
-        print(f"DEBUG - Período: {start_date} a {end_date}")
-        print(f"DEBUG - Total reservas encontradas: {len(reservations)}")
-        for res in reservations:
-            if res.check_out_date == start_date:
-                print(f"DEBUG - Reserva check-out no start_date: {res.reservation_number}, status: {res.status}")
+        if not request.include_cancelled:
+            filters.append(Reservation.status != 'cancelled')
         
-        return reservations
+        return filters
 
-    def _map_reservations_by_room(
-        self, 
-        reservations: List[Reservation],
-        start_date: date,
-        end_date: date
-    ) -> Dict[int, List[Reservation]]:
+    def _reservation_rows_query(self, tenant_id: int, request: MapDataRequest):
+        """Uma linha por (reserva, quarto) com as colunas exibidas no mapa"""
+        return select(
+            ReservationRoom.room_id,
+            Reservation.id,
+            Reservation.reservation_number,
+            Reservation.status,
+            Reservation.check_in_date,
+            Reservation.check_out_date,
+            Reservation.total_amount,
+            Reservation.paid_total,
+            Reservation.refunded_total,
+            Reservation.total_guests,
+            Reservation.source,
+            Reservation.internal_notes,
+            Reservation.parking_requested,
+            Guest.id.label('guest_id'),
+            Guest.first_name,
+            Guest.last_name,
+            Guest.email.label('guest_email')
+        ).select_from(ReservationRoom).join(
+            Reservation, Reservation.id == ReservationRoom.reservation_id
+        ).outerjoin(
+            Guest, Guest.id == Reservation.guest_id
+        ).where(
+            ReservationRoom.room_id.isnot(None),
+            *self._period_reservation_filters(tenant_id, request)
+        ).order_by(
+            Reservation.check_in_date, Reservation.id
+        )
+
+    def _get_room_reservations(
+        self,
+        tenant_id: int,
+        request: MapDataRequest
+    ) -> Dict[int, List[MapReservationResponse]]:
         """
-        Mapeia reservas por ID do quarto
+        Mapeia reservas do período por ID do quarto (cada reserva é montada uma vez)
         """
-        room_reservations = {}
-        
-        for reservation in reservations:
-            for res_room in reservation.reservation_rooms:
-                if res_room.room_id:
-                    if res_room.room_id not in room_reservations:
-                        room_reservations[res_room.room_id] = []
-                    room_reservations[res_room.room_id].append(reservation)
+        today = date.today()
+        built: Dict[int, MapReservationResponse] = {}
+        room_reservations: Dict[int, List[MapReservationResponse]] = {}
+        
+        for row in self.db.execute(self._reservation_rows_query(tenant_id, request)):
+            map_reservation = built.get(row.id)
+            if map_reservation is None:
+                map_reservation = built[row.id] = MapReservationResponse.model_construct(
+                    **self._reservation_fields(row, today)
+                )
+            room_reservations.setdefault(row.room_id, []).append(map_reservation)
         
         return room_reservations
 
+    @staticmethod
+    def _reservation_fields(row, today: date) -> Dict[str, Any]:
+        """Campos de MapReservationResponse a partir de uma linha de _reservation_rows_query"""
+        total_amount = row.total_amount or Decimal('0.00')
+        total_paid = row.paid_total or Decimal('0')
+        # Mesma regra de Reservation.balance_due (totais armazenados na reserva)
+        balance_due = (
+            total_amount - total_paid + (row.refunded_total or Decimal('0'))
+            if row.total_amount else Decimal('0')
+        )
+        nights = (
+            (row.check_out_date - row.check_in_date).days
+            if row.check_in_date and row.check_out_date else 0
+        )
+        
+        return {
+            'id': row.id,
+            'reservation_number': row.reservation_number,
+            'status': row.status,
+            'guest_name': (
+                f"{row.first_name} {row.last_name}".strip()
+                if row.guest_id else "Hóspede não informado"
+            ),
+            'guest_email': row.guest_email if row.guest_id else None,
+            'check_in_date': row.check_in_date,
+            'check_out_date': row.check_out_date,
+            'nights': nights,
+            'total_amount': total_amount,
+            'paid_amount': total_paid,
+            'total_paid': total_paid,
+            'balance_due': balance_due,
+            'total_guests': row.total_guests,
+            'source': row.source,
+            'notes': row.internal_notes,
+            'parking_requested': row.parking_requested or False,
+            'is_arrival': row.check_in_date == today,
+            'is_departure': row.check_out_date == today,
+            'is_current': row.status == 'checked_in'
+        }
+
     def _calculate_room_occupancy_days(
         self, 
-        reservations: List[Reservation], 
+        reservations: List[MapReservationResponse], 
         start_date: date, 
         end_date: date
     ) -> int:
         """
-        Calcula total de dias ocupados de um quarto no período
+        Calcula total de dias ocupados de um quarto no período, a partir das
+        reservas já carregadas para o mapa. Agregados por categoria/período
+        vêm dos fatos diários (OccupancyFactService).
         """
         occupied_days = 0
         
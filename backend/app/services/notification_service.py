@@ -3,9 +3,10 @@
 import json
 import logging
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, date
 import redis
 from app.core.config import settings
+from app.core.redis import redis_cache
 
 logger = logging.getLogger(__name__)
 
@@ -207,6 +208,12 @@ class NotificationService:
             success: Se a sincronização foi bem-sucedida
             error: Mensagem de erro (se houver)
         """
+        # Status de sincronização das células mudou: janelas do tenant em cache ficam obsoletas
+        try:
+            redis_cache.invalidate_availability(tenant_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache de disponibilidade: {e}")
+        
         data = {
             "event": "sync_completed",
             "tenant_id": tenant_id,
@@ -252,6 +259,17 @@ class NotificationService:
             date_to: Data final
             updated_count: Número de registros atualizados
         """
+        # Invalidar janelas de disponibilidade em cache (somente período/propriedades afetados)
+        try:
+            redis_cache.invalidate_availability(
+                tenant_id,
+                room_ids=room_ids,
+                date_from=date.fromisoformat(date_from) if date_from else None,
+                date_to=date.fromisoformat(date_to) if date_to else None
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache de disponibilidade: {e}")
+        
         data = {
             "event": "availability_updated",
             "tenant_id": tenant_id,
@@ -310,6 +328,13 @@ class NotificationService:
     
     # ============== NOTIFICAÇÕES DE RESERVAS ==============
     
+    def _invalidate_dashboard(self, tenant_id: int) -> None:
+        """Eventos reservation:updated descartam os agregados do dashboard em cache"""
+        try:
+            redis_cache.invalidate_dashboard(tenant_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao invalidar cache do dashboard: {e}")
+    
     def notify_reservation_created(
         self,
         tenant_id: int,
@@ -324,6 +349,8 @@ class NotificationService:
             reservation_id: ID da reserva
             room_ids: IDs dos quartos reservados
         """
+        self._invalidate_dashboard(tenant_id)
+        
         data = {
             "event": "reservation_created",
             "tenant_id": tenant_id,
@@ -355,6 +382,8 @@ class NotificationService:
             reservation_id: ID da reserva
             status: Novo status (se aplicável)
         """
+        self._invalidate_dashboard(tenant_id)
+        
         data = {
             "event": "reservation_updated",
             "tenant_id": tenant_id,
@@ -0,0 +1,277 @@
+# backend/app/services/occupancy_fact_service.py
+
+from typing import Optional, Dict, Any, List, Iterable
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from datetime import date, timedelta
+from decimal import Decimal
+import logging
+
+from app.models.room_type_daily_fact import RoomTypeDailyFact
+from app.models.room_type import RoomType
+from app.models.property import Property
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Recalcula [date_from, date_to) de uma propriedade em um único statement,
+# opcionalmente só para alguns tipos de quarto (room_type_ids NULL = todos).
+# Tipos de quarto sem inventário nem vendas, mas com linhas antigas no período,
+# também entram na chave para serem zerados.
+REFRESH_FACTS_SQL = text("""
+    WITH days AS (
+        SELECT gs::date AS date
+        FROM generate_series(
+            CAST(:date_from AS date), CAST(:date_to AS date) - 1, interval '1 day'
+        ) AS gs
+    ),
+    inventory AS (
+        SELECT rm.room_type_id, count(*) AS rooms
+        FROM rooms rm
+        WHERE rm.tenant_id = :tenant_id
+          AND rm.property_id = :property_id
+          AND rm.is_active = true
+          AND rm.is_operational = true
+          AND (CAST(:room_type_ids AS integer[]) IS NULL OR rm.room_type_id = ANY(CAST(:room_type_ids AS integer[])))
+        GROUP BY rm.room_type_id
+    ),
+    stays AS (
+        SELECT rm.room_type_id,
+               rr.check_in_date,
+               rr.check_out_date,
+               coalesce(
+                   rr.rate_per_night,
+                   rr.total_amount / nullif(rr.check_out_date - rr.check_in_date, 0),
+                   -- Divide pelas noites de toda a estadia, não só das que caem no período
+                   r.total_amount / nullif((
+                       SELECT sum(all_rr.check_out_date - all_rr.check_in_date)
+                       FROM reservation_rooms all_rr
+                       WHERE all_rr.reservation_id = r.id
+                   ), 0),
+                   0
+               ) AS nightly_rate
+        FROM reservation_rooms rr
+        JOIN reservations r ON r.id = rr.reservation_id
+        JOIN rooms rm ON rm.id = rr.room_id
+        WHERE r.tenant_id = :tenant_id
+          AND r.property_id = :property_id
+          AND r.is_active = true
+          AND r.status IN ('confirmed', 'checked_in', 'checked_out')
+          AND rr.check_in_date < CAST(:date_to AS date)
+          AND rr.check_out_date > CAST(:date_from AS date)
+          AND (CAST(:room_type_ids AS integer[]) IS NULL OR rm.room_type_id = ANY(CAST(:room_type_ids AS integer[])))
+    ),
+    sold AS (
+        SELECT s.room_type_id, d.date, count(*) AS room_nights, sum(s.nightly_rate) AS revenue
+        FROM stays s
+        JOIN days d ON d.date >= s.check_in_date AND d.date < s.check_out_date
+        GROUP BY s.room_type_id, d.date
+    ),
+    room_type_keys AS (
+        SELECT room_type_id FROM inventory
+        UNION
+        SELECT room_type_id FROM sold
+        UNION
+        SELECT room_type_id FROM room_type_daily_facts
+        WHERE property_id = :property_id
+          AND date >= CAST(:date_from AS date)
+          AND date < CAST(:date_to AS date)
+          AND (CAST(:room_type_ids AS integer[]) IS NULL OR room_type_id = ANY(CAST(:room_type_ids AS integer[])))
+    )
+    INSERT INTO room_type_daily_facts
+        (tenant_id, property_id, room_type_id, date, sold_room_nights, revenue,
+         available_room_nights, created_at, updated_at, is_active)
+    SELECT :tenant_id, :property_id, k.room_type_id, d.date,
+           coalesce(s.room_nights, 0),
+           round(coalesce(s.revenue, 0), 2),
+           coalesce(i.rooms, 0),
+           now(), now(), true
+    FROM room_type_keys k
+    CROSS JOIN days d
+    LEFT JOIN inventory i ON i.room_type_id = k.room_type_id
+    LEFT JOIN sold s ON s.room_type_id = k.room_type_id AND s.date = d.date
+    ON CONFLICT (property_id, room_type_id, date) DO UPDATE SET
+        sold_room_nights = EXCLUDED.sold_room_nights,
+        revenue = EXCLUDED.revenue,
+        available_room_nights = EXCLUDED.available_room_nights,
+        updated_at = now()
+""").bindparams(bindparam('room_type_ids', type_=ARRAY(Integer)))
+
+
+class OccupancyFactService:
+    """
+    Fatos diários de ocupação por (propriedade, tipo de quarto, data).
+
+    O recálculo é um INSERT ... SELECT ... ON CONFLICT sobre as reservas
+    vendidas (confirmed, checked_in, checked_out) e os quartos operacionais;
+    é idempotente e não faz commit. As escritas em reservas/quartos disparam,
+    após o commit, o recálculo dos dias e tipos de quarto afetados (ver
+    models/room_type_daily_fact.py) e a task noturna reconcilia a janela OCCUPANCY_FACTS_PAST_DAYS..FUTURE_DAYS.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ============== RECÁLCULO ==============
+
+    def refresh_range(
+        self,
+        tenant_id: int,
+        property_id: int,
+        date_from: date,
+        date_to: date,
+        room_type_ids: Optional[Iterable[int]] = None
+    ) -> int:
+        """
+        Recalcula [date_from, date_to) da propriedade (ou só dos tipos de quarto
+        informados). Retorna linhas gravadas.
+        """
+        if date_to <= date_from:
+            return 0
+
+        result = self.db.execute(REFRESH_FACTS_SQL, {
+            'tenant_id': tenant_id,
+            'property_id': property_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'room_type_ids': sorted(room_type_ids) if room_type_ids is not None else None
+        })
+        logger.debug(
+            f"Fatos de ocupação: propriedade {property_id} {date_from}..{date_to} "
+            f"({result.rowcount} linhas)"
+        )
+        return result.rowcount
+
+    def refresh_ranges(self, ranges: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Recálculo disparado após o commit das escritas - uma transação por intervalo"""
+        rows = 0
+        errors = []
+
+        for item in ranges:
+            try:
+                rows += self.refresh_range(
+                    item['tenant_id'],
+                    item['property_id'],
+                    date.fromisoformat(item['date_from']),
+                    date.fromisoformat(item['date_to']),
+                    item.get('room_type_ids')
+                )
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Erro ao recalcular fatos da propriedade {item['property_id']}: {e}")
+                errors.append({'property_id': item['property_id'], 'error': str(e)})
+
+        return {'ranges': len(ranges), 'rows': rows, 'errors': errors}
+
+    def refresh_all_properties(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        tenant_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Reconciliação (task noturna) - uma transação por propriedade"""
+        today = date.today()
+        date_from = date_from or today - timedelta(days=settings.OCCUPANCY_FACTS_PAST_DAYS)
+        date_to = date_to or today + timedelta(days=settings.OCCUPANCY_FACTS_FUTURE_DAYS)
+
+        query = self.db.query(Property.id, Property.tenant_id).filter(Property.is_active == True)
+        if tenant_id:
+            query = query.filter(Property.tenant_id == tenant_id)
+
+        properties = query.all()
+        rows = 0
+        errors = []
+
+        for prop in properties:
+            try:
+                rows += self.refresh_range(prop.tenant_id, prop.id, date_from, date_to)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Erro ao recalcular fatos da propriedade {prop.id}: {e}")
+                errors.append({'property_id': prop.id, 'error': str(e)})
+
+        return {
+            'properties': len(properties),
+            'rows': rows,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'errors': errors
+        }
+
+    # ============== CONSULTAS ==============
+
+    def get_room_type_totals(
+        self,
+        tenant_id: int,
+        date_from: date,
+        date_to: date,
+        property_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Totais do período [date_from, date_to) por tipo de quarto"""
+        query = self.db.query(
+            RoomTypeDailyFact.room_type_id,
+            RoomType.name.label('room_type_name'),
+            func.sum(RoomTypeDailyFact.sold_room_nights).label('sold_room_nights'),
+            func.sum(RoomTypeDailyFact.available_room_nights).label('available_room_nights'),
+            func.sum(RoomTypeDailyFact.revenue).label('revenue')
+        ).join(
+            RoomType, RoomType.id == RoomTypeDailyFact.room_type_id
+        ).filter(
+            RoomTypeDailyFact.tenant_id == tenant_id,
+            RoomTypeDailyFact.date >= date_from,
+            RoomTypeDailyFact.date < date_to
+        )
+
+        if property_id:
+            query = query.filter(RoomTypeDailyFact.property_id == property_id)
+
+        rows = query.group_by(RoomTypeDailyFact.room_type_id, RoomType.name).all()
+
+        return [
+            self._metrics(
+                row.sold_room_nights, row.available_room_nights, row.revenue,
+                room_type_id=row.room_type_id,
+                room_type_name=row.room_type_name
+            )
+            for row in rows
+        ]
+
+    def get_period_summary(
+        self,
+        tenant_id: int,
+        date_from: date,
+        date_to: date,
+        property_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Ocupação, ADR e RevPAR do período, com a quebra por tipo de quarto"""
+        by_room_type = self.get_room_type_totals(tenant_id, date_from, date_to, property_id)
+
+        summary = self._metrics(
+            sum(item['sold_room_nights'] for item in by_room_type),
+            sum(item['available_room_nights'] for item in by_room_type),
+            sum((item['revenue'] for item in by_room_type), Decimal('0.00'))
+        )
+        summary['by_room_type'] = by_room_type
+        return summary
+
+    @staticmethod
+    def _metrics(sold, available, revenue, **extra) -> Dict[str, Any]:
+        sold = int(sold or 0)
+        available = int(available or 0)
+        revenue = Decimal(revenue or 0)
+
+        return {
+            **extra,
+            'sold_room_nights': sold,
+            'available_room_nights': available,
+            'revenue': revenue,
+            'occupancy_rate': round(sold / available * 100, 2) if available > 0 else 0.0,
+            'average_daily_rate': (revenue / sold).quantize(Decimal('0.01')) if sold > 0 else Decimal('0.00'),
+            'revenue_per_available_room': (
+                (revenue / available).quantize(Decimal('0.01')) if available > 0 else Decimal('0.00')
+            )
+        }
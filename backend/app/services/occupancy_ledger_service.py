@@ -0,0 +1,129 @@
+# backend/app/services/occupancy_ledger_service.py
+
+from typing import Optional, List, Dict, Set
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from datetime import date, timedelta
+import logging
+
+from app.models.reservation import Reservation, ReservationRoom
+from app.models.room_night_occupancy import RoomNightOccupancy
+
+logger = logging.getLogger(__name__)
+
+
+class OccupancyLedgerService:
+    """
+    Mantém o ledger de ocupação quarto/noite (RoomNightOccupancy).
+    Não faz commit: as escritas participam da transação de quem chama,
+    de forma que reserva e ledger são persistidos (ou revertidos) juntos.
+    """
+
+    # Status que ocupam o quarto
+    OCCUPYING_STATUSES = ('pending', 'pending_confirmation', 'confirmed', 'checked_in')
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_occupied_room_ids(
+        self,
+        room_ids: List[int],
+        check_in_date: date,
+        check_out_date: date,
+        tenant_id: int,
+        exclude_reservation_id: Optional[int] = None
+    ) -> Set[int]:
+        """Retorna quartos com ao menos uma noite ocupada em [check_in, check_out)"""
+        if not room_ids or check_out_date <= check_in_date:
+            return set()
+
+        query = self.db.query(RoomNightOccupancy.room_id).filter(
+            RoomNightOccupancy.room_id.in_(room_ids),
+            RoomNightOccupancy.date >= check_in_date,
+            RoomNightOccupancy.date < check_out_date,
+            RoomNightOccupancy.tenant_id == tenant_id
+        )
+
+        if exclude_reservation_id:
+            query = query.filter(RoomNightOccupancy.reservation_id != exclude_reservation_id)
+
+        return {row.room_id for row in query.distinct().all()}
+
+    def get_occupied_nights(
+        self,
+        room_ids: List[int],
+        date_from: date,
+        date_to: date,
+        tenant_id: int
+    ) -> Dict[int, Dict[date, int]]:
+        """Retorna {room_id: {date: reservation_id}} para noites ocupadas em [date_from, date_to)"""
+        if not room_ids or date_to <= date_from:
+            return {}
+
+        rows = self.db.query(
+            RoomNightOccupancy.room_id,
+            RoomNightOccupancy.date,
+            RoomNightOccupancy.reservation_id
+        ).filter(
+            RoomNightOccupancy.room_id.in_(room_ids),
+            RoomNightOccupancy.date >= date_from,
+            RoomNightOccupancy.date < date_to,
+            RoomNightOccupancy.tenant_id == tenant_id
+        ).all()
+
+        occupied: Dict[int, Dict[date, int]] = {}
+        for row in rows:
+            occupied.setdefault(row.room_id, {})[row.date] = row.reservation_id
+        return occupied
+
+    def sync_reservation(self, reservation: Reservation) -> int:
+        """
+        Reconstrói as noites da reserva a partir dos seus ReservationRoom.
+        Idempotente: serve para criação, alteração de datas/quartos e mudanças de status.
+        Retorna o número de noites materializadas.
+
+        Uma violação de unicidade (quarto/noite já ocupado) é propagada como
+        IntegrityError no flush, para que quem chama reverta a transação.
+        """
+        # Garantir que ReservationRoom novos/alterados estejam visíveis
+        self.db.flush()
+
+        self.release_reservation(reservation.id)
+
+        if not reservation.is_active or reservation.status not in self.OCCUPYING_STATUSES:
+            return 0
+
+        reservation_rooms = self.db.query(
+            ReservationRoom.id,
+            ReservationRoom.room_id,
+            ReservationRoom.check_in_date,
+            ReservationRoom.check_out_date
+        ).filter(
+            ReservationRoom.reservation_id == reservation.id
+        ).all()
+
+        rows = []
+        for rr in reservation_rooms:
+            night = rr.check_in_date
+            while night < rr.check_out_date:
+                rows.append({
+                    'tenant_id': reservation.tenant_id,
+                    'room_id': rr.room_id,
+                    'date': night,
+                    'reservation_id': reservation.id,
+                    'reservation_room_id': rr.id
+                })
+                night += timedelta(days=1)
+
+        if rows:
+            self.db.execute(insert(RoomNightOccupancy), rows)
+            self.db.flush()
+
+        logger.debug(f"Ledger: reserva {reservation.id} ocupa {len(rows)} noites")
+        return len(rows)
+
+    def release_reservation(self, reservation_id: int) -> int:
+        """Libera todas as noites de uma reserva. Retorna o número de noites liberadas."""
+        return self.db.query(RoomNightOccupancy).filter(
+            RoomNightOccupancy.reservation_id == reservation_id
+        ).delete(synchronize_session=False)
@@ -61,6 +61,32 @@ class PaymentService:
             Payment.is_active == True
         ).first()
 
+    def _refresh_reservation_totals(self, reservation_id: int) -> None:
+        """
+        Recalcula paid_total/refunded_total da reserva a partir dos pagamentos
+        confirmados e ativos, na transação corrente (antes do commit).
+        A linha da reserva é bloqueada para serializar pagamentos concorrentes.
+        """
+        reservation = self.db.query(Reservation).filter(
+            Reservation.id == reservation_id
+        ).with_for_update().first()
+        
+        if not reservation:
+            return
+        
+        is_refund = func.coalesce(Payment.is_refund, False)
+        paid_total, refunded_total = self.db.query(
+            func.coalesce(func.sum(Payment.amount).filter(is_refund == False), 0),
+            func.coalesce(func.sum(Payment.amount).filter(is_refund == True), 0)
+        ).filter(
+            Payment.reservation_id == reservation_id,
+            Payment.status == "confirmed",
+            Payment.is_active == True
+        ).one()
+        
+        reservation.paid_total = paid_total
+        reservation.refunded_total = refunded_total
+
     def _validate_admin_permission(self, current_user: User, operation: str) -> None:
         """Valida se o usuário tem permissão de administrador para operações sensíveis"""
         if not current_user.is_superuser:
@@ -167,11 +193,13 @@ class PaymentService:
         payment_data: PaymentCreate, 
         tenant_id: int, 
         current_user: User,
-        request: Optional[Request] = None
+        request: Optional[Request] = None,
+        is_refund: bool = False
     ) -> Optional[Payment]:
         """
         Cria novo pagamento com auditoria automática.
         O decorador @audit_operation captura automaticamente todos os dados do pagamento criado.
+        Com is_refund=True o pagamento é um estorno (entra em refunded_total).
         """
         
         # Verificar se a reserva existe e pertence ao tenant
@@ -212,18 +240,21 @@ class PaymentService:
             fee_amount=payment_data.fee_amount,
             net_amount=net_amount,
             is_partial=payment_data.is_partial,
+            is_refund=is_refund,
             status="confirmed",  # ✅ SEMPRE CONFIRMADO
             confirmed_date=datetime.utcnow()  # ✅ DATA DE CONFIRMAÇÃO AUTOMÁTICA
         )
         
         try:
             self.db.add(payment_obj)
+            self.db.flush()
+            self._refresh_reservation_totals(payment_obj.reservation_id)
             self.db.commit()
             self.db.refresh(payment_obj)
             
             # ✅ FUNCIONALIDADE MANTIDA: Auto-confirmar reserva pendente
             reservation_was_confirmed = False
-            if reservation_status_before == 'pending':
+            if reservation_status_before == 'pending' and not is_refund:
                 reservation_was_confirmed = self._auto_confirm_reservation_if_pending(
                     reservation=reservation,
                     payment_obj=payment_obj,
@@ -244,6 +275,36 @@ class PaymentService:
                 detail="Erro ao criar pagamento - dados duplicados ou conflito"
             )
 
+    def create_refund(
+        self,
+        payment: Payment,
+        tenant_id: int,
+        current_user: User,
+        notes: Optional[str] = None,
+        request: Optional[Request] = None
+    ) -> Optional[Payment]:
+        """
+        Estorna um pagamento: cria um pagamento confirmado com is_refund=True no
+        mesmo valor e atualiza paid_total/refunded_total da reserva na mesma transação.
+        """
+        refund_data = PaymentCreate(
+            reservation_id=payment.reservation_id,
+            amount=payment.amount,
+            payment_method=payment.payment_method,
+            payment_date=datetime.utcnow(),
+            reference_number=f"REFUND-{payment.payment_number}",
+            notes=f"Estorno de {payment.payment_number}. {notes or ''}".strip(),
+            is_partial=False
+        )
+        
+        return self.create_payment(
+            payment_data=refund_data,
+            tenant_id=tenant_id,
+            current_user=current_user,
+            request=request,
+            is_refund=True
+        )
+
     # ✅ MÉTODO UPDATE_PAYMENT COM AUDITORIA AUTOMÁTICA
     @auto_audit_update("payments", "Pagamento atualizado")
     def update_payment(
@@ -315,6 +376,7 @@ class PaymentService:
             payment_obj.is_partial = payment_data.is_partial
         
         try:
+            self._refresh_reservation_totals(payment_obj.reservation_id)
             self.db.commit()
             self.db.refresh(payment_obj)
             
@@ -397,6 +459,7 @@ class PaymentService:
             payment_obj.is_partial = payment_data.is_partial
         
         try:
+            self._refresh_reservation_totals(payment_obj.reservation_id)
             self.db.commit()
             self.db.refresh(payment_obj)
             
@@ -452,6 +515,7 @@ class PaymentService:
             payment_obj.internal_notes = f"{current_notes}\n{new_note}".strip()
         
         try:
+            self._refresh_reservation_totals(payment_obj.reservation_id)
             self.db.commit()
             self.db.refresh(payment_obj)
             
@@ -723,6 +787,7 @@ class PaymentService:
         payment_obj.is_active = False
         
         try:
+            self._refresh_reservation_totals(payment_obj.reservation_id)
             self.db.commit()
             
             # ✅ AUDITORIA AUTOMÁTICA PELO DECORADOR
@@ -789,6 +854,7 @@ class PaymentService:
             "failed_count": 0,
             "errors": []
         }
+        confirmed_reservation_ids = set()
         
         with AuditContext(self.db, current_user, request) as audit:
             for payment_id in payment_ids:
@@ -821,12 +887,15 @@ class PaymentService:
                     )
                     
                     results["confirmed_count"] += 1
+                    confirmed_reservation_ids.add(payment.reservation_id)
                     
                 except Exception as e:
                     results["failed_count"] += 1
                     results["errors"].append(f"Erro no pagamento {payment_id}: {str(e)}")
             
             if results["confirmed_count"] > 0:
+                for reservation_id in sorted(confirmed_reservation_ids):
+                    self._refresh_reservation_totals(reservation_id)
                 self.db.commit()
             else:
                 self.db.rollback()
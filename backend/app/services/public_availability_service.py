@@ -0,0 +1,211 @@
+# backend/app/services/public_availability_service.py
+
+from typing import Optional, Dict, Any, List
+from sqlalchemy.orm import Session, contains_eager
+from datetime import date, timedelta
+import logging
+
+from app.models.property import Property
+from app.models.room import Room
+from app.models.room_type import RoomType
+from app.models.wubook_rate_plan import WuBookRatePlan
+from app.services.room_availability_service import RoomAvailabilityService
+from app.services.occupancy_ledger_service import OccupancyLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class PublicAvailabilityService:
+    """
+    Busca de disponibilidade do motor de reservas público.
+
+    Número fixo de consultas, independente da quantidade de quartos:
+    quartos candidatos com o tipo (contains_eager), janela de disponibilidade
+    da propriedade (cache Redis), noites ocupadas no ledger e rate plans
+    padrão de todos os tipos encontrados. O restante é feito em memória.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.availability_service = RoomAvailabilityService(db)
+        self.occupancy_ledger = OccupancyLedgerService(db)
+
+    def search(
+        self,
+        property_obj: Property,
+        check_in: date,
+        check_out: date,
+        total_guests: int,
+        room_type_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Quartos livres em [check_in, check_out) com capacidade para total_guests.
+
+        Returns:
+            Dict com 'available_rooms' (por quarto, ordenado por preço) e
+            'room_types' (agrupado por tipo com available_units)
+        """
+        nights = (check_out - check_in).days
+        candidates = self._get_candidate_rooms(property_obj, total_guests, room_type_id)
+
+        if not candidates:
+            return {'available_rooms': [], 'room_types': []}
+
+        window = self.availability_service.get_property_availability_window(
+            property_obj.id,
+            check_in,
+            check_out - timedelta(days=1),
+            property_obj.tenant_id
+        )
+        occupied_ids = self.occupancy_ledger.get_occupied_room_ids(
+            [room.id for room in candidates], check_in, check_out, property_obj.tenant_id
+        )
+
+        free_rooms = []
+        for room in candidates:
+            if room.id in occupied_ids:
+                continue
+
+            availability_check = self.availability_service.check_room_availability_in_window(
+                window, room.id, check_in, check_out
+            )
+            if availability_check['available']:
+                free_rooms.append((room, availability_check.get('total_rate', 0)))
+
+        rate_plans = self._get_default_rate_plans({room.room_type_id for room, _ in free_rooms})
+        room_types: Dict[int, Dict[str, Any]] = {}
+        results = []
+
+        for room, total_rate in free_rooms:
+            if room.room_type_id not in room_types:
+                room_types[room.room_type_id] = self._room_type_info(room.room_type)
+
+            pricing = self._pricing(total_rate, nights)
+            results.append({
+                "room_id": room.id,
+                "room_number": room.room_number,
+                "room_name": room.name,
+                "room_type": room_types[room.room_type_id],
+                "max_occupancy": room.max_occupancy,
+                "additional_amenities": room.additional_amenities or [],
+                "pricing": pricing,
+                "rate_plan": rate_plans.get(room.room_type_id),
+                "availability": {
+                    "is_available": True,
+                    "check_in": check_in.isoformat(),
+                    "check_out": check_out.isoformat()
+                }
+            })
+
+        # Ordenar por preço (menor para maior)
+        results.sort(key=lambda x: x["pricing"]["total_amount"])
+
+        return {
+            'available_rooms': results,
+            'room_types': self._group_by_room_type(results, rate_plans)
+        }
+
+    # ============== CONSULTAS ==============
+
+    def _get_candidate_rooms(
+        self,
+        property_obj: Property,
+        total_guests: int,
+        room_type_id: Optional[int]
+    ) -> List[Room]:
+        """Quartos operacionais de tipos reserváveis, com o tipo já carregado"""
+        query = self.db.query(Room).join(Room.room_type).options(
+            contains_eager(Room.room_type)
+        ).filter(
+            Room.tenant_id == property_obj.tenant_id,
+            Room.property_id == property_obj.id,
+            Room.is_active == True,
+            Room.is_operational == True,
+            RoomType.is_bookable == True,
+            Room.max_occupancy >= total_guests
+        )
+
+        if room_type_id:
+            query = query.filter(Room.room_type_id == room_type_id)
+
+        return query.order_by(Room.id).all()
+
+    def _get_default_rate_plans(self, room_type_ids) -> Dict[int, Dict[str, Any]]:
+        """Rate plan padrão por room_type_id, em uma única consulta"""
+        if not room_type_ids:
+            return {}
+
+        plans = self.db.query(WuBookRatePlan).filter(
+            WuBookRatePlan.room_type_id.in_(room_type_ids),
+            WuBookRatePlan.is_active == True,
+            WuBookRatePlan.is_default == True
+        ).order_by(WuBookRatePlan.id).all()
+
+        rate_plans = {}
+        for plan in plans:
+            # Mesmo critério do .first() anterior: o primeiro plano de cada tipo
+            rate_plans.setdefault(plan.room_type_id, {
+                "id": plan.id,
+                "name": plan.name,
+                "description": plan.description,
+                "cancellation_policy": plan.cancellation_policy
+            })
+        return rate_plans
+
+    # ============== MONTAGEM ==============
+
+    @staticmethod
+    def _room_type_info(room_type: RoomType) -> Dict[str, Any]:
+        return {
+            "id": room_type.id,
+            "name": room_type.name,
+            "slug": room_type.slug,
+            "description": room_type.description,
+            "base_capacity": room_type.base_capacity,
+            "max_capacity": room_type.max_capacity,
+            "size_m2": float(room_type.size_m2) if room_type.size_m2 else None,
+            "bed_configuration": room_type.bed_configuration,
+            "amenities": room_type.amenities or []
+        }
+
+    @staticmethod
+    def _pricing(total_rate, nights: int) -> Dict[str, Any]:
+        return {
+            "total_amount": float(total_rate) if total_rate else 0.0,
+            "nights": nights,
+            "average_per_night": float(total_rate / nights) if total_rate and nights > 0 else 0.0,
+            "currency": "BRL"
+        }
+
+    @staticmethod
+    def _group_by_room_type(
+        results: List[Dict[str, Any]],
+        rate_plans: Dict[int, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Agrupa os quartos livres (já ordenados por preço) por tipo"""
+        groups: Dict[int, Dict[str, Any]] = {}
+
+        for item in results:
+            room_type = item["room_type"]
+            group = groups.get(room_type["id"])
+
+            if group is None:
+                # Primeiro quarto do tipo é o mais barato
+                group = groups[room_type["id"]] = {
+                    "room_type": room_type,
+                    "available_units": 0,
+                    "max_occupancy": item["max_occupancy"],
+                    "pricing": {
+                        **item["pricing"],
+                        "max_total_amount": item["pricing"]["total_amount"]
+                    },
+                    "rate_plan": rate_plans.get(room_type["id"]),
+                    "room_ids": []
+                }
+
+            group["available_units"] += 1
+            group["room_ids"].append(item["room_id"])
+            group["max_occupancy"] = max(group["max_occupancy"] or 0, item["max_occupancy"] or 0)
+            group["pricing"]["max_total_amount"] = item["pricing"]["total_amount"]
+
+        return sorted(groups.values(), key=lambda x: x["pricing"]["total_amount"])
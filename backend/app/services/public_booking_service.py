@@ -12,8 +12,10 @@ from app.models.room import Room
 from app.models.guest import Guest
 from app.models.reservation import Reservation
 from app.models.booking_engine_config import BookingEngineConfig
-from app.schemas.public_booking import PublicBookingCreate
+from app.schemas.public_booking import PublicBookingCreate, PublicBookingHoldCreate
 from app.services.room_availability_service import RoomAvailabilityService
+from app.services.occupancy_ledger_service import OccupancyLedgerService
+from app.services.inventory_hold_service import InventoryHoldService
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +26,105 @@ class PublicBookingService:
     Responsável por criar reservas vindas do site público.
     """
     
+    # Hold implícito de quem chega ao create_booking sem hold próprio
+    CREATE_HOLD_TTL_SECONDS = 60
+    
     def __init__(self, db: Session):
         self.db = db
         self.availability_service = RoomAvailabilityService(db)
+        self.occupancy_ledger = OccupancyLedgerService(db)
+        self.hold_service = InventoryHoldService(db)
+    
+    def create_hold(self, hold_data: PublicBookingHoldCreate) -> Dict[str, Any]:
+        """
+        Segura o quarto/período no início do checkout.
+        
+        Valida propriedade, quarto, datas e disponibilidade e toma (ou renova)
+        o hold das noites. Sem Redis retorna hold_id None: a disponibilidade
+        é garantida apenas na criação da reserva.
+        
+        Raises:
+            ValueError: Se alguma validação falhar ou o quarto já estiver seguro
+        """
+        property_obj = self._validate_property(hold_data.property_slug)
+        booking_config = self._validate_booking_engine(property_obj.id)
+        room = self._validate_room(hold_data.room_id, property_obj.tenant_id)
+        
+        # Quarto/período alterado: liberar as noites antigas antes de segurar as novas
+        if hold_data.hold_id:
+            current = self.hold_service.get(hold_data.hold_id)
+            if current and not self.hold_service.covers(
+                current, room.id, hold_data.check_in_date, hold_data.check_out_date
+            ):
+                self.hold_service.release(current)
+        
+        hold = self.hold_service.acquire(
+            property_obj.tenant_id,
+            property_obj.id,
+            room.id,
+            hold_data.check_in_date,
+            hold_data.check_out_date,
+            hold_id=hold_data.hold_id
+        )
+        
+        try:
+            self._validate_dates_and_availability(
+                room,
+                hold_data.check_in_date,
+                hold_data.check_out_date,
+                property_obj.tenant_id,
+                booking_config
+            )
+        except ValueError:
+            self.hold_service.release(hold)
+            raise
+        
+        return {
+            'hold_id': hold['hold_id'] if hold else None,
+            'room_id': room.id,
+            'check_in_date': hold_data.check_in_date,
+            'check_out_date': hold_data.check_out_date,
+            'expires_at': hold['expires_at'] if hold else None,
+            'message': (
+                "Quarto reservado temporariamente. Conclua a reserva antes da expiração."
+                if hold else
+                "Disponibilidade verificada. A confirmação ocorre ao concluir a reserva."
+            )
+        }
+    
+    def release_hold(self, hold_id: str) -> bool:
+        """Libera um hold (hóspede desistiu do checkout)"""
+        hold = self.hold_service.get(hold_id)
+        if not hold:
+            return False
+        self.hold_service.release(hold)
+        return True
+    
+    def _acquire_booking_hold(self, booking_data: PublicBookingCreate, property_obj: Property, room: Room):
+        """
+        Hold usado na criação: o do checkout (conferido) ou um implícito e curto.
+        Retorna (hold, implicit).
+        """
+        if booking_data.hold_id:
+            hold = self.hold_service.get(booking_data.hold_id)
+            if hold:
+                if not self.hold_service.covers(
+                    hold, room.id, booking_data.check_in_date, booking_data.check_out_date
+                ):
+                    raise ValueError("Reserva temporária não corresponde ao quarto/período selecionado")
+                return hold, False
+        
+        # Sem hold (ou expirado): segurar as noites só durante a criação
+        hold = self.hold_service.acquire(
+            property_obj.tenant_id,
+            property_obj.id,
+            room.id,
+            booking_data.check_in_date,
+            booking_data.check_out_date,
+            ttl_seconds=self.CREATE_HOLD_TTL_SECONDS,
+            hold_id=booking_data.hold_id
+        )
+        return hold, True
     
     def create_booking(self, booking_data: PublicBookingCreate) -> Reservation:
         """
@@ -50,6 +148,9 @@ class PublicBookingService:
         Raises:
             ValueError: Se alguma validação falhar
         """
+        hold = None
+        implicit_hold = False
+        
         try:
             # 1. Validar propriedade e booking engine
             property_obj = self._validate_property(booking_data.property_slug)
@@ -58,7 +159,15 @@ class PublicBookingService:
             # 2. Validar quarto
             room = self._validate_room(booking_data.room_id, property_obj.tenant_id)
             
-            # 3. Validar datas e disponibilidade
+            # 3. Hold das noites (falha rápido se outro checkout segura o quarto)
+            hold, implicit_hold = self._acquire_booking_hold(booking_data, property_obj, room)
+            
+            # Serializar gravações concorrentes no mesmo quarto/noite até o commit
+            self.hold_service.lock_room_nights(
+                room.id, booking_data.check_in_date, booking_data.check_out_date
+            )
+            
+            # Validar datas e disponibilidade (após o lock: vê reservas já commitadas)
             self._validate_dates_and_availability(
                 room,
                 booking_data.check_in_date,
@@ -95,6 +204,9 @@ class PublicBookingService:
             booking_config.increment_booking()
             self.db.commit()
             
+            # Hold convertido em reserva
+            self.hold_service.release(hold)
+            
             logger.info(
                 f"Reserva pública criada: ID {reservation.id} | "
                 f"Propriedade: {property_obj.name} | "
@@ -104,9 +216,14 @@ class PublicBookingService:
             return reservation
             
         except ValueError:
+            self.db.rollback()
+            if implicit_hold:
+                self.hold_service.release(hold)
             raise
         except Exception as e:
             self.db.rollback()
+            if implicit_hold:
+                self.hold_service.release(hold)
             logger.error(f"Erro ao criar reserva pública: {str(e)}")
             raise ValueError(f"Erro ao processar reserva: {str(e)}")
     
@@ -206,6 +323,10 @@ class PublicBookingService:
         
         if not is_available['available']:
             raise ValueError("Quarto não está disponível para o período selecionado")
+        
+        # Reservas sobrepostas (ledger de ocupação)
+        if self.occupancy_ledger.get_occupied_room_ids([room.id], check_in, check_out, tenant_id):
+            raise ValueError("Quarto já reservado para o período selecionado")
     
     def _validate_capacity(self, room: Room, total_guests: int):
         """Valida capacidade do quarto"""
@@ -412,20 +533,16 @@ class PublicBookingService:
         self.db.add(reservation_room)
         self.db.flush()
         
+        # Materializar noites ocupadas no ledger (mesma transação da reserva)
+        self.occupancy_ledger.sync_reservation(reservation)
+        
         return reservation
     
     def _generate_reservation_number(self, tenant_id: int) -> str:
-        """Gera número único de reserva"""
-        from sqlalchemy import func
-        
-        year = datetime.now().year
-        count = self.db.query(func.count(Reservation.id)).filter(
-            Reservation.tenant_id == tenant_id,
-            func.extract('year', Reservation.created_at) == year
-        ).scalar()
+        """Gera número único de reserva (contador atômico por tenant/ano)"""
+        from app.services.reservation_number_service import ReservationNumberService
         
-        sequence = count + 1
-        return f"RES-{year}-{sequence:06d}"
+        return ReservationNumberService(self.db).next_number(tenant_id)
     
     def _generate_public_token(self) -> str:
         """Gera token único para acompanhamento público da reserva"""
@@ -0,0 +1,355 @@
+# backend/app/services/reservation_export_service.py
+
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple, BinaryIO
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import select, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from datetime import datetime, date
+from decimal import Decimal
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+import logging
+
+from app.core.config import settings
+from app.models.reservation import Reservation, ReservationRoom
+from app.models.guest import Guest
+from app.models.room import Room
+from app.models.property import Property
+from app.schemas.reservation import ReservationFilters
+from app.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
+
+
+# Formatos de data aceitos em ReservationExportFilters.date_format
+DATE_FORMATS = {
+    "dd/mm/yyyy": "%d/%m/%Y",
+    "mm/dd/yyyy": "%m/%d/%Y",
+    "yyyy-mm-dd": "%Y-%m-%d",
+}
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+
+
+class ReservationExportService:
+    """
+    Exportação de reservas em CSV/XLSX com memória constante.
+
+    As linhas vêm de uma query de colunas (sem objetos ORM) com os mesmos filtros
+    da listagem, lidas por cursor do servidor (yield_per) e escritas direto no
+    writer. Exportações pequenas são transmitidas na resposta; as grandes
+    rodam na task Celery export_reservations, que grava o arquivo em
+    RESERVATION_EXPORT_DIR e reporta progresso.
+    """
+
+    FORMATS = ("csv", "xlsx")
+    YIELD_PER = 1000
+    CSV_FLUSH_ROWS = 500
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.reservation_service = ReservationService(db)
+
+    # ============== COLUNAS ==============
+
+    def _columns(self, options: Dict[str, Any]) -> List[Tuple[str, Callable[[Any], Any]]]:
+        """Cabeçalhos e extratores de valor conforme as opções de exportação"""
+        columns: List[Tuple[str, Callable[[Any], Any]]] = [
+            ("Número", lambda r: r.reservation_number),
+            ("Status", lambda r: r.status),
+            ("Origem", lambda r: r.source),
+            ("Check-in", lambda r: r.check_in_date),
+            ("Check-out", lambda r: r.check_out_date),
+            ("Noites", lambda r: (r.check_out_date - r.check_in_date).days if r.check_in_date and r.check_out_date else 0),
+            ("Adultos", lambda r: r.adults),
+            ("Crianças", lambda r: r.children),
+            ("Total de Hóspedes", lambda r: r.total_guests),
+            ("Valor Total", lambda r: r.total_amount),
+        ]
+
+        if options.get("include_guest_details", True):
+            columns += [
+                ("Hóspede", lambda r: f"{r.guest_first_name or ''} {r.guest_last_name or ''}".strip()),
+                ("E-mail", lambda r: r.guest_email),
+                ("Telefone", lambda r: r.guest_phone),
+                ("Documento", lambda r: r.guest_document),
+            ]
+
+        if options.get("include_room_details", True):
+            columns.append(("Quartos", lambda r: r.room_numbers))
+
+        if options.get("include_payment_details", True):
+            columns += [
+                ("Pago", lambda r: r.paid_total),
+                ("Estornado", lambda r: r.refunded_total),
+                ("Saldo", lambda r: (r.total_amount or Decimal('0')) - r.paid_total + r.refunded_total),
+            ]
+
+        if options.get("include_property_details", False):
+            columns.append(("Propriedade", lambda r: r.property_name))
+
+        if options.get("include_parking_details", True):
+            columns.append(("Estacionamento", lambda r: "Sim" if r.parking_requested else "Não"))
+
+        columns.append(("Criada em", lambda r: r.created_at))
+        return columns
+
+    # ============== LEITURA ==============
+
+    def _query(self, tenant_id: int, filters: Optional[ReservationFilters]):
+        """Query de colunas com os filtros da listagem, ordenada como a listagem"""
+        guest = aliased(Guest)
+
+        room_numbers = select(
+            func.string_agg(Room.room_number, aggregate_order_by(literal_column("', '"), Room.room_number))
+        ).select_from(ReservationRoom).join(
+            Room, Room.id == ReservationRoom.room_id
+        ).where(
+            ReservationRoom.reservation_id == Reservation.id
+        ).correlate(Reservation).scalar_subquery()
+
+        query = self.db.query(
+            Reservation.id,
+            Reservation.reservation_number,
+            Reservation.status,
+            Reservation.source,
+            Reservation.check_in_date,
+            Reservation.check_out_date,
+            Reservation.adults,
+            Reservation.children,
+            Reservation.total_guests,
+            Reservation.total_amount,
+            Reservation.paid_total,
+            Reservation.refunded_total,
+            Reservation.parking_requested,
+            Reservation.created_at,
+            guest.first_name.label("guest_first_name"),
+            guest.last_name.label("guest_last_name"),
+            guest.email.label("guest_email"),
+            guest.phone.label("guest_phone"),
+            guest.document_number.label("guest_document"),
+            Property.name.label("property_name"),
+            room_numbers.label("room_numbers")
+        ).select_from(Reservation).outerjoin(
+            guest, guest.id == Reservation.guest_id
+        ).outerjoin(
+            Property, Property.id == Reservation.property_id
+        )
+
+        query = self.reservation_service.apply_reservation_filters(query, tenant_id, filters)
+        return query.order_by(Reservation.created_at.desc(), Reservation.id.desc())
+
+    def count(self, tenant_id: int, filters: Optional[ReservationFilters] = None) -> int:
+        return self.reservation_service.count_reservations(tenant_id, filters)
+
+    def iter_rows(
+        self,
+        tenant_id: int,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Iterator[List[Any]]:
+        """
+        Linhas já convertidas para valores de célula. O cursor do servidor entrega
+        YIELD_PER linhas por vez; progress(processadas) é chamado a cada lote.
+        """
+        extractors = [extract for _, extract in self._columns(options)]
+        processed = 0
+
+        for row in self._query(tenant_id, filters).yield_per(self.YIELD_PER):
+            yield [extract(row) for extract in extractors]
+            processed += 1
+            if progress and processed % self.YIELD_PER == 0:
+                progress(processed)
+
+        if progress:
+            progress(processed)
+
+    def headers(self, options: Dict[str, Any]) -> List[str]:
+        return [header for header, _ in self._columns(options)]
+
+    # ============== FORMATAÇÃO ==============
+
+    @staticmethod
+    def _csv_value(value: Any, date_format: str, decimal_comma: bool) -> Any:
+        if value is None:
+            return ""
+        if isinstance(value, datetime):
+            return value.strftime(f"{date_format} %H:%M")
+        if isinstance(value, date):
+            return value.strftime(date_format)
+        if isinstance(value, Decimal) and decimal_comma:
+            return str(value).replace(".", ",")
+        return value
+
+    @staticmethod
+    def _options_formats(options: Dict[str, Any]) -> Tuple[str, bool]:
+        date_format = DATE_FORMATS.get(options.get("date_format") or "dd/mm/yyyy", "%d/%m/%Y")
+        decimal_comma = (options.get("currency_format") or "pt-BR") == "pt-BR"
+        return date_format, decimal_comma
+
+    # ============== WRITERS ==============
+
+    def stream_csv(
+        self,
+        tenant_id: int,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Iterator[bytes]:
+        """CSV (UTF-8 com BOM, separador ';') gerado em blocos de CSV_FLUSH_ROWS linhas"""
+        date_format, decimal_comma = self._options_formats(options)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+
+        buffer.write("\ufeff")
+        writer.writerow(self.headers(options))
+
+        for i, values in enumerate(self.iter_rows(tenant_id, filters, options, progress), start=1):
+            writer.writerow([self._csv_value(v, date_format, decimal_comma) for v in values])
+            if i % self.CSV_FLUSH_ROWS == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue().encode("utf-8")
+
+    def write_xlsx(
+        self,
+        fileobj: BinaryIO,
+        tenant_id: int,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> None:
+        """XLSX em modo write-only do openpyxl (linhas vão para disco, não para a memória)"""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValueError("Exportação XLSX indisponível: openpyxl não instalado")
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Reservas")
+        sheet.append(self.headers(options))
+
+        for values in self.iter_rows(tenant_id, filters, options, progress):
+            sheet.append(values)
+
+        workbook.save(fileobj)
+
+    def stream_xlsx(
+        self,
+        tenant_id: int,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any]
+    ) -> Iterator[bytes]:
+        """Gera o XLSX em arquivo temporário e transmite em blocos"""
+        with tempfile.TemporaryFile() as tmp:
+            self.write_xlsx(tmp, tenant_id, filters, options)
+            tmp.seek(0)
+            while True:
+                chunk = tmp.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+
+    def stream(
+        self,
+        fmt: str,
+        tenant_id: int,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any]
+    ) -> Iterator[bytes]:
+        if fmt == "xlsx":
+            return self.stream_xlsx(tenant_id, filters, options)
+        return self.stream_csv(tenant_id, filters, options)
+
+    # ============== ARQUIVOS (EXPORTAÇÕES GRANDES) ==============
+
+    @staticmethod
+    def validate_format(fmt: str) -> str:
+        fmt = (fmt or "").lower()
+        if fmt not in ReservationExportService.FORMATS:
+            raise ValueError(f"Formato de exportação inválido: {fmt}. Use csv ou xlsx")
+        if fmt == "xlsx" and importlib.util.find_spec("openpyxl") is None:
+            raise ValueError("Exportação XLSX indisponível: openpyxl não instalado")
+        return fmt
+
+    @staticmethod
+    def content_type(fmt: str) -> str:
+        return XLSX_CONTENT_TYPE if fmt == "xlsx" else CSV_CONTENT_TYPE
+
+    @staticmethod
+    def file_name(fmt: str) -> str:
+        return f"reservas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+    @staticmethod
+    def export_path(tenant_id: int, export_id: str, fmt: str) -> str:
+        """Caminho do arquivo de uma exportação (um diretório por tenant)"""
+        return os.path.join(settings.RESERVATION_EXPORT_DIR, str(tenant_id), f"{export_id}.{fmt}")
+
+    @staticmethod
+    def find_export(tenant_id: int, export_id: str) -> Optional[str]:
+        """Arquivo pronto de uma exportação do tenant, se existir"""
+        for fmt in ReservationExportService.FORMATS:
+            path = ReservationExportService.export_path(tenant_id, export_id, fmt)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def cleanup_expired_exports() -> int:
+        """Remove arquivos de exportação mais antigos que RESERVATION_EXPORT_TTL_HOURS"""
+        root = settings.RESERVATION_EXPORT_DIR
+        if not os.path.isdir(root):
+            return 0
+
+        cutoff = datetime.now().timestamp() - settings.RESERVATION_EXPORT_TTL_HOURS * 3600
+        removed = 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def export_to_file(
+        self,
+        fmt: str,
+        tenant_id: int,
+        export_id: str,
+        filters: Optional[ReservationFilters],
+        options: Dict[str, Any],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> str:
+        """
+        Grava a exportação em RESERVATION_EXPORT_DIR/{tenant}/{export_id}.{fmt}.
+        O arquivo é escrito com nome temporário e renomeado ao final, de forma
+        que find_export só o encontra completo.
+        """
+        path = self.export_path(tenant_id, export_id, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial_path = f"{path}.part"
+
+        try:
+            with open(partial_path, "wb") as fileobj:
+                if fmt == "xlsx":
+                    self.write_xlsx(fileobj, tenant_id, filters, options, progress)
+                else:
+                    for chunk in self.stream_csv(tenant_id, filters, options, progress):
+                        fileobj.write(chunk)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        logger.info(f"Exportação de reservas gravada: {path}")
+        return path
@@ -0,0 +1,49 @@
+# backend/app/services/reservation_number_service.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Incremento atômico: cria o contador do ano na primeira reserva e, depois,
+# só trava a linha (tenant, ano) durante o próprio UPDATE.
+ALLOCATE_SEQUENCE_SQL = text("""
+    INSERT INTO reservation_number_sequences
+        (tenant_id, year, last_value, created_at, updated_at, is_active)
+    VALUES (:tenant_id, :year, 1, now(), now(), true)
+    ON CONFLICT (tenant_id, year) DO UPDATE SET
+        last_value = reservation_number_sequences.last_value + 1,
+        updated_at = now()
+    RETURNING last_value
+""")
+
+
+class ReservationNumberService:
+    """
+    Números de reserva RES-{ano}-{sequência:06d} a partir de um contador por
+    tenant e ano (reservation_number_sequences).
+
+    O incremento roda em uma transação curta e separada (como uma SEQUENCE do
+    PostgreSQL): reservas simultâneas não esperam umas pelas outras e nunca
+    recebem o mesmo número; uma reserva revertida deixa um buraco na numeração.
+    A unicidade é (tenant_id, reservation_number), a mesma chave do contador,
+    então o número alocado nunca precisa ser conferido na tabela de reservas.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _allocate(self, tenant_id: int, year: int) -> int:
+        """Próxima sequência do tenant no ano, commitada imediatamente"""
+        with self.db.get_bind().engine.begin() as connection:
+            return connection.execute(
+                ALLOCATE_SEQUENCE_SQL, {'tenant_id': tenant_id, 'year': year}
+            ).scalar_one()
+
+    def next_number(self, tenant_id: int) -> str:
+        """Gera número único de reserva dentro do tenant"""
+        year = datetime.now().year
+        return f"RES-{year}-{self._allocate(tenant_id, year):06d}"
@@ -0,0 +1,113 @@
+# backend/app/services/reservation_search_service.py
+
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, union, literal_column, func, text
+from sqlalchemy.sql.elements import ColumnElement
+import threading
+import logging
+
+from app.models.reservation import Reservation
+from app.models.guest import Guest
+
+logger = logging.getLogger(__name__)
+
+
+# Documentos de busca - textualmente idênticos às expressões dos índices GIN (pg_trgm)
+# criados pela migração add_reservation_search_indexes; qualquer alteração aqui
+# exige uma nova migração, senão o planner deixa de usar os índices.
+RESERVATION_SEARCH_DOCUMENT = (
+    "f_unaccent(lower("
+    "coalesce(reservations.reservation_number, '') || ' ' || "
+    "coalesce(reservations.internal_notes, '') || ' ' || "
+    "coalesce(reservations.guest_requests, '')"
+    "))"
+)
+
+GUEST_SEARCH_DOCUMENT = (
+    "f_unaccent(lower("
+    "coalesce(guests.first_name, '') || ' ' || "
+    "coalesce(guests.last_name, '') || ' ' || "
+    "coalesce(guests.email, '') || ' ' || "
+    "coalesce(guests.phone, '')"
+    "))"
+)
+
+_index_available: Optional[bool] = None
+_index_lock = threading.Lock()
+
+
+class ReservationSearchService:
+    """
+    Busca textual de reservas sobre índices trigram (pg_trgm + unaccent).
+
+    A busca vira a união de duas varreduras indexadas (documento da reserva e
+    documento do hóspede), sem acentos e sem diferenciar maiúsculas, com
+    relevância por word_similarity. Enquanto a migração não estiver aplicada,
+    is_available() retorna False e o chamador mantém a busca por ILIKE.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_available(self) -> bool:
+        """Verifica (uma vez por processo) se os índices de busca existem"""
+        global _index_available
+
+        if _index_available is not None:
+            return _index_available
+
+        with _index_lock:
+            if _index_available is None:
+                try:
+                    found = self.db.execute(text(
+                        "SELECT to_regclass('ix_reservations_search_trgm') IS NOT NULL "
+                        "AND to_regclass('ix_guests_search_trgm') IS NOT NULL"
+                    )).scalar()
+                    _index_available = bool(found)
+                except Exception as e:
+                    logger.warning(f"Não foi possível verificar índices de busca: {e}")
+                    return False
+
+                logger.info(
+                    "Busca de reservas: "
+                    + ("índices trigram" if _index_available else "ILIKE (índices não encontrados)")
+                )
+
+        return _index_available
+
+    @staticmethod
+    def normalize_term(term: str) -> ColumnElement:
+        """Termo normalizado do mesmo jeito que os documentos (lower + unaccent)"""
+        return func.f_unaccent(func.lower(term))
+
+    def matching_reservation_ids(self, tenant_id: int, term: str):
+        """
+        Subquery com os IDs das reservas do tenant cujo documento (ou o do
+        hóspede) contém o termo. Cada lado da união usa seu índice GIN.
+        """
+        pattern = func.concat('%', self.normalize_term(term), '%')
+
+        by_reservation = select(Reservation.id).where(
+            Reservation.tenant_id == tenant_id,
+            literal_column(RESERVATION_SEARCH_DOCUMENT).like(pattern)
+        )
+
+        by_guest = select(Reservation.id).join(
+            Guest, Reservation.guest_id == Guest.id
+        ).where(
+            Reservation.tenant_id == tenant_id,
+            literal_column(GUEST_SEARCH_DOCUMENT).like(pattern)
+        )
+
+        return union(by_reservation, by_guest).subquery()
+
+    def rank_expression(self, term: str) -> ColumnElement:
+        """
+        Relevância do resultado (0..1). Requer Guest na query (join por guest_id).
+        """
+        normalized = self.normalize_term(term)
+        return func.greatest(
+            func.word_similarity(normalized, literal_column(RESERVATION_SEARCH_DOCUMENT)),
+            func.word_similarity(normalized, literal_column(GUEST_SEARCH_DOCUMENT))
+        )
@@ -1,13 +1,18 @@
 # backend/app/services/reservation_service.py - COMPLETO COM MULTI-SELECT PARA STATUS E CANAL + ESTACIONAMENTO + RESTRIÇÕES
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_, func, not_, desc
+from sqlalchemy import and_, or_, func, not_, desc, tuple_, select
 from fastapi import Request, HTTPException, status
 from datetime import datetime, date
 from decimal import Decimal
 import urllib.parse  # ✅ NOVO: Para decodificar URLs
+import base64
+import binascii
+import json
+
+from app.core.config import settings
 
 from app.models.reservation import Reservation, ReservationRoom
 from app.models.guest import Guest
@@ -40,9 +45,14 @@ from app.services.audit_formatting_service import AuditFormattingService
 
 # ✅ NOVO: Imports para validação de restrições
 from app.services.restriction_validation_service import RestrictionValidationService
-from app.schemas.reservation_restriction import (
-    RestrictionValidationRequest, RestrictionValidationResponse
-)
+from app.schemas.reservation_restriction import RestrictionValidationResponse
+
+# Ledger de ocupação quarto/noite
+from app.services.occupancy_ledger_service import OccupancyLedgerService
+from app.services.reservation_number_service import ReservationNumberService
+
+# Busca textual indexada
+from app.services.reservation_search_service import ReservationSearchService
 
 
 class ReservationService:
@@ -52,19 +62,14 @@ class ReservationService:
         self.db = db
         # Serviço de formatação de auditoria
         self.audit_formatter = AuditFormattingService()
+        # Ledger de ocupação (mantido na mesma transação da reserva)
+        self.occupancy_ledger = OccupancyLedgerService(db)
+        # Busca textual indexada (pg_trgm + unaccent)
+        self.search_service = ReservationSearchService(db)
 
     def generate_reservation_number(self, tenant_id: int) -> str:
-        """Gera número único de reserva"""
-        year = datetime.now().year
-        
-        # Contar reservas do ano atual
-        count = self.db.query(func.count(Reservation.id)).filter(
-            Reservation.tenant_id == tenant_id,
-            func.extract('year', Reservation.created_at) == year
-        ).scalar()
-        
-        sequence = count + 1
-        return f"RES-{year}-{sequence:06d}"
+        """Gera número único de reserva (contador atômico por tenant/ano)"""
+        return ReservationNumberService(self.db).next_number(tenant_id)
 
     def get_reservation_by_id(self, reservation_id: int, tenant_id: int) -> Optional[Reservation]:
         """Busca reserva por ID dentro do tenant"""
@@ -101,29 +106,14 @@ class ReservationService:
         """
         Verifica disponibilidade de quartos específicos em um período.
         Retorna dict {room_id: is_available}
+        
+        Consulta o ledger de ocupação (lookup indexado por quarto/noite)
+        ao invés de varrer sobreposições de intervalos em ReservationRoom.
         """
-        # Buscar reservas que conflitam no período
-        conflicts_query = self.db.query(ReservationRoom).join(Reservation).filter(
-            ReservationRoom.room_id.in_(room_ids),
-            Reservation.tenant_id == tenant_id,
-            Reservation.is_active == True,
-            Reservation.status.in_(['pending', 'confirmed', 'checked_in']),
-            not_(
-                or_(
-                    ReservationRoom.check_out_date <= check_in_date,
-                    ReservationRoom.check_in_date >= check_out_date
-                )
-            )
+        conflicting_room_ids = self.occupancy_ledger.get_occupied_room_ids(
+            room_ids, check_in_date, check_out_date, tenant_id, exclude_reservation_id
         )
         
-        # Excluir reserva específica se fornecida (para updates)
-        if exclude_reservation_id:
-            conflicts_query = conflicts_query.filter(
-                Reservation.id != exclude_reservation_id
-            )
-        
-        conflicting_room_ids = set(r.room_id for r in conflicts_query.all())
-        
         # Montar resultado
         availability = {}
         for room_id in room_ids:
@@ -194,25 +184,20 @@ class ReservationService:
         # Filtrar quartos disponíveis por ocupação
         available_rooms_basic = [room for room in all_rooms if availability.get(room.id, False)]
         
-        # ✅ NOVO: Validar restrições para cada quarto disponível
-        available_rooms_final = []
+        # ✅ NOVO: Validar restrições de todos os quartos disponíveis em lote
         restriction_service = RestrictionValidationService(self.db)
+        validation_results = restriction_service.validate_reservation_restrictions_batch(
+            property_id=property_id,
+            rooms={room.id: room.room_type_id for room in available_rooms_basic},
+            check_in_date=check_in_date,
+            check_out_date=check_out_date,
+            tenant_id=tenant_id
+        )
         
-        for room in available_rooms_basic:
-            validation_request = RestrictionValidationRequest(
-                property_id=property_id,
-                room_id=room.id,
-                room_type_id=room.room_type_id,
-                check_in_date=check_in_date,
-                check_out_date=check_out_date
-            )
-            
-            validation_result = restriction_service.validate_reservation_restrictions(
-                validation_request, tenant_id
-            )
-            
-            if validation_result.is_valid:
-                available_rooms_final.append(room)
+        available_rooms_final = [
+            room for room in available_rooms_basic
+            if validation_results[room.id].is_valid
+        ]
         
         # Retornar apenas quartos que passaram em todas as validações
         return available_rooms_final
@@ -267,20 +252,10 @@ class ReservationService:
             restrictions_applied=True  # Sempre True pois agora validamos restrições
         )
 
-    # ===== MÉTODO PRINCIPAL: GET_RESERVATIONS COM MULTI-SELECT E FILTRO DE ESTACIONAMENTO =====
-    def get_reservations(
-        self, 
-        tenant_id: int, 
-        filters: Optional[ReservationFilters] = None,
-        skip: int = 0, 
-        limit: int = 100
-    ) -> List[Reservation]:
-        """Lista reservas com filtros opcionais - AGORA COM SUPORTE A MULTI-SELECT E FILTRO DE ESTACIONAMENTO"""
-        query = self.db.query(Reservation).options(
-            joinedload(Reservation.guest),
-            joinedload(Reservation.property_obj),
-            joinedload(Reservation.reservation_rooms).joinedload(ReservationRoom.room)
-        ).filter(
+    # ===== FILTROS COMPARTILHADOS (LISTAGEM, CONTAGEM E PAGINAÇÃO POR CURSOR) =====
+    def apply_reservation_filters(self, query, tenant_id: int, filters: Optional[ReservationFilters] = None):
+        """Aplica tenant, is_active e os filtros da listagem a uma query sobre Reservation"""
+        query = query.filter(
             Reservation.tenant_id == tenant_id,
             Reservation.is_active == True
         )
@@ -382,10 +357,11 @@ class ReservationService:
             
             # Filtros boolean
             if filters.is_paid is not None:
+                # Saldo calculado sobre os totais armazenados (paid_total/refunded_total)
                 if filters.is_paid:
-                    query = query.filter(Reservation.paid_amount >= Reservation.total_amount)
+                    query = query.filter(Reservation.balance_due <= 0)
                 else:
-                    query = query.filter(Reservation.paid_amount < Reservation.total_amount)
+                    query = query.filter(Reservation.balance_due > 0)
             
             if filters.requires_deposit is not None:
                 query = query.filter(Reservation.requires_deposit == filters.requires_deposit)
@@ -395,119 +371,160 @@ class ReservationService:
             
             # ===== BUSCA TEXTUAL MELHORADA COM DECODIFICAÇÃO =====
             if filters.search:
-                # ✅ CORREÇÃO: Decodificar parâmetro antes de usar na busca
-                raw_search = filters.search.strip()
-                decoded_search = urllib.parse.unquote(raw_search)
-                
-                print(f"🔍 BUSCA RAW: '{raw_search}'")
+                decoded_search = self._decoded_search(filters)
                 print(f"🔍 BUSCA DECODED: '{decoded_search}'")
                 
-                search_term = f"%{decoded_search}%"
-                
-                query = query.join(Guest).filter(
-                    or_(
-                        # Busca por número da reserva
-                        Reservation.reservation_number.ilike(search_term),
-                        # Busca por nome do hóspede (primeiro e último nome)
-                        Guest.first_name.ilike(search_term),
-                        Guest.last_name.ilike(search_term),
-                        # Busca por nome completo
-                        func.concat(Guest.first_name, ' ', Guest.last_name).ilike(search_term),
-                        # Busca por email (agora decodificado)
-                        Guest.email.ilike(search_term),
-                        # Busca por telefone
-                        Guest.phone.ilike(search_term),
-                        # Busca em observações
-                        Reservation.internal_notes.ilike(search_term),
-                        Reservation.guest_requests.ilike(search_term)
+                if self.search_service.is_available():
+                    # Índices trigram (pg_trgm + unaccent): união de varreduras indexadas
+                    matching = self.search_service.matching_reservation_ids(tenant_id, decoded_search)
+                    query = query.filter(Reservation.id.in_(select(matching.c.id)))
+                else:
+                    search_term = f"%{decoded_search}%"
+                    
+                    query = query.join(Guest).filter(
+                        or_(
+                            # Busca por número da reserva
+                            Reservation.reservation_number.ilike(search_term),
+                            # Busca por nome do hóspede (primeiro e último nome)
+                            Guest.first_name.ilike(search_term),
+                            Guest.last_name.ilike(search_term),
+                            # Busca por nome completo
+                            func.concat(Guest.first_name, ' ', Guest.last_name).ilike(search_term),
+                            # Busca por email (agora decodificado)
+                            Guest.email.ilike(search_term),
+                            # Busca por telefone
+                            Guest.phone.ilike(search_term),
+                            # Busca em observações
+                            Reservation.internal_notes.ilike(search_term),
+                            Reservation.guest_requests.ilike(search_term)
+                        )
                     )
-                )
         
-        return query.order_by(Reservation.created_at.desc()).offset(skip).limit(limit).all()
+        return query
+
+    def _decoded_search(self, filters: Optional[ReservationFilters]) -> Optional[str]:
+        """Termo de busca decodificado (o frontend pode enviar o parâmetro codificado)"""
+        if not filters or not filters.search:
+            return None
+        
+        # ✅ CORREÇÃO: Decodificar parâmetro antes de usar na busca
+        return urllib.parse.unquote(filters.search.strip())
+
+    def _reservation_list_query(self, tenant_id: int, filters: Optional[ReservationFilters] = None):
+        """Query da listagem com os relacionamentos usados na resposta"""
+        query = self.db.query(Reservation).options(
+            joinedload(Reservation.guest),
+            joinedload(Reservation.property_obj),
+            selectinload(Reservation.reservation_rooms)
+            .joinedload(ReservationRoom.room)
+            .joinedload(Room.room_type)
+        )
+        return self.apply_reservation_filters(query, tenant_id, filters)
+
+    # ===== MÉTODO PRINCIPAL: GET_RESERVATIONS COM MULTI-SELECT E FILTRO DE ESTACIONAMENTO =====
+    def get_reservations(
+        self, 
+        tenant_id: int, 
+        filters: Optional[ReservationFilters] = None,
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[Reservation]:
+        """Lista reservas com filtros opcionais - AGORA COM SUPORTE A MULTI-SELECT E FILTRO DE ESTACIONAMENTO"""
+        query = self._reservation_list_query(tenant_id, filters)
+        
+        # Com busca indexada, ordenar por relevância (empates pela mais recente)
+        search = self._decoded_search(filters)
+        if search and self.search_service.is_available():
+            rank = self.search_service.rank_expression(search)
+            query = query.join(Guest, Reservation.guest_id == Guest.id).order_by(rank.desc())
+        
+        return query.order_by(
+            Reservation.created_at.desc(), Reservation.id.desc()
+        ).offset(skip).limit(limit).all()
+
+    # ===== PAGINAÇÃO POR CURSOR (KEYSET) =====
+    def get_reservations_page(
+        self,
+        tenant_id: int,
+        filters: Optional[ReservationFilters] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Reservation], Optional[str]]:
+        """
+        Página de reservas por keyset em (created_at, id) decrescente.
+        O custo não depende da profundidade da página (sem OFFSET).
+        Com busca textual os resultados são filtrados pelo índice, mas mantêm
+        a ordem do cursor (a ordenação por relevância é do modo offset).
+        
+        Returns:
+            (reservas, next_cursor) - next_cursor é None na última página
+        """
+        query = self._reservation_list_query(tenant_id, filters)
+        
+        if cursor:
+            created_at, reservation_id = self.decode_reservation_cursor(cursor)
+            query = query.filter(
+                tuple_(Reservation.created_at, Reservation.id) < tuple_(created_at, reservation_id)
+            )
+        
+        reservations = query.order_by(
+            Reservation.created_at.desc(), Reservation.id.desc()
+        ).limit(limit + 1).all()
+        
+        has_more = len(reservations) > limit
+        reservations = reservations[:limit]
+        next_cursor = self.encode_reservation_cursor(reservations[-1]) if has_more else None
+        
+        return reservations, next_cursor
+
+    @staticmethod
+    def encode_reservation_cursor(reservation: Reservation) -> str:
+        """Cursor opaco com a posição (created_at, id) da última reserva da página"""
+        payload = json.dumps({'c': reservation.created_at.isoformat(), 'i': reservation.id})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_reservation_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Decodifica o cursor de paginação (ValueError se inválido)"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return datetime.fromisoformat(payload['c']), int(payload['i'])
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise ValueError("Cursor de paginação inválido")
 
     # ===== MÉTODO AUXILIAR: COUNT_RESERVATIONS COM MULTI-SELECT E ESTACIONAMENTO =====
     def count_reservations(self, tenant_id: int, filters: Optional[ReservationFilters] = None) -> int:
         """Conta total de reservas (para paginação) - AGORA COM SUPORTE A MULTI-SELECT E ESTACIONAMENTO"""
-        query = self.db.query(func.count(Reservation.id)).filter(
-            Reservation.tenant_id == tenant_id,
-            Reservation.is_active == True
+        query = self.apply_reservation_filters(
+            self.db.query(func.count(Reservation.id)), tenant_id, filters
         )
+        return query.scalar()
+
+    def count_reservations_capped(
+        self,
+        tenant_id: int,
+        filters: Optional[ReservationFilters] = None,
+        cap: Optional[int] = None
+    ) -> Tuple[int, bool]:
+        """
+        Contagem limitada: para de contar em `cap` linhas (custo limitado em
+        tenants grandes).
         
-        # Aplicar mesmos filtros da busca
-        if filters:
-            # ===== FILTROS DE STATUS COM PRIORIDADE PARA MULTI-SELECT =====
-            # 1. Priorizar filtro multi-select se presente
-            if filters.status_list and len(filters.status_list) > 0:
-                all_status_variations = []
-                for status in filters.status_list:
-                    normalized = self._normalize_status_for_search(status)
-                    variations = self._get_status_variations(normalized)
-                    all_status_variations.extend(variations)
-                unique_variations = list(set(all_status_variations))
-                query = query.filter(Reservation.status.in_(unique_variations))
-            
-            # 2. Aplicar filtro único apenas se multi-select não foi usado
-            elif filters.status:
-                normalized_status = self._normalize_status_for_search(filters.status)
-                status_variations = self._get_status_variations(normalized_status)
-                query = query.filter(Reservation.status.in_(status_variations))
-            
-            # ===== FILTROS DE ORIGEM COM PRIORIDADE PARA MULTI-SELECT =====
-            # 1. Priorizar filtro multi-select se presente
-            if filters.source_list and len(filters.source_list) > 0:
-                all_source_variations = []
-                for source in filters.source_list:
-                    normalized = self._normalize_source_for_search(source)
-                    variations = self._get_source_variations(normalized)
-                    all_source_variations.extend(variations)
-                unique_variations = list(set(all_source_variations))
-                query = query.filter(Reservation.source.in_(unique_variations))
-            
-            # 2. Aplicar filtro único apenas se multi-select não foi usado
-            elif filters.source:
-                normalized_source = self._normalize_source_for_search(filters.source)
-                source_variations = self._get_source_variations(normalized_source)
-                query = query.filter(Reservation.source.in_(source_variations))
-            
-            # ===== NOVO: FILTRO DE ESTACIONAMENTO NO COUNT =====
-            if filters.parking_requested is not None:
-                query = query.filter(Reservation.parking_requested == filters.parking_requested)
-            
-            # ===== DEMAIS FILTROS (IGUAL AO GET_RESERVATIONS) =====
-            if filters.property_id:
-                query = query.filter(Reservation.property_id == filters.property_id)
-            if filters.guest_id:
-                query = query.filter(Reservation.guest_id == filters.guest_id)
-            if filters.check_in_from:
-                query = query.filter(Reservation.check_in_date >= filters.check_in_from)
-            if filters.check_in_to:
-                query = query.filter(Reservation.check_in_date <= filters.check_in_to)
-            
-            # ===== BUSCA TEXTUAL NO COUNT TAMBÉM COM DECODIFICAÇÃO =====
-            if filters.search:
-                # ✅ CORREÇÃO: Decodificar parâmetro antes de usar na busca
-                raw_search = filters.search.strip()
-                decoded_search = urllib.parse.unquote(raw_search)
-                
-                print(f"🔍 COUNT BUSCA RAW: '{raw_search}'")
-                print(f"🔍 COUNT BUSCA DECODED: '{decoded_search}'")
-                
-                search_term = f"%{decoded_search}%"
-                
-                query = query.join(Guest).filter(
-                    or_(
-                        Reservation.reservation_number.ilike(search_term),
-                        Guest.first_name.ilike(search_term),
-                        Guest.last_name.ilike(search_term),
-                        func.concat(Guest.first_name, ' ', Guest.last_name).ilike(search_term),
-                        Guest.email.ilike(search_term),
-                        Guest.phone.ilike(search_term),
-                        Reservation.internal_notes.ilike(search_term),
-                        Reservation.guest_requests.ilike(search_term)
-                    )
-                )
+        Returns:
+            (total, exato) - quando exato é False, o total real é "cap ou mais"
+        """
+        cap = cap or settings.RESERVATION_COUNT_ESTIMATE_CAP
         
-        return query.scalar()
+        ids = self.apply_reservation_filters(
+            self.db.query(Reservation.id), tenant_id, filters
+        ).limit(cap + 1).subquery()
+        
+        total = self.db.query(func.count()).select_from(ids).scalar()
+        if total > cap:
+            return cap, False
+        return total, True
+
 
     # ===== MÉTODOS AUXILIARES PARA NORMALIZAÇÃO ===== 
     def _normalize_status_for_search(self, status: str) -> str:
@@ -836,6 +853,9 @@ class ReservationService:
                 
                 self.db.add(reservation_room)
             
+            # Materializar noites ocupadas (falha com IntegrityError em caso de overbooking)
+            self.occupancy_ledger.sync_reservation(db_reservation)
+            
             self.db.commit()
             self.db.refresh(db_reservation)
             
@@ -1097,6 +1117,10 @@ class ReservationService:
                 reservation_room.check_out_date = reservation_obj.check_out_date
 
         try:
+            # Reconstruir noites ocupadas se datas, quartos ou status mudaram
+            if dates_changed or rooms_updated or 'status' in update_data:
+                self.occupancy_ledger.sync_reservation(reservation_obj)
+            
             self.db.commit()
             self.db.refresh(reservation_obj)
             
@@ -1426,6 +1450,9 @@ class ReservationService:
             reservation_room.status = 'checked_out'
         
         try:
+            # Liberar noites no ledger de ocupação
+            self.occupancy_ledger.sync_reservation(reservation_obj)
+            
             self.db.commit()
             self.db.refresh(reservation_obj)
             
@@ -1498,6 +1525,9 @@ class ReservationService:
             reservation_room.status = 'cancelled'
         
         try:
+            # Liberar noites no ledger de ocupação
+            self.occupancy_ledger.sync_reservation(reservation_obj)
+            
             self.db.commit()
             self.db.refresh(reservation_obj)
             
@@ -1935,31 +1965,26 @@ class ReservationService:
         """
         restriction_service = RestrictionValidationService(self.db)
         
-        # Validar cada quarto individualmente
-        for room_id in room_ids:
-            # Buscar room_type_id
-            room = self.db.query(Room).filter(
-                Room.id == room_id,
+        # Buscar room_type_id de todos os quartos (quartos não encontrados são ignorados)
+        room_types = dict(
+            self.db.query(Room.id, Room.room_type_id).filter(
+                Room.id.in_(room_ids),
                 Room.tenant_id == tenant_id
-            ).first()
-            
-            if not room:
-                continue  # Pular quartos não encontrados
-            
-            validation_request = RestrictionValidationRequest(
-                property_id=property_id,
-                room_id=room_id,
-                room_type_id=room.room_type_id,
-                check_in_date=check_in_date,
-                check_out_date=check_out_date
-            )
-            
-            validation_result = restriction_service.validate_reservation_restrictions(
-                validation_request, tenant_id
-            )
-            
-            # Se algum quarto tem violação, retornar imediatamente
-            if not validation_result.is_valid:
+            ).all()
+        )
+        
+        validation_results = restriction_service.validate_reservation_restrictions_batch(
+            property_id=property_id,
+            rooms=room_types,
+            check_in_date=check_in_date,
+            check_out_date=check_out_date,
+            tenant_id=tenant_id
+        )
+        
+        # Se algum quarto tem violação, retornar a primeira (na ordem informada)
+        for room_id in room_ids:
+            validation_result = validation_results.get(room_id)
+            if validation_result and not validation_result.is_valid:
                 return validation_result
         
         # Se chegou aqui, todos os quartos são válidos
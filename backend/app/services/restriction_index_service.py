@@ -0,0 +1,380 @@
+# backend/app/services/restriction_index_service.py
+
+from typing import Optional, List, Dict, Tuple, Iterable, Any
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import date, timedelta
+from bisect import bisect_right
+import threading
+import logging
+
+from app.models.reservation_restriction import ReservationRestriction
+
+logger = logging.getLogger(__name__)
+
+
+ALL_DAYS_MASK = 0x7F  # 7 bits: bit 0 = segunda ... bit 6 = domingo
+
+# Colunas copiadas para as restrições mantidas no índice (desvinculadas da sessão)
+_RESTRICTION_COLUMNS = [column.key for column in ReservationRestriction.__table__.columns]
+
+
+def days_of_week_mask(days_of_week: Optional[Iterable[int]]) -> int:
+    """Converte days_of_week (0=segunda, 6=domingo) em máscara de 7 bits. Vazio = todos os dias."""
+    if not days_of_week:
+        return ALL_DAYS_MASK
+    mask = 0
+    for day in days_of_week:
+        mask |= 1 << int(day)
+    return mask
+
+
+def weekdays_mask_between(date_from: date, date_to: date) -> int:
+    """Máscara dos dias da semana presentes em [date_from, date_to] (inclusivo)"""
+    span = (date_to - date_from).days + 1
+    if span <= 0:
+        return 0
+    if span >= 7:
+        return ALL_DAYS_MASK
+    mask = 0
+    weekday = date_from.weekday()
+    for i in range(span):
+        mask |= 1 << ((weekday + i) % 7)
+    return mask
+
+
+def restriction_applies_on(restriction: Any, check_date: date) -> bool:
+    """Verifica período e dia da semana de uma restrição em uma data (O(1))"""
+    if not (restriction.date_from <= check_date <= restriction.date_to):
+        return False
+    return bool(days_of_week_mask(restriction.days_of_week) >> check_date.weekday() & 1)
+
+
+def restriction_applies_to_range(restriction: Any, check_in_date: date, check_out_date: date) -> bool:
+    """
+    Verifica se a restrição se aplica a alguma noite de [check_in, check_out),
+    considerando dias da semana. Sem filtro de dias, vale a sobreposição de período.
+    """
+    if not restriction.days_of_week:
+        return True
+
+    start = max(check_in_date, restriction.date_from)
+    end = min(check_out_date - timedelta(days=1), restriction.date_to)
+    return bool(days_of_week_mask(restriction.days_of_week) & weekdays_mask_between(start, end))
+
+
+def _type_key(restriction_type: Any) -> str:
+    """Normaliza RestrictionType/RestrictionTypeEnum ou string para a chave do índice"""
+    return str(getattr(restriction_type, 'value', restriction_type))
+
+
+def _scope_key(restriction: Any) -> Tuple[str, Optional[int]]:
+    if restriction.room_id:
+        return ('room', restriction.room_id)
+    if restriction.room_type_id:
+        return ('room_type', restriction.room_type_id)
+    return ('property', None)
+
+
+class _ScopeTypeIntervals:
+    """
+    Restrições de um (escopo, tipo) compiladas em segmentos disjuntos ordenados.
+    Cada segmento [start, end) (ordinais de data) guarda as restrições que o cobrem,
+    ordenadas por prioridade, com a máscara de dias da semana pré-calculada.
+    """
+
+    __slots__ = ('starts', 'ends', 'covering', 'by_date_from', 'date_from_keys')
+
+    def __init__(self, restrictions: List[Any]):
+        ordered = sorted(restrictions, key=lambda r: (-r.priority, r.id))
+        entries = [
+            (r.date_from.toordinal(), r.date_to.toordinal() + 1, days_of_week_mask(r.days_of_week), r)
+            for r in ordered
+        ]
+
+        boundaries = sorted({start for start, _, _, _ in entries} | {end for _, end, _, _ in entries})
+
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.covering: List[List[Tuple[int, Any]]] = []
+
+        for seg_start, seg_end in zip(boundaries, boundaries[1:]):
+            covering = [
+                (mask, r) for start, end, mask, r in entries
+                if start <= seg_start and end >= seg_end
+            ]
+            if covering:
+                self.starts.append(seg_start)
+                self.ends.append(seg_end)
+                self.covering.append(covering)
+
+        # Ordenação por date_from para consultas de período (estadias)
+        self.by_date_from = sorted(ordered, key=lambda r: r.date_from)
+        self.date_from_keys = [r.date_from for r in self.by_date_from]
+
+    def segment_at(self, ordinal: int) -> int:
+        """Índice do segmento que contém a data, ou -1"""
+        i = bisect_right(self.starts, ordinal) - 1
+        if i >= 0 and ordinal < self.ends[i]:
+            return i
+        return -1
+
+    def applicable_on(self, check_date: date) -> List[Any]:
+        """Restrições que se aplicam na data, em ordem de prioridade"""
+        i = self.segment_at(check_date.toordinal())
+        if i < 0:
+            return []
+        bit = 1 << check_date.weekday()
+        return [r for mask, r in self.covering[i] if mask & bit]
+
+    def effective_on(self, check_date: date) -> Optional[Any]:
+        """Restrição de maior prioridade na data"""
+        i = self.segment_at(check_date.toordinal())
+        if i < 0:
+            return None
+        bit = 1 << check_date.weekday()
+        for mask, r in self.covering[i]:
+            if mask & bit:
+                return r
+        return None
+
+    def overlapping(self, date_from: date, date_to: date) -> List[Any]:
+        """Restrições cujo período intersecta [date_from, date_to] (inclusivo)"""
+        end = bisect_right(self.date_from_keys, date_to)
+        return [r for r in self.by_date_from[:end] if r.date_to >= date_from]
+
+
+class RestrictionIndex:
+    """
+    Índice compilado das restrições ativas de uma propriedade.
+
+    As restrições são agrupadas por (escopo, tipo) em segmentos disjuntos
+    ordenados, de forma que "restrição efetiva do tipo T para o escopo S na data D"
+    é uma busca binária, sem varrer dia a dia. Os objetos mantidos são cópias
+    desvinculadas da sessão (podem ser reutilizadas entre requisições).
+    """
+
+    def __init__(self, restrictions: Iterable[Any]):
+        grouped: Dict[Tuple[Tuple[str, Optional[int]], str], List[Any]] = {}
+        self.total = 0
+        for restriction in restrictions:
+            key = (_scope_key(restriction), _type_key(restriction.restriction_type))
+            grouped.setdefault(key, []).append(restriction)
+            self.total += 1
+
+        self._intervals: Dict[Tuple[Tuple[str, Optional[int]], str], _ScopeTypeIntervals] = {
+            key: _ScopeTypeIntervals(items) for key, items in grouped.items()
+        }
+        self.restriction_types = sorted({restriction_type for _, restriction_type in grouped})
+
+    @staticmethod
+    def scope_chain(
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None
+    ) -> List[Tuple[str, Optional[int]]]:
+        """Escopos em ordem de precedência: Room > RoomType > Property"""
+        chain = []
+        if room_id:
+            chain.append(('room', room_id))
+        if room_type_id:
+            chain.append(('room_type', room_type_id))
+        chain.append(('property', None))
+        return chain
+
+    def _types(self, restriction_types: Optional[Iterable[str]]) -> List[str]:
+        if restriction_types is None:
+            return self.restriction_types
+        return [_type_key(t) for t in restriction_types]
+
+    # ============== CONSULTAS PONTUAIS ==============
+
+    def effective(
+        self,
+        restriction_type: str,
+        check_date: date,
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None
+    ) -> Optional[Any]:
+        """Restrição efetiva do tipo na data, aplicando a precedência de escopo"""
+        restriction_type = _type_key(restriction_type)
+        for scope in self.scope_chain(room_id, room_type_id):
+            intervals = self._intervals.get((scope, restriction_type))
+            if intervals is None:
+                continue
+            restriction = intervals.effective_on(check_date)
+            if restriction is not None:
+                return restriction
+        return None
+
+    def applicable_on(
+        self,
+        check_date: date,
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None,
+        restriction_types: Optional[Iterable[str]] = None
+    ) -> List[Any]:
+        """Todas as restrições (todos os escopos da cadeia) que se aplicam na data"""
+        result = []
+        for restriction_type in self._types(restriction_types):
+            for scope in self.scope_chain(room_id, room_type_id):
+                intervals = self._intervals.get((scope, restriction_type))
+                if intervals is not None:
+                    result.extend(intervals.applicable_on(check_date))
+        return result
+
+    # ============== CONSULTAS POR PERÍODO ==============
+
+    def restricted_dates(
+        self,
+        restriction_type: str,
+        date_from: date,
+        date_to: date,
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None
+    ) -> List[date]:
+        """
+        Datas de [date_from, date_to] (inclusivo) com restrição efetiva do tipo.
+        Para tipos booleanos (CTA, CTD, stop sell) considera apenas is_restricted.
+        """
+        restriction_type = _type_key(restriction_type)
+        chain = [
+            self._intervals[(scope, restriction_type)]
+            for scope in self.scope_chain(room_id, room_type_id)
+            if (scope, restriction_type) in self._intervals
+        ]
+        if not chain:
+            return []
+
+        dates = []
+        current = date_from
+        while current <= date_to:
+            for intervals in chain:
+                restriction = intervals.effective_on(current)
+                if restriction is not None:
+                    if restriction.restriction_value is not None or restriction.is_restricted:
+                        dates.append(current)
+                    break
+            current += timedelta(days=1)
+        return dates
+
+    def applicable_for_stay(
+        self,
+        check_in_date: date,
+        check_out_date: date,
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Restrições que se aplicam à estadia (mesma semântica da consulta por
+        sobreposição de período + filtro de dias da semana), ordenadas por
+        especificidade e prioridade.
+        """
+        result = []
+        for scope in self.scope_chain(room_id, room_type_id):
+            scope_result = []
+            for restriction_type in self.restriction_types:
+                intervals = self._intervals.get((scope, restriction_type))
+                if intervals is None:
+                    continue
+                for restriction in intervals.overlapping(check_in_date, check_out_date):
+                    if restriction_applies_to_range(restriction, check_in_date, check_out_date):
+                        scope_result.append(restriction)
+            scope_result.sort(key=lambda r: -r.priority)
+            result.extend(scope_result)
+        return result
+
+    def count_overlapping(
+        self,
+        date_from: date,
+        date_to: date,
+        room_id: Optional[int] = None,
+        room_type_id: Optional[int] = None,
+        restriction_types: Optional[Iterable[str]] = None
+    ) -> int:
+        """Número de restrições da cadeia de escopos que intersectam o período"""
+        total = 0
+        for restriction_type in self._types(restriction_types):
+            for scope in self.scope_chain(room_id, room_type_id):
+                intervals = self._intervals.get((scope, restriction_type))
+                if intervals is not None:
+                    total += len(intervals.overlapping(date_from, date_to))
+        return total
+
+
+# ============== CACHE POR PROCESSO ==============
+
+_index_cache: Dict[Tuple[int, int], Tuple[Tuple, RestrictionIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+
+def invalidate_restriction_index(tenant_id: int, property_id: Optional[int] = None) -> None:
+    """Descarta índices compilados (de uma propriedade ou de todo o tenant)"""
+    with _index_cache_lock:
+        if property_id is not None:
+            _index_cache.pop((tenant_id, property_id), None)
+            return
+        for key in [key for key in _index_cache if key[0] == tenant_id]:
+            _index_cache.pop(key, None)
+
+
+class RestrictionIndexService:
+    """
+    Fornece o RestrictionIndex de uma propriedade, compilado uma vez e mantido
+    em cache no processo. O RestrictionService invalida o cache a cada escrita;
+    entre processos, uma impressão digital barata (count, max(id), max(updated_at))
+    detecta alterações feitas por outros workers antes de reutilizar o índice.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_index(self, tenant_id: int, property_id: int) -> RestrictionIndex:
+        fingerprint = self._fingerprint(tenant_id, property_id)
+        key = (tenant_id, property_id)
+
+        with _index_cache_lock:
+            cached = _index_cache.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        index = self.build_index(self._load_restrictions(tenant_id, property_id))
+
+        with _index_cache_lock:
+            _index_cache[key] = (fingerprint, index)
+
+        logger.debug(
+            f"Índice de restrições compilado: tenant {tenant_id}, propriedade {property_id} "
+            f"({index.total} restrições)"
+        )
+        return index
+
+    @staticmethod
+    def build_index(restrictions: Iterable[ReservationRestriction]) -> RestrictionIndex:
+        """Compila um índice a partir de restrições carregadas (sem cache)"""
+        return RestrictionIndex(_detached_copy(r) for r in restrictions)
+
+    def _fingerprint(self, tenant_id: int, property_id: int) -> Tuple:
+        row = self.db.query(
+            func.count(ReservationRestriction.id),
+            func.max(ReservationRestriction.id),
+            func.max(ReservationRestriction.updated_at)
+        ).filter(
+            ReservationRestriction.tenant_id == tenant_id,
+            ReservationRestriction.property_id == property_id,
+            ReservationRestriction.is_active == True
+        ).one()
+        return tuple(row)
+
+    def _load_restrictions(self, tenant_id: int, property_id: int) -> List[ReservationRestriction]:
+        return self.db.query(ReservationRestriction).filter(
+            ReservationRestriction.tenant_id == tenant_id,
+            ReservationRestriction.property_id == property_id,
+            ReservationRestriction.is_active == True
+        ).all()
+
+
+def _detached_copy(restriction: ReservationRestriction) -> ReservationRestriction:
+    """Cópia transiente (fora da sessão) com os valores das colunas"""
+    return ReservationRestriction(
+        **{column: getattr(restriction, column) for column in _RESTRICTION_COLUMNS}
+    )
@@ -21,6 +21,7 @@ from app.schemas.reservation_restriction import (
     RestrictionValidationRequest, RestrictionValidationResponse, RestrictionViolation
 )
 from app.services.audit_service import AuditService
+from app.services.restriction_index_service import invalidate_restriction_index
 
 logger = logging.getLogger(__name__)
 
@@ -202,6 +203,7 @@ class RestrictionService:
             
             self.db.commit()
             self.db.refresh(restriction)
+            invalidate_restriction_index(tenant_id, restriction.property_id)
             
             logger.info(f"Restrição criada: {restriction.id} - {restriction.restriction_type}")
             return restriction
@@ -278,6 +280,7 @@ class RestrictionService:
             
             self.db.commit()
             self.db.refresh(restriction)
+            invalidate_restriction_index(tenant_id, restriction.property_id)
             
             logger.info(f"Restrição atualizada: {restriction.id}")
             return restriction
@@ -313,6 +316,7 @@ class RestrictionService:
                 "date_from": restriction.date_from,
                 "date_to": restriction.date_to
             }
+            property_id = restriction.property_id
             
             self.db.delete(restriction)
             
@@ -327,6 +331,7 @@ class RestrictionService:
             )
             
             self.db.commit()
+            invalidate_restriction_index(tenant_id, property_id)
             
             logger.info(f"Restrição removida: {restriction_id}")
             return True
@@ -438,6 +443,8 @@ class RestrictionService:
         
         if not errors:
             self.db.commit()
+            for property_id in {combination[0] for combination in scope_combinations}:
+                invalidate_restriction_index(tenant_id, property_id)
             
             # Auditoria consolidada
             self.audit_service.log_create(
@@ -1,8 +1,8 @@
 # backend/app/services/restriction_validation_service.py
 
 from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
 from datetime import datetime, date, timedelta
 import logging
 
@@ -10,6 +10,9 @@ from app.models.reservation_restriction import ReservationRestriction, Restricti
 from app.models.property import Property
 from app.models.room_type import RoomType
 from app.models.room import Room
+from app.services.restriction_index_service import (
+    RestrictionIndex, RestrictionIndexService, restriction_applies_on, restriction_applies_to_range
+)
 from app.schemas.reservation_restriction import (
     RestrictionValidationRequest, RestrictionValidationResponse, RestrictionViolation,
     CalendarRestrictionRequest, CalendarRestrictionResponse, CalendarDayRestriction
@@ -23,6 +26,7 @@ class RestrictionValidationService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.index_service = RestrictionIndexService(db)
     
     # ============== VALIDAÇÃO PRINCIPAL ==============
     
@@ -35,13 +39,6 @@ class RestrictionValidationService:
         Valida se uma reserva pode ser feita baseada nas restrições existentes.
         Aplica hierarquia de precedência: Room > RoomType > Property
         """
-        violations = []
-        warnings = []
-        
-        # Calcular dados básicos
-        nights = (validation_request.check_out_date - validation_request.check_in_date).days
-        advance_days = validation_request.advance_days or 0
-        
         # Buscar restrições aplicáveis
         applicable_restrictions = self._get_applicable_restrictions(
             property_id=validation_request.property_id,
@@ -55,6 +52,72 @@ class RestrictionValidationService:
         # Processar restrições por precedência
         effective_restrictions = self._apply_precedence_rules(applicable_restrictions)
         
+        return self._build_validation_response(validation_request, effective_restrictions)
+    
+    def validate_reservation_restrictions_batch(
+        self,
+        property_id: int,
+        rooms: Dict[int, Optional[int]],
+        check_in_date: date,
+        check_out_date: date,
+        tenant_id: int,
+        advance_days: Optional[int] = None
+    ) -> Dict[int, RestrictionValidationResponse]:
+        """
+        Valida a mesma estadia para vários quartos de uma propriedade.
+        Usa o índice compilado da propriedade e aplica a precedência
+        Room > RoomType > Property em memória para cada quarto.
+        
+        Args:
+            property_id: ID da propriedade
+            rooms: Dict {room_id: room_type_id}
+            check_in_date: Data de check-in
+            check_out_date: Data de check-out
+            tenant_id: ID do tenant
+            advance_days: Dias de antecedência (opcional)
+            
+        Returns:
+            Dict {room_id: RestrictionValidationResponse}
+        """
+        if not rooms:
+            return {}
+        
+        index = self.index_service.get_index(tenant_id, property_id)
+        
+        results = {}
+        for room_id, room_type_id in rooms.items():
+            applicable = index.applicable_for_stay(
+                check_in_date, check_out_date, room_id=room_id, room_type_id=room_type_id
+            )
+            effective_restrictions = self._apply_precedence_rules(applicable)
+            
+            validation_request = RestrictionValidationRequest(
+                property_id=property_id,
+                room_id=room_id,
+                room_type_id=room_type_id,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                advance_days=advance_days
+            )
+            
+            results[room_id] = self._build_validation_response(
+                validation_request, effective_restrictions
+            )
+        
+        return results
+    
+    def _build_validation_response(
+        self,
+        validation_request: RestrictionValidationRequest,
+        effective_restrictions: List[ReservationRestriction]
+    ) -> RestrictionValidationResponse:
+        """Valida as restrições efetivas e monta a resposta"""
+        violations = []
+        
+        # Calcular dados básicos
+        nights = (validation_request.check_out_date - validation_request.check_in_date).days
+        advance_days = validation_request.advance_days or 0
+        
         # Validar cada tipo de restrição
         for restriction in effective_restrictions:
             violation = self._validate_single_restriction(
@@ -99,65 +162,12 @@ class RestrictionValidationService:
             if room:
                 room_type_id = room.room_type_id
         
-        query = self.db.query(ReservationRestriction).options(
-            joinedload(ReservationRestriction.property_obj),
-            joinedload(ReservationRestriction.room_type),
-            joinedload(ReservationRestriction.room)
-        ).filter(
-            ReservationRestriction.tenant_id == tenant_id,
-            ReservationRestriction.property_id == property_id,
-            ReservationRestriction.is_active == True,
-            # Overlap de datas - restrição se aplica se há sobreposição
-            and_(
-                ReservationRestriction.date_from <= check_out_date,
-                ReservationRestriction.date_to >= check_in_date
-            )
-        )
-        
-        # Filtrar por escopo (Property, RoomType ou Room específico)
-        scope_filters = []
+        index = self.index_service.get_index(tenant_id, property_id)
         
-        # Restrições de propriedade (aplicam a todos)
-        scope_filters.append(
-            and_(
-                ReservationRestriction.room_type_id.is_(None),
-                ReservationRestriction.room_id.is_(None)
-            )
+        # Ordenadas por precedência (Room > RoomType > Property) e prioridade
+        return index.applicable_for_stay(
+            check_in_date, check_out_date, room_id=room_id, room_type_id=room_type_id
         )
-        
-        # Restrições de tipo de quarto (se aplicável)
-        if room_type_id:
-            scope_filters.append(
-                and_(
-                    ReservationRestriction.room_type_id == room_type_id,
-                    ReservationRestriction.room_id.is_(None)
-                )
-            )
-        
-        # Restrições de quarto específico (se aplicável)
-        if room_id:
-            scope_filters.append(ReservationRestriction.room_id == room_id)
-        
-        query = query.filter(or_(*scope_filters))
-        
-        # Ordenar por precedência (Room > RoomType > Property) e prioridade
-        restrictions = query.order_by(
-            # Room-level primeiro (room_id não nulo)
-            ReservationRestriction.room_id.desc().nullslast(),
-            # RoomType-level segundo (room_type_id não nulo, room_id nulo)
-            ReservationRestriction.room_type_id.desc().nullslast(),
-            # Property-level último (ambos nulos)
-            # Dentro do mesmo nível, ordenar por prioridade
-            ReservationRestriction.priority.desc()
-        ).all()
-        
-        # Filtrar por dias da semana se especificado
-        applicable_restrictions = []
-        for restriction in restrictions:
-            if self._applies_to_date_range(restriction, check_in_date, check_out_date):
-                applicable_restrictions.append(restriction)
-        
-        return applicable_restrictions
     
     def _applies_to_date_range(
         self,
@@ -166,22 +176,7 @@ class RestrictionValidationService:
         check_out_date: date
     ) -> bool:
         """Verifica se a restrição se aplica ao período, considerando dias da semana"""
-        
-        # Se não há filtro de dias da semana, aplica a todos os dias
-        if not restriction.days_of_week:
-            return True
-        
-        # Verificar se algum dia do período está nos dias aplicáveis
-        current_date = check_in_date
-        while current_date < check_out_date:
-            weekday = current_date.weekday()  # 0=segunda, 6=domingo
-            if weekday in restriction.days_of_week:
-                # Verificar se a data está dentro do período da restrição
-                if restriction.date_from <= current_date <= restriction.date_to:
-                    return True
-            current_date += timedelta(days=1)
-        
-        return False
+        return restriction_applies_to_range(restriction, check_in_date, check_out_date)
     
     def _apply_precedence_rules(
         self,
@@ -332,17 +327,7 @@ class RestrictionValidationService:
     
     def _date_has_restriction(self, restriction: ReservationRestriction, check_date: date) -> bool:
         """Verifica se uma data específica tem a restrição aplicada"""
-        # Verificar se está no período
-        if not (restriction.date_from <= check_date <= restriction.date_to):
-            return False
-        
-        # Verificar dia da semana se especificado
-        if restriction.days_of_week:
-            weekday = check_date.weekday()
-            if weekday not in restriction.days_of_week:
-                return False
-        
-        return True
+        return restriction_applies_on(restriction, check_date)
     
     def _generate_warnings(
         self,
@@ -370,8 +355,8 @@ class RestrictionValidationService:
     ) -> CalendarRestrictionResponse:
         """Gera calendário de restrições para visualização"""
         
-        # Buscar todas as restrições no período
-        restrictions = self._get_calendar_restrictions(calendar_request, tenant_id)
+        # Índice compilado das restrições (cache para as ativas)
+        index = self._get_calendar_index(calendar_request, tenant_id)
         
         # Gerar dias do calendário
         days = []
@@ -380,12 +365,13 @@ class RestrictionValidationService:
         days_with_restrictions = 0
         
         while current_date <= calendar_request.date_to:
-            day_restrictions = []
-            
-            # Filtrar restrições que se aplicam a este dia
-            for restriction in restrictions:
-                if self._date_has_restriction(restriction, current_date):
-                    day_restrictions.append(restriction)
+            # Restrições que se aplicam a este dia (busca binária por escopo/tipo)
+            day_restrictions = index.applicable_on(
+                current_date,
+                room_id=calendar_request.room_id,
+                room_type_id=calendar_request.room_type_id,
+                restriction_types=calendar_request.restriction_types
+            )
             
             # Criar objeto do dia
             day = self._create_calendar_day(current_date, day_restrictions)
@@ -401,6 +387,14 @@ class RestrictionValidationService:
             
             current_date += timedelta(days=1)
         
+        total_restrictions = index.count_overlapping(
+            calendar_request.date_from,
+            calendar_request.date_to,
+            room_id=calendar_request.room_id,
+            room_type_id=calendar_request.room_type_id,
+            restriction_types=calendar_request.restriction_types
+        )
+        
         return CalendarRestrictionResponse(
             property_id=calendar_request.property_id,
             room_type_id=calendar_request.room_type_id,
@@ -410,22 +404,23 @@ class RestrictionValidationService:
             days=days,
             total_days=len(days),
             days_with_restrictions=days_with_restrictions,
-            total_restrictions=len(restrictions),
+            total_restrictions=total_restrictions,
             restriction_summary=restriction_summary
         )
     
-    def _get_calendar_restrictions(
+    def _get_calendar_index(
         self,
         calendar_request: CalendarRestrictionRequest,
         tenant_id: int
-    ) -> List[ReservationRestriction]:
-        """Busca restrições para o calendário"""
+    ) -> RestrictionIndex:
+        """
+        Índice para o calendário. Restrições ativas vêm do cache da propriedade;
+        com include_inactive o índice é compilado na hora a partir do período.
+        """
+        if not calendar_request.include_inactive:
+            return self.index_service.get_index(tenant_id, calendar_request.property_id)
         
-        query = self.db.query(ReservationRestriction).options(
-            joinedload(ReservationRestriction.property_obj),
-            joinedload(ReservationRestriction.room_type),
-            joinedload(ReservationRestriction.room)
-        ).filter(
+        restrictions = self.db.query(ReservationRestriction).filter(
             ReservationRestriction.tenant_id == tenant_id,
             ReservationRestriction.property_id == calendar_request.property_id,
             # Overlap com período solicitado
@@ -433,41 +428,9 @@ class RestrictionValidationService:
                 ReservationRestriction.date_from <= calendar_request.date_to,
                 ReservationRestriction.date_to >= calendar_request.date_from
             )
-        )
-        
-        # Filtrar por escopo
-        scope_filters = []
-        
-        # Sempre incluir restrições de propriedade
-        scope_filters.append(
-            and_(
-                ReservationRestriction.room_type_id.is_(None),
-                ReservationRestriction.room_id.is_(None)
-            )
-        )
-        
-        if calendar_request.room_type_id:
-            scope_filters.append(
-                and_(
-                    ReservationRestriction.room_type_id == calendar_request.room_type_id,
-                    ReservationRestriction.room_id.is_(None)
-                )
-            )
-        
-        if calendar_request.room_id:
-            scope_filters.append(ReservationRestriction.room_id == calendar_request.room_id)
-        
-        query = query.filter(or_(*scope_filters))
-        
-        # Filtrar por tipos de restrição se especificado
-        if calendar_request.restriction_types:
-            query = query.filter(ReservationRestriction.restriction_type.in_(calendar_request.restriction_types))
-        
-        # Filtrar por status ativo se necessário
-        if not calendar_request.include_inactive:
-            query = query.filter(ReservationRestriction.is_active == True)
+        ).all()
         
-        return query.all()
+        return self.index_service.build_index(restrictions)
     
     def _create_calendar_day(
         self,
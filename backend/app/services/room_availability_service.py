@@ -3,16 +3,21 @@
 from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_, func, case, text
+from sqlalchemy import and_, or_, func, case, text, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+from types import SimpleNamespace
 import logging
 
+from app.core.config import settings
+from app.core.redis import redis_cache, invalidate_availability_after_commit
 from app.models.room_availability import RoomAvailability
 from app.models.room import Room
 from app.models.room_type import RoomType
 from app.models.property import Property
 from app.models.reservation import Reservation, ReservationRoom
+from app.services.sync_outbox_service import mark_cells_for_outbox
 from app.schemas.room_availability import (
     RoomAvailabilityCreate,
     RoomAvailabilityUpdate,
@@ -37,6 +42,26 @@ logger = logging.getLogger(__name__)
 class RoomAvailabilityService:
     """Serviço para operações com disponibilidade de quartos - estendido para Channel Manager e Restrições"""
     
+    # Colunas de RoomAvailability guardadas nas janelas em cache
+    WINDOW_COLUMNS = [
+        'room_id', 'date', 'is_available', 'is_blocked', 'is_out_of_order', 'is_maintenance',
+        'is_reserved', 'is_bookable', 'closed_to_arrival', 'closed_to_departure',
+        'rate_override', 'min_stay', 'max_stay', 'reason',
+        'sync_pending', 'wubook_synced', 'wubook_sync_error', 'last_wubook_sync'
+    ]
+    
+    # Campos que compõem is_bookable (RoomAvailability.can_be_booked) e seus padrões
+    BOOKABLE_DEFAULTS = {
+        'is_available': True,
+        'is_blocked': False,
+        'is_out_of_order': False,
+        'is_maintenance': False,
+        'is_reserved': False
+    }
+    
+    # Colunas que o upsert nunca reinicia ao reativar uma célula inativa
+    UPSERT_IDENTITY_COLUMNS = {'id', 'room_id', 'date', 'tenant_id', 'created_at'}
+    
     def __init__(self, db: Session):
         self.db = db
 
@@ -227,9 +252,14 @@ class RoomAvailabilityService:
         self, 
         bulk_data: BulkAvailabilityUpdate, 
         tenant_id: int,
-        mark_for_sync: bool = True
+        mark_for_sync: bool = True,
+        chunk_size: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Atualização em massa de disponibilidades"""
+        """
+        Atualização em massa de disponibilidades.
+        Grava todas as células com upserts em lotes (ON CONFLICT (room_id, date)),
+        sem consultar célula a célula; created/updated vêm do RETURNING.
+        """
         
         # Validar quartos pertencem ao tenant
         valid_rooms = self.db.query(Room.id).filter(
@@ -256,38 +286,36 @@ class RoomAvailabilityService:
         # Preparar dados de atualização
         update_data = bulk_data.model_dump(exclude={'room_ids', 'date_from', 'date_to'}, exclude_unset=True)
         
-        for room_id in valid_room_ids:
-            for target_date in dates:
-                try:
-                    existing = self.get_availability_by_room_date(room_id, target_date, tenant_id)
-                    
-                    if existing:
-                        # Atualizar existente
-                        for field, value in update_data.items():
-                            setattr(existing, field, value)
-                        existing.updated_at = datetime.utcnow()
-                        
-                        if mark_for_sync:
-                            existing.mark_for_sync()
-                        
-                        updated_count += 1
-                    else:
-                        # Criar novo
-                        new_availability = RoomAvailability(
-                            tenant_id=tenant_id,
-                            room_id=room_id,
-                            date=target_date,
-                            **update_data
-                        )
-                        
-                        if mark_for_sync:
-                            new_availability.mark_for_sync()
-                        
-                        self.db.add(new_availability)
-                        created_count += 1
-                        
-                except Exception as e:
-                    errors.append(f"Erro no quarto {room_id}, data {target_date}: {str(e)}")
+        # Colunas gravadas (mesmas chaves em todas as linhas)
+        row_values = dict(update_data, is_active=True, updated_at=datetime.utcnow())
+        update_columns = list(row_values.keys())
+        extra_set = {}
+        
+        if mark_for_sync:
+            row_values.update(sync_pending=True, wubook_sync_error=None)
+            update_columns += ['sync_pending', 'wubook_sync_error']
+            
+            # Equivalente a mark_for_sync(): is_bookable reflete o estado final da célula
+            new_cell = {field: update_data.get(field, default) for field, default in self.BOOKABLE_DEFAULTS.items()}
+            row_values['is_bookable'] = new_cell['is_available'] and not any(
+                new_cell[field] for field in self.BOOKABLE_DEFAULTS if field != 'is_available'
+            )
+            extra_set['is_bookable'] = self._bookable_expression(update_data)
+        
+        rows = [
+            dict(row_values, tenant_id=tenant_id, room_id=room_id, date=target_date)
+            for room_id in valid_room_ids
+            for target_date in dates
+        ]
+        
+        try:
+            created_count, updated_count = self.upsert_availability_rows(
+                rows, update_columns, chunk_size=chunk_size, extra_set=extra_set
+            )
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erro no upsert em massa de disponibilidades: {str(e)}")
+            raise ValueError(f"Erro ao salvar atualizações em massa: {str(e)}")
         
         try:
             # ✅ CRÍTICO: Commit ANTES das notificações
@@ -332,6 +360,108 @@ class RoomAvailabilityService:
             "total_processed": created_count + updated_count
         }
 
+    def _bookable_expression(self, update_data: Dict[str, Any]):
+        """
+        Expressão SQL de is_bookable para o DO UPDATE: usa o valor novo (excluded)
+        dos campos atualizados e o valor atual da linha para os demais (o padrão,
+        se a linha estava inativa - ver upsert_availability_rows).
+        """
+        excluded = pg_insert(RoomAvailability).excluded
+        table = RoomAvailability.__table__
+        
+        def value(field):
+            if field in update_data:
+                return excluded[field]
+            return case((table.c.is_active, table.c[field]), else_=excluded[field])
+        
+        return and_(
+            value('is_available'),
+            ~value('is_blocked'),
+            ~value('is_out_of_order'),
+            ~value('is_maintenance'),
+            ~value('is_reserved')
+        )
+
+    def upsert_availability_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        update_columns: List[str],
+        chunk_size: Optional[int] = None,
+        extra_set: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, int]:
+        """
+        Grava células quarto/data com INSERT ... ON CONFLICT (room_id, date) DO UPDATE,
+        em lotes de chunk_size linhas. Todas as linhas devem ter as mesmas chaves.
+        Não faz commit (participa da transação de quem chama).
+        
+        Se is_active está em update_columns, uma célula inativa (excluída) que
+        colide com a linha é reativada como se fosse nova: as colunas fora de
+        update_columns recebem o padrão do INSERT em vez de manter valores antigos.
+        
+        Args:
+            rows: Dicts com room_id, date, tenant_id e as colunas a gravar
+            update_columns: Colunas sobrescritas quando a célula já existe
+            chunk_size: Linhas por statement (padrão: AVAILABILITY_UPSERT_CHUNK_SIZE)
+            extra_set: Expressões SQL adicionais para o DO UPDATE (coluna -> expressão)
+            
+        Returns:
+            Tupla (criados, atualizados), distinguidos via RETURNING (xmax = 0)
+        """
+        if not rows:
+            return 0, 0
+        
+        chunk_size = chunk_size or settings.AVAILABILITY_UPSERT_CHUNK_SIZE
+        created_count = 0
+        updated_count = 0
+        
+        table = RoomAvailability.__table__
+        extra_set = extra_set or {}
+        reset_columns = []
+        if 'is_active' in update_columns:
+            reset_columns = [
+                column.name for column in table.columns
+                if column.name not in self.UPSERT_IDENTITY_COLUMNS
+                and column.name not in update_columns
+                and column.name not in extra_set
+            ]
+        
+        for start in range(0, len(rows), chunk_size):
+            stmt = pg_insert(RoomAvailability).values(rows[start:start + chunk_size])
+            set_ = {column: stmt.excluded[column] for column in update_columns}
+            # SET avalia table.c.is_active com o valor antigo da linha
+            set_.update({
+                column: case((table.c.is_active, table.c[column]), else_=stmt.excluded[column])
+                for column in reset_columns
+            })
+            set_.update(extra_set)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RoomAvailability.room_id, RoomAvailability.date],
+                set_=set_
+            ).returning(literal_column('(xmax = 0)').label('inserted'))
+            
+            for row in self.db.execute(stmt):
+                if row.inserted:
+                    created_count += 1
+                else:
+                    updated_count += 1
+        
+        # O upsert não passa pelos eventos do ORM: registra no outbox e agenda a
+        # invalidação das janelas em cache aqui
+        pending_cells = [(row['room_id'], row['date']) for row in rows if row.get('sync_pending')]
+        if pending_cells:
+            mark_cells_for_outbox(self.db, rows[0]['tenant_id'], pending_cells)
+        
+        dates = [row['date'] for row in rows]
+        invalidate_availability_after_commit(
+            self.db,
+            rows[0]['tenant_id'],
+            {row['room_id'] for row in rows},
+            min(dates),
+            max(dates)
+        )
+        
+        return created_count, updated_count
+
     def get_calendar_availability(
         self, 
         request: CalendarAvailabilityRequest, 
@@ -486,11 +616,10 @@ class RoomAvailabilityService:
         total_rate = Decimal('0.00')
         restriction_violations = []
         
+        availabilities_by_date = {a.date: a for a in availabilities}
+        
         for target_date in dates:
-            availability = next(
-                (a for a in availabilities if a.date == target_date), 
-                None
-            )
+            availability = availabilities_by_date.get(target_date)
             
             if not availability:
                 # Assumir disponível se não há registro específico
@@ -555,6 +684,121 @@ class RoomAvailabilityService:
         }
 
     # ✅ NOVO: Método para validar restrições individualmente
+    def get_property_availability_window(
+        self,
+        property_id: int,
+        date_from: date,
+        date_to: date,
+        tenant_id: int
+    ) -> Dict[int, Dict[date, SimpleNamespace]]:
+        """
+        Registros ativos de disponibilidade dos quartos ativos da propriedade em
+        [date_from, date_to] (inclusivo), lidos através do cache Redis.
+        A janela é invalidada após o commit de qualquer escrita em room_availability.
+        
+        Returns:
+            Dict {room_id: {date: célula}}; datas sem registro não aparecem
+        """
+        window = redis_cache.get_availability_window(tenant_id, property_id, date_from, date_to)
+        
+        if window is None:
+            room_ids = [row.id for row in self.db.query(Room.id).filter(
+                Room.property_id == property_id,
+                Room.tenant_id == tenant_id,
+                Room.is_active == True
+            ).all()]
+            
+            cells = []
+            if room_ids:
+                rows = self.db.query(
+                    *[getattr(RoomAvailability, column) for column in self.WINDOW_COLUMNS]
+                ).filter(
+                    RoomAvailability.room_id.in_(room_ids),
+                    RoomAvailability.date >= date_from,
+                    RoomAvailability.date <= date_to,
+                    RoomAvailability.tenant_id == tenant_id,
+                    RoomAvailability.is_active == True
+                ).all()
+                cells = [
+                    self._serialize_window_cell({column: getattr(row, column) for column in self.WINDOW_COLUMNS})
+                    for row in rows
+                ]
+            
+            window = {'room_ids': room_ids, 'cells': cells}
+            redis_cache.set_availability_window(
+                tenant_id, property_id, date_from, date_to, window, room_ids
+            )
+        
+        result: Dict[int, Dict[date, SimpleNamespace]] = {room_id: {} for room_id in window['room_ids']}
+        for data in window['cells']:
+            cell = self._deserialize_window_cell(data)
+            result.setdefault(cell.room_id, {})[cell.date] = cell
+        
+        return result
+
+    def check_room_availability_in_window(
+        self,
+        window: Dict[int, Dict[date, SimpleNamespace]],
+        room_id: int,
+        check_in_date: date,
+        check_out_date: date
+    ) -> Dict[str, Any]:
+        """
+        Mesma verificação de check_room_availability (sem restrições),
+        feita sobre uma janela já carregada por get_property_availability_window.
+        """
+        room_cells = window.get(room_id, {})
+        conflicts = []
+        details = []
+        total_rate = Decimal('0.00')
+        
+        current_date = check_in_date
+        while current_date < check_out_date:
+            cell = room_cells.get(current_date)
+            if cell is not None:
+                status = RoomAvailability.status.fget(cell)
+                if not cell.is_bookable:
+                    conflicts.append({
+                        'date': current_date.isoformat(),
+                        'reason': cell.reason or f"Status: {status}"
+                    })
+                if cell.rate_override:
+                    total_rate += cell.rate_override
+                details.append({
+                    'date': current_date.isoformat(),
+                    'status': status,
+                    'rate': cell.rate_override,
+                    'is_bookable': cell.is_bookable
+                })
+            current_date += timedelta(days=1)
+        
+        return {
+            'available': len(conflicts) == 0,
+            'conflicts': conflicts,
+            'restriction_violations': [],
+            'nights': (check_out_date - check_in_date).days,
+            'total_rate': total_rate,
+            'details': details
+        }
+
+    @staticmethod
+    def _serialize_window_cell(cell: Dict[str, Any]) -> Dict[str, Any]:
+        """Célula em formato JSON (datas ISO, Decimal como string)"""
+        data = dict(cell)
+        data['date'] = cell['date'].isoformat()
+        data['rate_override'] = str(cell['rate_override']) if cell['rate_override'] is not None else None
+        data['last_wubook_sync'] = cell['last_wubook_sync'].isoformat() if cell['last_wubook_sync'] else None
+        return data
+
+    @staticmethod
+    def _deserialize_window_cell(data: Dict[str, Any]) -> SimpleNamespace:
+        """Célula lida do cache, com os tipos originais das colunas"""
+        cell = SimpleNamespace(**data)
+        cell.date = date.fromisoformat(data['date'])
+        cell.rate_override = Decimal(data['rate_override']) if data['rate_override'] is not None else None
+        cell.last_wubook_sync = datetime.fromisoformat(data['last_wubook_sync']) if data['last_wubook_sync'] else None
+        return cell
+
     def check_room_availability_with_restrictions(
         self,
         room_id: int,
@@ -586,18 +830,53 @@ class RoomAvailabilityService:
         """
         Verifica disponibilidade de múltiplos quartos incluindo restrições.
         Retorna dict {room_id: availability_data}
+        
+        Carrega a matriz quartos × noites em uma única consulta ao invés
+        de uma consulta por quarto.
         """
+        from app.services.availability_matrix_service import AvailabilityMatrixService
+        
+        matrix = AvailabilityMatrixService(self.db).load(
+            tenant_id=tenant_id,
+            check_in_date=check_in_date,
+            check_out_date=check_out_date,
+            room_ids=room_ids
+        )
+        
+        # Validar restrições em lote: uma consulta por propriedade
+        restriction_results = {}
+        if validate_restrictions:
+            rooms_by_property: Dict[int, Dict[int, Optional[int]]] = {}
+            for room in matrix.rooms.values():
+                rooms_by_property.setdefault(room.property_id, {})[room.id] = room.room_type_id
+            
+            for property_id, property_rooms in rooms_by_property.items():
+                restriction_results.update(self._validate_rooms_restrictions_batch(
+                    property_id=property_id,
+                    rooms=property_rooms,
+                    check_in_date=check_in_date,
+                    check_out_date=check_out_date,
+                    tenant_id=tenant_id
+                ))
+        
         results = {}
         
         for room_id in room_ids:
             try:
-                availability = self.check_room_availability(
-                    room_id=room_id,
-                    check_in_date=check_in_date,
-                    check_out_date=check_out_date,
-                    tenant_id=tenant_id,
-                    validate_restrictions=validate_restrictions
-                )
+                availability = matrix.to_availability_result(room_id)
+                
+                restriction_validation = restriction_results.get(room_id)
+                if restriction_validation and not restriction_validation.is_valid:
+                    for violation in restriction_validation.violations:
+                        availability['restriction_violations'].append({
+                            'type': 'restriction',
+                            'restriction_type': violation.restriction_type,
+                            'message': violation.violation_message,
+                            'date_affected': violation.date_affected.isoformat() if violation.date_affected else None,
+                            'can_override': violation.can_override
+                        })
+                    availability['available'] = False
+                
                 results[room_id] = availability
             except Exception as e:
                 results[room_id] = {
@@ -652,6 +931,29 @@ class RoomAvailabilityService:
                 applicable_restrictions=[]
             )
 
+    def _validate_rooms_restrictions_batch(
+        self,
+        property_id: int,
+        rooms: Dict[int, Optional[int]],
+        check_in_date: date,
+        check_out_date: date,
+        tenant_id: int
+    ) -> Dict[int, RestrictionValidationResponse]:
+        """Valida restrições para vários quartos da mesma propriedade em lote"""
+        try:
+            restriction_service = RestrictionValidationService(self.db)
+            return restriction_service.validate_reservation_restrictions_batch(
+                property_id=property_id,
+                rooms=rooms,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                tenant_id=tenant_id
+            )
+        except Exception as e:
+            # Em caso de erro na validação, considerar válido para não bloquear
+            logger.warning(f"Erro na validação de restrições em lote: {e}")
+            return {}
+
     # ========== MÉTODOS ESPECÍFICOS PARA CHANNEL MANAGER ==========
 
     def get_pending_sync_availabilities(
@@ -689,6 +991,10 @@ class RoomAvailabilityService:
             RoomAvailability.wubook_sync_error: None
         }, synchronize_session=False)
         
+        # Query.update não dispara os eventos do ORM: invalidar janelas do tenant
+        if count > 0:
+            invalidate_availability_after_commit(self.db, tenant_id)
+        
         self.db.commit()
         
         # ✅ SSE: Notificar atualização de contagem de pendentes APÓS commit
@@ -712,6 +1018,10 @@ class RoomAvailabilityService:
             RoomAvailability.wubook_sync_error: error_message
         }, synchronize_session=False)
         
+        # Query.update não dispara os eventos do ORM: invalidar janelas do tenant
+        if count > 0:
+            invalidate_availability_after_commit(self.db, tenant_id)
+        
         self.db.commit()
         
         # ✅ SSE: Notificar atualização de contagem de pendentes APÓS commit
@@ -0,0 +1,304 @@
+# backend/app/services/sync_outbox_service.py
+
+from typing import Optional, Dict, Any, List, Iterable, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from datetime import date
+from collections import defaultdict
+import logging
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis_client
+from app.models.room_availability import RoomAvailability
+from app.models.wubook_configuration import WuBookConfiguration
+from app.models.wubook_room_mapping import WuBookRoomMapping
+
+logger = logging.getLogger(__name__)
+
+
+# Acumula as células do tenant e (re)agenda o envio: trailing debounce de
+# ARGV[2] ms, limitado a ARGV[3] ms desde a primeira célula pendente.
+# Retorna em quantos ms o tenant vence.
+_ENQUEUE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+for i = 4, #ARGV do
+    redis.call('SADD', KEYS[1], ARGV[i])
+end
+
+local first = tonumber(redis.call('HGET', KEYS[3], ARGV[1]))
+if not first then
+    first = now
+    redis.call('HSET', KEYS[3], ARGV[1], now)
+end
+
+local due = math.min(now + tonumber(ARGV[2]), first + tonumber(ARGV[3]))
+redis.call('ZADD', KEYS[2], due, ARGV[1])
+return due - now
+"""
+
+# Retira atomicamente todas as células do tenant
+_POP_SCRIPT = """
+local cells = redis.call('SMEMBERS', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return cells
+"""
+
+# Campos que, alterados, precisam chegar ao canal
+_SYNC_CONTENT_FIELDS = (
+    'is_available', 'is_blocked', 'is_out_of_order', 'is_maintenance', 'is_reserved',
+    'rate_override', 'min_stay', 'max_stay', 'closed_to_arrival', 'closed_to_departure',
+    'is_active'
+)
+
+_SESSION_OUTBOX_KEY = "wubook_sync_outbox"
+
+
+class SyncOutboxService:
+    """
+    Outbox de sincronização de saída (PMS -> WuBook) disparado pelas escritas.
+
+    Toda célula marcada para sync (mark_for_sync(), upserts com sync_pending)
+    entra, após o commit, no outbox do tenant no Redis. Escritas seguidas
+    adiam o envio por WUBOOK_OUTBOX_DEBOUNCE_SECONDS, até no máximo
+    WUBOOK_OUTBOX_MAX_DELAY_SECONDS desde a primeira; a task
+    flush_wubook_sync_outbox então agrupa as células por configuração e envia
+    apenas os registros pendentes (um update_sparse_avail por configuração).
+
+    O outbox só acelera o envio: os registros continuam com sync_pending no
+    banco, então uma falha aqui é coberta pela sync incremental do beat.
+
+    Chaves:
+        outbox:wubook:cells:{tenant}   células "room_id:data" (set)
+        outbox:wubook:due              tenant -> vencimento em ms (zset)
+        outbox:wubook:first            tenant -> primeira célula pendente em ms (hash)
+        outbox:wubook:timer            task de flush já agendada (TTL)
+    """
+
+    PREFIX = "outbox:wubook"
+    DUE_KEY = f"{PREFIX}:due"
+    FIRST_KEY = f"{PREFIX}:first"
+    TIMER_KEY = f"{PREFIX}:timer"
+    ENQUEUE_CHUNK_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @classmethod
+    def _cells_key(cls, tenant_id) -> str:
+        return f"{cls.PREFIX}:cells:{tenant_id}"
+
+    # ============== ENFILEIRAMENTO ==============
+
+    @classmethod
+    def enqueue(cls, tenant_id: int, cells: Iterable[Tuple[int, date]]) -> None:
+        """Adiciona células (room_id, data) ao outbox do tenant e agenda o flush"""
+        client = get_redis_client()
+        members = sorted({f"{room_id}:{cell_date.isoformat()}" for room_id, cell_date in cells})
+        if client is None or not members:
+            return
+
+        keys = [cls._cells_key(tenant_id), cls.DUE_KEY, cls.FIRST_KEY]
+        args = [
+            tenant_id,
+            settings.WUBOOK_OUTBOX_DEBOUNCE_SECONDS * 1000,
+            settings.WUBOOK_OUTBOX_MAX_DELAY_SECONDS * 1000
+        ]
+
+        try:
+            due_in_ms = 0
+            for start in range(0, len(members), cls.ENQUEUE_CHUNK_SIZE):
+                chunk = members[start:start + cls.ENQUEUE_CHUNK_SIZE]
+                due_in_ms = client.eval(_ENQUEUE_SCRIPT, len(keys), *keys, *args, *chunk)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao enfileirar sync no outbox: {e}")
+            return
+
+        cls._schedule_flush(client, due_in_ms / 1000)
+
+    @classmethod
+    def _schedule_flush(cls, client: redis.Redis, delay_seconds: float) -> None:
+        """Agenda uma única task de flush por vez (o timer expira se a task se perder)"""
+        try:
+            if not client.set(cls.TIMER_KEY, 1, nx=True, px=int(delay_seconds * 1000) + 5000):
+                return
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Erro ao agendar flush do outbox: {e}")
+            return
+
+        try:
+            from app.core.celery_app import flush_wubook_sync_outbox
+            flush_wubook_sync_outbox.apply_async(countdown=max(0.0, delay_seconds))
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao agendar flush do outbox (sync ficará para o beat): {e}")
+            client.delete(cls.TIMER_KEY)
+
+    # ============== FLUSH ==============
+
+    def flush(self) -> Dict[str, Any]:
+        """Envia os tenants vencidos e reagenda o próximo vencimento"""
+        from app.services.wubook_availability_sync_service import WuBookAvailabilitySyncService
+
+        client = get_redis_client()
+        if client is None:
+            return {"success": False, "message": "Redis indisponível", "tenants": 0}
+
+        client.delete(self.TIMER_KEY)
+        seconds, micros = client.time()
+        now_ms = seconds * 1000 + micros // 1000
+
+        sync_service = WuBookAvailabilitySyncService(self.db)
+        tenants = client.zrangebyscore(self.DUE_KEY, '-inf', now_ms)
+        results = []
+
+        for tenant in tenants:
+            keys = [self._cells_key(tenant), self.DUE_KEY, self.FIRST_KEY]
+            members = client.eval(_POP_SCRIPT, len(keys), *keys, tenant)
+            cells = self._parse_cells(members)
+            if cells:
+                results.extend(self._push_tenant(sync_service, int(tenant), cells))
+
+        next_due = client.zrange(self.DUE_KEY, 0, 0, withscores=True)
+        if next_due:
+            self._schedule_flush(client, max(0, next_due[0][1] - now_ms) / 1000)
+
+        return {
+            "success": all(result["success"] for result in results),
+            "tenants": len(tenants),
+            "configurations": len(results),
+            "synced_count": sum(result.get("synced_count", 0) for result in results),
+            "results": results
+        }
+
+    def _push_tenant(
+        self,
+        sync_service,
+        tenant_id: int,
+        cells: Set[Tuple[int, date]]
+    ) -> List[Dict[str, Any]]:
+        """Agrupa as células por configuração e envia só os registros pendentes"""
+        room_ids = {room_id for room_id, _ in cells}
+
+        mappings = self.db.query(
+            WuBookRoomMapping.configuration_id, WuBookRoomMapping.room_id
+        ).join(
+            WuBookConfiguration, WuBookConfiguration.id == WuBookRoomMapping.configuration_id
+        ).filter(
+            WuBookRoomMapping.tenant_id == tenant_id,
+            WuBookRoomMapping.room_id.in_(room_ids),
+            WuBookRoomMapping.is_active == True,
+            WuBookRoomMapping.sync_availability == True,
+            WuBookConfiguration.is_active == True,
+            WuBookConfiguration.is_connected == True,
+            WuBookConfiguration.sync_enabled == True
+        ).all()
+
+        rooms_by_configuration = defaultdict(set)
+        for mapping in mappings:
+            rooms_by_configuration[mapping.configuration_id].add(mapping.room_id)
+
+        results = []
+        for configuration_id, config_rooms in rooms_by_configuration.items():
+            config_cells = {cell for cell in cells if cell[0] in config_rooms}
+            dates = [cell_date for _, cell_date in config_cells]
+
+            try:
+                result = sync_service.sync_availability_to_wubook(
+                    tenant_id=tenant_id,
+                    configuration_id=configuration_id,
+                    room_ids=sorted(config_rooms),
+                    date_from=min(dates),
+                    date_to=max(dates)
+                )
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Erro no flush do outbox (configuração {configuration_id}): {str(e)}")
+                result = {"success": False, "message": str(e), "synced_count": 0}
+
+            if result.get("retry_after"):
+                # Limite da conta WuBook: volta para o outbox em vez de esperar o beat
+                self.enqueue(tenant_id, config_cells)
+
+            results.append(dict(result, configuration_id=configuration_id, cells=len(config_cells)))
+
+        return results
+
+    @staticmethod
+    def _parse_cells(members: Iterable[str]) -> Set[Tuple[int, date]]:
+        cells = set()
+        for member in members:
+            try:
+                room_id, cell_date = member.split(":", 1)
+                cells.add((int(room_id), date.fromisoformat(cell_date)))
+            except ValueError:
+                logger.warning(f"⚠️ Célula inválida no outbox descartada: {member}")
+        return cells
+
+
+# ============== CAPTURA DAS ESCRITAS ==============
+
+def mark_cells_for_outbox(
+    session: Optional[Session],
+    tenant_id: int,
+    cells: Iterable[Tuple[int, date]]
+) -> None:
+    """
+    Registra células marcadas para sync; entram no outbox após o commit da
+    sessão (descartadas em rollback). Sem sessão, enfileira imediatamente.
+    """
+    if not settings.WUBOOK_OUTBOX_ENABLED:
+        return
+
+    if session is None:
+        SyncOutboxService.enqueue(tenant_id, cells)
+        return
+
+    pending = session.info.setdefault(_SESSION_OUTBOX_KEY, defaultdict(set))
+    pending[tenant_id].update(cells)
+
+
+@event.listens_for(RoomAvailability, "after_insert")
+def _mark_new_availability_for_outbox(mapper, connection, target):
+    if target.sync_pending:
+        mark_cells_for_outbox(object_session(target), target.tenant_id, [(target.room_id, target.date)])
+
+
+@event.listens_for(RoomAvailability, "after_update")
+def _mark_changed_availability_for_outbox(mapper, connection, target):
+    """
+    Só entra no outbox quando o registro passou a pendente ou teve conteúdo
+    alterado: mark_sync_error() mantém sync_pending sem reenfileirar.
+    """
+    if not target.sync_pending:
+        return
+
+    state = inspect(target)
+    if state.attrs.sync_pending.history.has_changes() or any(
+        state.attrs[field].history.has_changes() for field in _SYNC_CONTENT_FIELDS
+    ):
+        mark_cells_for_outbox(object_session(target), target.tenant_id, [(target.room_id, target.date)])
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_outbox_after_commit(session: Session) -> None:
+    pending = session.info.pop(_SESSION_OUTBOX_KEY, None)
+    if not pending:
+        return
+    for tenant_id, cells in pending.items():
+        try:
+            SyncOutboxService.enqueue(tenant_id, cells)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao enfileirar sync no outbox após commit: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox_after_rollback(session: Session) -> None:
+    # Rollback de savepoint: a transação externa ainda pode commitar
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_SESSION_OUTBOX_KEY, None)
@@ -1,21 +1,27 @@
 # backend/app/services/wubook_availability_sync_service.py
 
 from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+import hashlib
 import logging
 import json
 
+from app.core.config import settings
+from app.core.redis import redis_cache
 from app.models.room_availability import RoomAvailability
 from app.models.room import Room
 from app.models.property import Property
 from app.models.wubook_room_mapping import WuBookRoomMapping
 from app.models.wubook_configuration import WuBookConfiguration
 from app.models.wubook_sync_log import WuBookSyncLog
+from app.models.wubook_availability_fingerprint import WuBookAvailabilityFingerprint
 from app.integrations.wubook.wubook_client import WuBookClient
+from app.integrations.wubook.throttle import WuBookRateLimited
 from app.services.room_availability_service import RoomAvailabilityService
 
 logger = logging.getLogger(__name__)
@@ -45,24 +51,56 @@ class WuBookAvailabilitySyncService:
         
         return query.first()
     
+    # Colunas dos mapeamentos guardadas em cache
+    MAPPING_CACHE_COLUMNS = [
+        'id', 'tenant_id', 'configuration_id', 'room_id', 'wubook_room_id', 'wubook_room_name',
+        'is_active', 'is_syncing', 'sync_availability', 'sync_rates', 'sync_restrictions',
+        'base_rate_override', 'rate_multiplier'
+    ]
+    
     def _get_room_mappings(
         self, 
         configuration_id: int, 
         room_ids: Optional[List[int]] = None
     ) -> List[WuBookRoomMapping]:
-        """Busca mapeamentos de quartos para sincronização"""
-        query = self.db.query(WuBookRoomMapping).options(
-            joinedload(WuBookRoomMapping.room)
-        ).filter(
-            WuBookRoomMapping.configuration_id == configuration_id,
-            WuBookRoomMapping.is_active == True,
-            WuBookRoomMapping.sync_availability == True
-        )
+        """
+        Busca mapeamentos de quartos para sincronização, via cache Redis.
+        Retorna cópias desvinculadas da sessão (somente leitura) com as colunas
+        de MAPPING_CACHE_COLUMNS.
+        """
+        cached = redis_cache.get_room_mappings(configuration_id)
+        
+        if cached is None:
+            rows = self.db.query(
+                *[getattr(WuBookRoomMapping, column) for column in self.MAPPING_CACHE_COLUMNS]
+            ).filter(
+                WuBookRoomMapping.configuration_id == configuration_id,
+                WuBookRoomMapping.is_active == True,
+                WuBookRoomMapping.sync_availability == True
+            ).all()
+            
+            cached = [
+                {
+                    column: (str(value) if isinstance(value, Decimal) else value)
+                    for column, value in zip(self.MAPPING_CACHE_COLUMNS, row)
+                }
+                for row in rows
+            ]
+            redis_cache.set_room_mappings(configuration_id, cached)
         
         if room_ids:
-            query = query.filter(WuBookRoomMapping.room_id.in_(room_ids))
+            selected = set(room_ids)
+            cached = [data for data in cached if data['room_id'] in selected]
+        
+        mappings = []
+        for data in cached:
+            values = dict(data)
+            for column in ('base_rate_override', 'rate_multiplier'):
+                if values[column] is not None:
+                    values[column] = Decimal(values[column])
+            mappings.append(WuBookRoomMapping(**values))
         
-        return query.all()
+        return mappings
     
     def _create_sync_log(
         self, 
@@ -136,8 +174,20 @@ class WuBookAvailabilitySyncService:
         mappings: List[WuBookRoomMapping]
     ) -> List[Dict[str, Any]]:
         """Converte disponibilidade PMS para formato WuBook - CORRIGIDO"""
+        wubook_data = [
+            wb_data for _, _, wb_data in self._build_wubook_cells(availabilities, mappings)
+        ]
+        logger.debug(f"Convertidos {len(wubook_data)} itens de disponibilidade para WuBook")
+        return wubook_data
+    
+    def _build_wubook_cells(
+        self, 
+        availabilities: List[RoomAvailability], 
+        mappings: List[WuBookRoomMapping]
+    ) -> List[Tuple[RoomAvailability, WuBookRoomMapping, Dict[str, Any]]]:
+        """Monta (disponibilidade, mapeamento, dados WuBook) de cada célula mapeada"""
         mapping_dict = {m.room_id: m for m in mappings}
-        wubook_data = []
+        cells = []
         
         for avail in availabilities:
             mapping = mapping_dict.get(avail.room_id)
@@ -172,10 +222,104 @@ class WuBookAvailabilitySyncService:
                     rate = rate * float(mapping.rate_multiplier)
                 wb_data['rate'] = rate
             
-            wubook_data.append(wb_data)
+            cells.append((avail, mapping, wb_data))
         
-        logger.debug(f"Convertidos {len(wubook_data)} itens de disponibilidade para WuBook")
-        return wubook_data
+        return cells
+    
+    # ============== DELTA CONTRA O ÚLTIMO ESTADO ENVIADO ==============
+    
+    @staticmethod
+    def _cell_fingerprint(wb_data: Dict[str, Any]) -> str:
+        """Hash dos valores enviados de uma célula (quarto WuBook, data, avail, restrições, tarifa)"""
+        payload = json.dumps(wb_data, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    
+    def _split_unchanged_cells(
+        self,
+        cells: List[Tuple[RoomAvailability, WuBookRoomMapping, Dict[str, Any]]],
+        date_from: date,
+        date_to: date
+    ) -> Tuple[list, list]:
+        """
+        Separa as células iguais ao último envio aceito pelo WuBook.
+        Retorna (a enviar, inalteradas); cada célula a enviar leva o fingerprint
+        novo para ser gravado após o sucesso.
+        """
+        if not cells:
+            return [], []
+        
+        if not settings.WUBOOK_SYNC_DELTA_ENABLED:
+            return [cell + (self._cell_fingerprint(cell[2]),) for cell in cells], []
+        
+        mapping_ids = {mapping.id for _, mapping, _ in cells}
+        stored = {
+            (row.mapping_id, row.date): row
+            for row in self.db.query(
+                WuBookAvailabilityFingerprint.mapping_id,
+                WuBookAvailabilityFingerprint.date,
+                WuBookAvailabilityFingerprint.fingerprint,
+                WuBookAvailabilityFingerprint.pushed_at
+            ).filter(
+                WuBookAvailabilityFingerprint.mapping_id.in_(mapping_ids),
+                WuBookAvailabilityFingerprint.date >= date_from,
+                WuBookAvailabilityFingerprint.date <= date_to
+            )
+        }
+        
+        # Células iguais há mais tempo que o limite são reenviadas (corrige divergências no canal)
+        refresh_before = None
+        if settings.WUBOOK_SYNC_FINGERPRINT_MAX_AGE_DAYS > 0:
+            refresh_before = datetime.utcnow() - timedelta(days=settings.WUBOOK_SYNC_FINGERPRINT_MAX_AGE_DAYS)
+        
+        to_push = []
+        unchanged = []
+        for avail, mapping, wb_data in cells:
+            fingerprint = self._cell_fingerprint(wb_data)
+            previous = stored.get((mapping.id, avail.date))
+            
+            if (
+                previous is not None
+                and previous.fingerprint == fingerprint
+                and (refresh_before is None or previous.pushed_at >= refresh_before)
+            ):
+                unchanged.append((avail, mapping, wb_data))
+            else:
+                to_push.append((avail, mapping, wb_data, fingerprint))
+        
+        return to_push, unchanged
+    
+    def _save_pushed_fingerprints(self, tenant_id: int, pushed_cells: list) -> None:
+        """Grava o estado aceito pelo WuBook (participa da transação de quem chama)"""
+        if not pushed_cells:
+            return
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'tenant_id': tenant_id,
+                'mapping_id': mapping.id,
+                'date': avail.date,
+                'fingerprint': fingerprint,
+                'pushed_at': now,
+                'created_at': now,
+                'updated_at': now,
+                'is_active': True
+            }
+            for avail, mapping, _, fingerprint in pushed_cells
+        ]
+        
+        chunk_size = settings.AVAILABILITY_UPSERT_CHUNK_SIZE
+        for start in range(0, len(rows), chunk_size):
+            stmt = pg_insert(WuBookAvailabilityFingerprint).values(rows[start:start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[WuBookAvailabilityFingerprint.mapping_id, WuBookAvailabilityFingerprint.date],
+                set_={
+                    'fingerprint': stmt.excluded.fingerprint,
+                    'pushed_at': stmt.excluded.pushed_at,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            )
+            self.db.execute(stmt)
     
     def _convert_wubook_to_pms_availability(
         self, 
@@ -342,9 +486,9 @@ class WuBookAvailabilitySyncService:
                 }
             
             # Converter para formato WuBook
-            wubook_data = self._convert_pms_to_wubook_availability(availabilities, mappings)
+            cells = self._build_wubook_cells(availabilities, mappings)
             
-            if not wubook_data:
+            if not cells:
                 self._update_sync_log(
                     sync_log, "success", len(availabilities), 0, len(availabilities),
                     error_message="Nenhum dado válido para sincronizar"
@@ -355,6 +499,29 @@ class WuBookAvailabilitySyncService:
                     "sync_log_id": sync_log.id
                 }
             
+            # Enviar só o que mudou desde o último envio aceito pelo WuBook
+            pushed_cells, unchanged_cells = self._split_unchanged_cells(cells, date_from, date_to)
+            for avail, _, _ in unchanged_cells:
+                if avail.sync_pending:
+                    avail.mark_sync_success()
+            
+            if not pushed_cells:
+                self.db.commit()
+                self._update_sync_log(
+                    sync_log, "success", len(cells), 0, 0,
+                    changes_made={"synced_to_wubook": 0, "unchanged": len(unchanged_cells)}
+                )
+                return {
+                    "success": True,
+                    "message": f"Nenhuma alteração a enviar ({len(unchanged_cells)} células iguais ao canal)",
+                    "synced_count": 0,
+                    "unchanged_count": len(unchanged_cells),
+                    "sync_log_id": sync_log.id
+                }
+            
+            availabilities = [avail for avail, _, _, _ in pushed_cells]
+            wubook_data = [wb_data for _, _, wb_data, _ in pushed_cells]
+            
             # Criar cliente WuBook
             client = WuBookClient(config.wubook_token, config.wubook_lcode)
             
@@ -362,6 +529,7 @@ class WuBookAvailabilitySyncService:
             success_count = 0
             error_count = 0
             errors = []
+            retry_after = None
             
             try:
                 # Atualizar disponibilidade no WuBook
@@ -377,6 +545,7 @@ class WuBookAvailabilitySyncService:
                         sync_timestamp = datetime.utcnow().isoformat()
                         for avail in availabilities:
                             avail.mark_sync_success()
+                        self._save_pushed_fingerprints(tenant_id, pushed_cells)
                         
                         success_count = len(availabilities)
                         
@@ -436,6 +605,12 @@ class WuBookAvailabilitySyncService:
                     config.last_error_at = datetime.utcnow().isoformat()
                     config.error_count += 1
                 
+            except WuBookRateLimited as e:
+                # Limite da conta: registros seguem pendentes para o próximo ciclo, sem contar como erro
+                logger.warning(f"⚠️ {str(e)}")
+                errors.append(str(e))
+                retry_after = e.retry_after
+                
             except Exception as e:
                 error_message = f"Erro de comunicação com WuBook: {str(e)}"
                 logger.error(error_message)
@@ -461,7 +636,7 @@ class WuBookAvailabilitySyncService:
             self._update_sync_log(
                 sync_log, final_status, 
                 len(availabilities), success_count, error_count,
-                changes_made={"synced_to_wubook": success_count},
+                changes_made={"synced_to_wubook": success_count, "unchanged": len(unchanged_cells)},
                 error_message="; ".join(errors) if errors else None
             )
             
@@ -469,8 +644,10 @@ class WuBookAvailabilitySyncService:
                 "success": success_count > 0,
                 "message": f"Sincronização concluída: {success_count} sucessos, {error_count} erros",
                 "synced_count": success_count,
+                "unchanged_count": len(unchanged_cells),
                 "error_count": error_count,
                 "errors": errors,
+                "retry_after": retry_after,
                 "sync_log_id": sync_log.id
             }
             
@@ -583,6 +760,17 @@ class WuBookAvailabilitySyncService:
                     "sync_log_id": sync_log.id
                 }
                 
+            except WuBookRateLimited as e:
+                logger.warning(f"⚠️ {str(e)}")
+                self._update_sync_log(sync_log, "error", 0, 0, 0, error_message=str(e))
+                
+                return {
+                    "success": False,
+                    "message": str(e),
+                    "retry_after": e.retry_after,
+                    "sync_log_id": sync_log.id
+                }
+                
             except Exception as e:
                 error_message = f"Erro ao buscar dados do WuBook: {str(e)}"
                 logger.error(error_message)
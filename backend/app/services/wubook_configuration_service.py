@@ -9,7 +9,9 @@ from datetime import datetime, timedelta
 import logging
 import json
 from decimal import Decimal
+from types import SimpleNamespace
 
+from app.core.redis import redis_cache
 from app.models.wubook_configuration import WuBookConfiguration
 from app.models.wubook_room_mapping import WuBookRoomMapping
 from app.models.wubook_rate_plan import WuBookRatePlan
@@ -102,6 +104,32 @@ class WuBookConfigurationService:
         
         return query.all()
     
+    # Campos das configurações guardados em cache (sem credenciais)
+    SUMMARY_CACHE_FIELDS = [
+        'id', 'property_id', 'wubook_lcode', 'wubook_property_name', 'is_connected',
+        'connection_status', 'sync_enabled', 'last_sync_at', 'last_sync_status', 'error_count'
+    ]
+    
+    def get_active_configurations_summary(self, tenant_id: int) -> List[SimpleNamespace]:
+        """
+        Resumo (somente leitura) das configurações ativas do tenant, lido via cache Redis.
+        Escritas em WuBookConfiguration invalidam o cache após o commit.
+        """
+        summaries = redis_cache.get_configurations(tenant_id)
+        
+        if summaries is None:
+            configurations = self.db.query(WuBookConfiguration).filter(
+                WuBookConfiguration.tenant_id == tenant_id,
+                WuBookConfiguration.is_active == True
+            ).all()
+            summaries = [
+                {field: getattr(config, field) for field in self.SUMMARY_CACHE_FIELDS}
+                for config in configurations
+            ]
+            redis_cache.set_configurations(tenant_id, summaries)
+        
+        return [SimpleNamespace(**summary) for summary in summaries]
+    
     def create_configuration(
         self,
         config_data: WuBookConfigurationCreate,
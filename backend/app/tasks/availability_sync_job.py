@@ -9,7 +9,7 @@ import traceback
 import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.models.room_availability import RoomAvailability
 from app.models.room import Room
 from app.models.wubook_configuration import WuBookConfiguration
@@ -17,6 +17,7 @@ from app.models.wubook_room_mapping import WuBookRoomMapping
 from app.models.wubook_sync_log import WuBookSyncLog
 from app.services.wubook_availability_sync_service import WuBookAvailabilitySyncService
 from app.services.room_availability_service import RoomAvailabilityService
+from app.tasks.concurrent_sync import ConcurrentSyncDriver
 
 logger = logging.getLogger(__name__)
 
@@ -87,12 +88,25 @@ class AvailabilitySyncJob:
                 results["message"] = "Nenhuma configuração ativa encontrada"
                 return results
             
-            # Processar cada configuração
-            for config in configurations:
-                config_result = self._process_configuration_incremental(
-                    config, max_pending_items, batch_size
-                )
-                
+            # Processar configurações em paralelo (uma sessão por configuração)
+            jobs = [
+                (str(config.wubook_lcode), (config.id, max_pending_items, batch_size))
+                for config in configurations
+            ]
+            config_results = ConcurrentSyncDriver().run(
+                jobs,
+                AvailabilitySyncJob._process_configuration_incremental_in_session,
+                lambda job, message: {
+                    "success": False,
+                    "message": message,
+                    "synced_count": 0,
+                    "error_count": 0,
+                    "batches_processed": 0,
+                    "errors": [f"Configuração {job[0]}: {message}"]
+                }
+            )
+            
+            for config, config_result in zip(configurations, config_results):
                 results["configurations_processed"].append({
                     "configuration_id": config.id,
                     "property_name": getattr(config, "wubook_property_name", "Unknown"),
@@ -124,6 +138,21 @@ class AvailabilitySyncJob:
                 "completed_at": datetime.utcnow().isoformat()
             }
     
+    @staticmethod
+    def _process_configuration_incremental_in_session(job: Tuple[int, int, int]) -> Dict[str, Any]:
+        """Processa uma configuração com sessão própria (executado em thread pelo driver)"""
+        configuration_id, max_pending_items, batch_size = job
+        
+        with AvailabilitySyncJob(SessionLocal()) as sync_job:
+            config = sync_job.db.query(WuBookConfiguration).filter(
+                WuBookConfiguration.id == configuration_id
+            ).first()
+            
+            if not config:
+                raise ValueError(f"Configuração {configuration_id} não encontrada")
+            
+            return sync_job._process_configuration_incremental(config, max_pending_items, batch_size)
+    
     def _process_configuration_incremental(
         self,
         config: WuBookConfiguration,
@@ -180,11 +209,6 @@ class AvailabilitySyncJob:
                         errors.extend(batch_result.get("errors", []))
                     
                     batches_processed += 1
-                    
-                    # Pequena pausa entre lotes para não sobrecarregar
-                    if i + batch_size < len(pending_items):
-                        import time
-                        time.sleep(0.5)
                         
                 except Exception as e:
                     logger.error(f"Erro no lote {i//batch_size + 1}: {str(e)}")
@@ -0,0 +1,151 @@
+# backend/app/tasks/concurrent_sync.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Vagas por conta WuBook compartilhadas por todos os ciclos do processo. A vaga
+# só é devolvida quando a thread do job termina de fato, então um job expirado
+# que ainda está rodando continua contando para o limite da conta no ciclo seguinte.
+_account_slots: Dict[str, threading.BoundedSemaphore] = {}
+_account_slots_lock = threading.Lock()
+
+# Intervalo entre tentativas de pegar a vaga de uma conta ocupada
+_SLOT_POLL_SECONDS = 0.1
+
+
+def _account_slot(account: str, limit: int) -> threading.BoundedSemaphore:
+    with _account_slots_lock:
+        slot = _account_slots.get(account)
+        if slot is None:
+            slot = _account_slots[account] = threading.BoundedSemaphore(limit)
+        return slot
+
+
+class ConcurrentSyncDriver:
+    """
+    Executa a sincronização de várias configurações WuBook em paralelo.
+
+    Cada job roda em uma thread própria (o worker deve abrir a sua sessão do
+    banco) e é orquestrado por asyncio com dois limites: total de jobs
+    simultâneos (WUBOOK_SYNC_MAX_CONCURRENCY) e jobs simultâneos por conta
+    WuBook/lcode (WUBOOK_SYNC_PER_ACCOUNT_CONCURRENCY). Uma conta lenta ou com
+    erro só afeta o próprio resultado: exceções viram resultado de erro e o job
+    que passa de CHANNEL_MANAGER_SYNC_TIMEOUT_SECONDS é dado como expirado (a
+    thread não pode ser interrompida: termina em segundo plano, segurando a
+    vaga da conta até acabar, e o resultado é descartado). O tempo total do
+    ciclo tende ao da configuração mais lenta, não à soma de todas. Jobs da
+    mesma conta no ciclo fazem fila entre si; só a espera por uma vaga presa
+    por uma thread que já saiu do ciclo tem prazo (e vira erro de conta ocupada).
+
+    Os workers de sync intercalam a sessão síncrona do SQLAlchemy com as
+    chamadas ao WuBookClient, por isso o job inteiro roda na thread em vez de
+    só as chamadas ao WuBook passarem pelo AsyncWuBookClient (que atende
+    quem já está em código assíncrono).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_account_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        self.max_concurrency = max(1, max_concurrency or settings.WUBOOK_SYNC_MAX_CONCURRENCY)
+        self.per_account_concurrency = max(
+            1, per_account_concurrency or settings.WUBOOK_SYNC_PER_ACCOUNT_CONCURRENCY
+        )
+        self.timeout_seconds = timeout_seconds or settings.CHANNEL_MANAGER_SYNC_TIMEOUT_SECONDS
+
+    def run(
+        self,
+        jobs: List[Tuple[str, Any]],
+        worker: Callable[[Any], Dict[str, Any]],
+        error_result: Callable[[Any, str], Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Executa worker(job) para cada (conta, job) e retorna os resultados na
+        mesma ordem de jobs. error_result(job, mensagem) monta o resultado de
+        um job que falhou ou expirou.
+        """
+        if not jobs:
+            return []
+        return asyncio.run(self._run(jobs, worker, error_result))
+
+    async def _run(self, jobs, worker, error_result) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        # Uma thread por job: um job expirado não ocupa a vaga de outro na fila do executor
+        executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="wubook-sync")
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+
+        # Fila por conta dentro do ciclo: jobs da mesma conta esperam a vez sem prazo
+        # (cada um à frente termina ou expira), então quem chega à vaga do processo
+        # e a encontra ocupada está esperando por uma thread que já saiu do ciclo
+        run_account_limits: Dict[str, asyncio.Semaphore] = {}
+
+        async def acquire_account_slot(slot: threading.BoundedSemaphore) -> bool:
+            """Espera (sem bloquear o loop) por uma vaga da conta, até o timeout do job"""
+            deadline = time.monotonic() + self.timeout_seconds
+            while not slot.acquire(blocking=False):
+                if time.monotonic() >= deadline:
+                    return False
+                await asyncio.sleep(_SLOT_POLL_SECONDS)
+            return True
+
+        async def run_job(account: str, job: Any) -> Dict[str, Any]:
+            account_limit = run_account_limits.setdefault(
+                account, asyncio.Semaphore(self.per_account_concurrency)
+            )
+            async with account_limit:
+                return await run_job_in_slot(account, job)
+
+        async def run_job_in_slot(account: str, job: Any) -> Dict[str, Any]:
+            slot = _account_slot(account, self.per_account_concurrency)
+            if not await acquire_account_slot(slot):
+                logger.warning(f"⚠️ Conta {account} ainda ocupada por uma sync anterior; job ignorado neste ciclo")
+                return error_result(job, "Conta ocupada por uma sincronização anterior ainda em andamento")
+
+            def run_and_release() -> Dict[str, Any]:
+                try:
+                    return worker(job)
+                finally:
+                    slot.release()
+
+            submitted = False
+            try:
+                async with global_limit:
+                    started = time.monotonic()
+                    future = executor.submit(run_and_release)
+                    submitted = True
+                    # Cancelado antes de começar (shutdown do executor): run_and_release não roda
+                    future.add_done_callback(lambda f: f.cancelled() and slot.release())
+                    try:
+                        return await asyncio.wait_for(
+                            asyncio.wrap_future(future, loop=loop),
+                            timeout=self.timeout_seconds
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"⚠️ Sync da conta {account} excedeu {self.timeout_seconds}s; resultado descartado"
+                        )
+                        return error_result(job, f"Tempo limite de {self.timeout_seconds}s excedido")
+                    except Exception as e:
+                        logger.error(f"Erro na sync da conta {account}: {str(e)}")
+                        return error_result(job, str(e))
+                    finally:
+                        logger.debug(f"Sync da conta {account}: {time.monotonic() - started:.2f}s")
+            finally:
+                if not submitted:
+                    slot.release()
+
+        try:
+            return await asyncio.gather(*(run_job(account, job) for account, job in jobs))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -6,12 +6,13 @@ from datetime import datetime, date, timedelta
 import logging
 import traceback
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.models.wubook_configuration import WuBookConfiguration
 from app.models.wubook_room_mapping import WuBookRoomMapping
 from app.models.room_availability import RoomAvailability
 from app.services.wubook_availability_sync_service import WuBookAvailabilitySyncService
 from app.integrations.wubook.sync_service import WuBookSyncService
+from app.tasks.concurrent_sync import ConcurrentSyncDriver
 
 # ✅ SSE: Import do serviço de notificações
 from app.services.notification_service import notification_service
@@ -67,12 +68,17 @@ class WuBookSyncTasks:
                 date_from = date.today() - timedelta(days=max_days_back)
                 date_to = date.today() + timedelta(days=max_days_ahead)
                 
-                # Processar cada configuração
-                for config in configurations:
-                    config_result = WuBookSyncTasks._sync_configuration_availability(
-                        db, config, date_from, date_to
-                    )
-                    
+                # Processar configurações em paralelo (uma sessão por configuração)
+                config_results = ConcurrentSyncDriver().run(
+                    [
+                        (str(config.wubook_lcode), (config.id, date_from, date_to))
+                        for config in configurations
+                    ],
+                    WuBookSyncTasks._sync_configuration_availability_in_session,
+                    lambda job, message: {"success": False, "message": message, "synced_count": 0}
+                )
+                
+                for config, config_result in zip(configurations, config_results):
                     results["configurations_processed"] += 1
                     
                     if config_result["success"]:
@@ -125,6 +131,28 @@ class WuBookSyncTasks:
                 "completed_at": datetime.utcnow().isoformat()
             }
     
+    @staticmethod
+    def _sync_configuration_availability_in_session(job) -> Dict[str, Any]:
+        """Sincroniza uma configuração com sessão própria (executado em thread pelo driver)"""
+        configuration_id, date_from, date_to = job
+        
+        db = SessionLocal()
+        try:
+            config = db.query(WuBookConfiguration).filter(
+                WuBookConfiguration.id == configuration_id
+            ).first()
+            
+            if not config:
+                return {
+                    "success": False,
+                    "message": f"Configuração {configuration_id} não encontrada",
+                    "synced_count": 0
+                }
+            
+            return WuBookSyncTasks._sync_configuration_availability(db, config, date_from, date_to)
+        finally:
+            db.close()
+    
     @staticmethod
     def _sync_configuration_availability(
         db: Session,
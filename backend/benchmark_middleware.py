@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# backend/benchmark_middleware.py
+
+"""
+Benchmark da pilha de middlewares (Timezone + logging público + rate limit).
+
+Compara a implementação antiga (BaseHTTPMiddleware) com a atual (ASGI puro)
+chamando a aplicação diretamente pela interface ASGI, sem rede nem servidor,
+para medir apenas o overhead por requisição. Também verifica que uma
+resposta SSE atravessa a pilha chunk a chunk (sem ser bufferizada).
+
+Uso:
+    python benchmark_middleware.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório backend ao PATH
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Limite alto para o rate limit não interferir na medição
+os.environ.setdefault("PUBLIC_API_RATE_LIMIT_PER_MINUTE", "100000000")
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import TimezoneMiddleware
+from app.api.public.middleware import (
+    RateLimitMiddleware,
+    PublicAPILoggingMiddleware,
+    rate_limiter
+)
+
+SSE_EVENTS = 3
+SSE_INTERVAL = 0.05
+
+
+# ============== PILHA ANTIGA (REFERÊNCIA) ==============
+
+class LegacyTimezoneMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        os.environ['TZ'] = 'America/Sao_Paulo'
+        response = await call_next(request)
+        response.headers["X-Timezone"] = "America/Sao_Paulo"
+        return response
+
+
+class LegacyPublicAPILoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if not request.url.path.startswith("/api/public"):
+            return await call_next(request)
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logging.getLogger("app.api.public.middleware").info(
+            f"[PUBLIC API] {request.method} {request.url.path} | Status: {response.status_code}"
+        )
+        response.headers["X-Process-Time"] = f"{process_time:.3f}"
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if not request.url.path.startswith("/api/public"):
+            return await call_next(request)
+        limit = rate_limiter.hit(request.client.host if request.client else "unknown")
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(limit['limit'])
+        response.headers["X-RateLimit-Remaining"] = str(limit['remaining'])
+        return response
+
+
+# ============== APLICAÇÕES ==============
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/public/ping")
+    async def ping():
+        return JSONResponse({"ok": True})
+
+    @app.get("/api/public/events")
+    async def events():
+        async def stream():
+            for index in range(SSE_EVENTS):
+                yield f"data: {index}\n\n"
+                await asyncio.sleep(SSE_INTERVAL)
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    if legacy:
+        app.add_middleware(LegacyTimezoneMiddleware)
+        app.add_middleware(LegacyPublicAPILoggingMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+    else:
+        app.add_middleware(TimezoneMiddleware)
+        app.add_middleware(PublicAPILoggingMiddleware)
+        app.add_middleware(RateLimitMiddleware)
+
+    return app
+
+
+async def call(app, path: str):
+    """Executa uma requisição ASGI; retorna os eventos enviados com o instante de cada um"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    messages = []
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append((time.perf_counter(), message))
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return messages
+
+
+async def benchmark(app, requests: int) -> float:
+    """Tempo médio por requisição (µs)"""
+    for _ in range(min(200, requests)):
+        await call(app, "/api/public/ping")
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, "/api/public/ping")
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def check_sse(app) -> bool:
+    """Verifica headers e se cada evento SSE chega separado, no seu tempo"""
+    started = time.perf_counter()
+    messages = await call(app, "/api/public/events")
+
+    start_message = next(message for _, message in messages if message["type"] == "http.response.start")
+    headers = {name.decode().lower() for name, _ in start_message["headers"]}
+    chunks = [
+        (at - started, message["body"])
+        for at, message in messages
+        if message["type"] == "http.response.body" and message.get("body")
+    ]
+
+    streamed = len(chunks) == SSE_EVENTS and all(
+        later[0] - earlier[0] >= SSE_INTERVAL * 0.8
+        for earlier, later in zip(chunks, chunks[1:])
+    )
+    expected_headers = {"x-timezone", "x-process-time", "x-ratelimit-limit"}
+
+    for offset, body in chunks:
+        print(f"      +{offset * 1000:7.1f} ms  {body!r}")
+    print(f"    headers: {sorted(expected_headers & headers)}")
+    return streamed and expected_headers <= headers
+
+
+async def main(requests: int) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    rate_limiter.hit("warmup")  # conexão (ou fallback local) do rate limiter fora da medição
+
+    results = {}
+    for name, legacy in (("BaseHTTPMiddleware", True), ("ASGI puro", False)):
+        app = build_app(legacy)
+        results[name] = await benchmark(app, requests)
+        print(f"\n🔍 {name}")
+        print(f"    {results[name]:.1f} µs/requisição ({requests} requisições)")
+        print("    SSE:")
+        print(f"    {'✅ streaming OK' if await check_sse(app) else '❌ streaming bufferizado ou headers ausentes'}")
+
+    before, after = results["BaseHTTPMiddleware"], results["ASGI puro"]
+    print(f"\n📊 Overhead: {before:.1f} → {after:.1f} µs/requisição ({(1 - after / before) * 100:.0f}% menor)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da pilha de middlewares")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))